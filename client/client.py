@@ -1,6 +1,8 @@
 import socket
 import time
+import asyncio
 import json
+import copy
 import platform
 import psutil
 import os
@@ -8,8 +10,28 @@ import socketio
 import requests
 import subprocess
 import re
+import fnmatch
+import bisect
+import heapq
 import ipaddress
 import shutil
+import errno
+import selectors
+import select
+import struct
+import threading
+import random
+import math
+import signal
+import contextlib
+import atexit
+import queue
+import sys
+import logging
+import logging.handlers
+from array import array
+from collections import namedtuple, OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait as futures_wait, TimeoutError as FuturesTimeoutError
 from datetime import datetime
 
 # Configuration - can be modified as needed
@@ -17,10 +39,73 @@ SERVER_URL = 'http://localhost:8008'  # Socket.IO server address (Docker Nginx p
 NODE_NAME = socket.gethostname()  # Use hostname as node name, can be manually modified
 NODE_LOCATION = 'Local'  # Location
 CLIENT_VERSION = '1.3.1'  # 🔧 统一版本号
+PUBLIC_IP_CACHE_TTL = 600  # 公网IP缓存有效期（秒），到期后后台刷新
+PUBLIC_IP_CHECK_INTERVAL = 30  # 后台检查本地网卡地址变化的间隔（秒）
+PUBLIC_IP_RETRY_INTERVAL = 60  # 所有IP查询服务都失败时的重试间隔（秒）
+CLOUD_PROBE_TIMEOUT = 1  # 单个云元数据端点的超时（秒）
+CLOUD_PROBE_DEADLINE = 2  # 云元数据并发探测的总截止时间（秒）
+CPU_SAMPLE_INTERVAL = 1.0  # 后台高频采样间隔（秒），CPU与网络速率按此节奏采样，可小于1秒（上报间隔见 DATA_SEND_INTERVAL）
+RATE_EWMA_TAU = 0  # 速率EWMA平滑的时间常数（秒），0表示不平滑；网络、磁盘I/O、CPU使用率共用同一个速率引擎
+SAMPLE_WINDOW_SIZE = 60  # 每个指标的采样窗口大小（点数），每次上报统计窗口内的 min/max/avg/last
+REPORT_SAMPLE_STATS = True  # 上报数据中是否附带高频采样统计（stats字段）
+REPORT_PER_CORE_CPU = False  # 上报数据中是否附带每核CPU使用率（cpu_per_core）
+RUNTIME_MODE = 'sync'  # 运行模式：'sync'（同步轮询）或 'async'（asyncio + socketio.AsyncClient，需要aiohttp）
+DATA_SEND_INTERVAL = 5  # 数据发送间隔（秒）
+ADAPTIVE_REPORTING = False  # 自适应上报：指标平稳时逐步拉长上报间隔，超过阈值时立即上报
+ADAPTIVE_MAX_INTERVAL = 60  # 自适应上报的最长间隔（秒）
+ADAPTIVE_BACKOFF_FACTOR = 1.5  # 指标平稳时每次上报后间隔的放大倍数
+ADAPTIVE_CPU_DELTA = 10  # CPU使用率变化超过此值（百分点）视为显著变化
+ADAPTIVE_RAM_DELTA = 5  # 内存使用率变化超过此值（百分点）视为显著变化
+ADAPTIVE_DISK_ALERT = 90  # 磁盘使用率达到此值（%）且继续增长时立即上报
+ADAPTIVE_NET_BURST = 1024 * 1024  # 网络速率变化超过此值（B/s）视为突发
+HEARTBEAT_INTERVAL = 30  # 心跳间隔（秒）
+RECONNECT_INTERVAL = 2  # 重连指数退避的基础间隔（秒）
+RECONNECT_MAX_INTERVAL = 120  # 重连退避间隔上限（秒）
+RECONNECT_FAST_DELAY = 1  # 曾经连接成功后断线，第一次重连前的随机等待上限（秒）
+MAX_RECONNECT_ATTEMPTS = 0  # 最大连续重连次数，0表示不限次数
+REGISTRATION_TIMEOUT = 10  # 注册确认超时（秒），超时后重新注册
+REPORT_MODE = 'full'  # 上报模式：'full'（每次完整数据）或 'delta'（注册后先发完整快照，之后只发变化字段，需服务端在注册确认中同意）
+REPORT_WIRE_FORMAT = 'json'  # 上报编码：'json'（兼容模式，带显示字符串）或 'binary'（注册时协商 msgpack/struct 二进制包，只发原始数值）
+REPORT_FULL_RESYNC_EVERY = 120  # delta模式下每隔多少次上报强制发送一次完整快照（0表示不强制）
+TCPING_MAX_CONCURRENCY = 8  # 同时执行的tcping探测数
+TCPING_MAX_QUEUE = 64  # 等待执行的tcping请求上限，超出后直接拒绝
+TCPING_REQUEST_DEADLINE = 15  # 单个tcping请求的默认截止时间（秒），可由请求中的 deadline_ms 覆盖
+TCPING_BATCH_MAX_TARGETS = 256  # 单个批量tcping请求的最大目标数
+TCPING_BATCH_TIMEOUT = 5  # 批量tcping的默认连接超时（秒），可由请求中的 timeout_ms 覆盖
+TCPING_MAX_LATENCY_MS = 500  # 延迟高于此值视为失败（毫秒），可由请求中的 max_latency_ms 覆盖
+TCPING_MAX_SAMPLES = 20  # 多次采样模式的最大采样次数（请求中的 count）
+TCPING_SAMPLE_INTERVAL_MS = 200  # 多次采样模式的默认采样间隔（毫秒），可由请求中的 interval_ms 覆盖
+TCPING_USE_EXTERNAL = False  # 是否使用外部tcping程序/tcping模块（兼容模式），默认使用内置探测引擎
+TCPING_DNS_CACHE_SIZE = 256  # tcping目标DNS缓存的最大条目数（LRU淘汰）
+TCPING_DNS_CACHE_TTL = 60  # tcping目标DNS缓存有效期（秒）
+FINGERPRINT_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.fingerprint_cache.json')  # 硬件/系统指纹缓存文件
+METRICS_BUFFER_SIZE = 720  # 离线指标环形缓冲容量（条），按5秒上报间隔约1小时
+METRICS_SPOOL_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.metrics_spool.bin')  # 缓冲满后溢出的离线指标文件
+METRICS_SPOOL_MAX_BYTES = 8 * 1024 * 1024  # 离线指标文件大小上限，超出后丢弃新溢出的样本
+BACKFILL_BATCH_SIZE = 60  # 重连后补发时每个 report_data_batch 的最大样本数
+BACKFILL_INTERVAL = 1.0  # 补发批次之间的最小间隔（秒）
+CLIENT_STATS_INTERVAL = 0  # 定期发送 client_stats 事件（采集耗时统计等）的间隔（秒），0表示只在服务端请求时发送
+CLIENT_STATS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.client_stats.json')  # 收到SIGUSR1时写入的统计文件
+PROFILE_WINDOW = 256  # 每个采集器保留的最近耗时样本数
+DISK_STATVFS_TIMEOUT = 2  # 单个挂载点statvfs的截止时间（秒），超时的挂载点标记为stale并沿用上次成功的值
+DISK_MOUNT_REFRESH_INTERVAL = 300  # 无法监听 /proc/self/mountinfo 的平台上挂载表的刷新间隔（秒）
+REPORT_PARTITIONS = True  # 上报数据中是否附带每个分区的使用情况（partitions字段）
+REPORT_DISK_IO = True  # 上报数据中是否附带块设备I/O指标（disk_io字段：吞吐、IOPS、队列深度、利用率、平均等待）
+NET_INTERFACE_INCLUDE = []  # 参与统计的网卡名通配模式（fnmatch），空表示全部网卡
+NET_INTERFACE_EXCLUDE = ['lo', 'docker*', 'veth*', 'br-*', 'virbr*', 'cni*', 'flannel*', 'cali*', 'ifb*']  # 不参与统计的网卡（回环、容器虚拟网卡和ifb镜像网卡，其流量已在物理网卡上计过一次）
+REPORT_PER_INTERFACE = True  # 上报数据中是否附带每个网卡的速率（interfaces字段）
+REPORT_PROCESSES = True  # 上报数据中是否附带CPU和内存占用最高的进程（processes字段）
+PROCESS_TOP_N = 5  # 按CPU、按内存各上报的进程数
+PROCESS_SCAN_BUDGET = 0.05  # 每次上报扫描进程允许消耗的CPU时间（秒），超出后下次从中断处继续
+PROCESS_CMDLINE_MAX = 256  # 上报的进程命令行最大长度（字符）
+LOG_LEVEL = 'INFO'  # 日志级别：DEBUG/INFO/WARNING/ERROR，逐次上报、tcping逐条结果等属于DEBUG
+LOG_FILE = None  # 日志文件路径，None表示只输出到标准输出；设置后按大小轮转
+LOG_MAX_BYTES = 5 * 1024 * 1024  # 单个日志文件大小上限（字节）
+LOG_BACKUP_COUNT = 3  # 保留的轮转日志文件数
+LOG_RATE_LIMIT_WINDOW = 60  # 同一条日志在此时间窗口内（秒）只输出一次，其余计数后在下次输出时汇总，0表示不限流
 
-# Network traffic statistics (for calculating rates)
-previous_net_io = None
-last_net_time = None
+# 每网卡网络速率采集器
+_network_collector = None
 
 # Prevent duplicate data sending
 # 这个变量将被移除，因为我们使用了更好的连接状态管理
@@ -44,9 +129,44 @@ sio = socketio.Client(
 # Cache system type detection results
 _cached_system_type = None
 
+# 共享的HTTP连接池会话
+_http_session = None
+_http_session_lock = threading.Lock()
+
+# /proc 快照引擎（Linux）及各派生指标的上一次计数
+_snapshot_engine = None
+_snapshot_engine_failed = False
+_cpu_fallback_rates = None
+
+# 后台CPU采样线程
+_cpu_sampler = None
+
+# 磁盘采集器（缓存挂载表，statvfs带超时）
+_disk_collector = None
+_disk_collector_lock = threading.Lock()
+_disk_io_collector = None
+_process_collector = None
+
+# tcping工作线程池
+_tcping_pool = None
+
+# 公网IP缓存（由后台解析线程维护，上报路径只读）
+_ip_cache = {'ipv4': None, 'ipv6': None, 'timestamp': 0, 'expires': 0}
+_ip_cache_lock = threading.Lock()
+_ip_refresh_event = threading.Event()
+_ip_resolver_thread = None
+
 # Cache CPU info (solution for Windows-specific issues)
 _cached_cpu_info = None
 
+# Linux CPU静态拓扑信息（/proc + /sys 解析结果，只解析一次）
+_linux_cpu_static = None
+_linux_cpufreq_paths = None
+
+# 静态硬件信息已就绪（来自磁盘指纹缓存或本次启动的首次检测）
+_fingerprint_ready = False
+FINGERPRINT_VERSION = 1
+
 # Global variables
 _system_type_cache = None
 _cpu_info_cache = None
@@ -58,6 +178,185 @@ _connection_stable = False
 _registration_confirmed = False
 _last_successful_data_send = 0
 
+# 日志：调用方只把记录放入队列，格式化和写出由后台监听线程完成
+log = logging.getLogger('bserver_client')
+_log_listener = None
+_log_lock = threading.Lock()
+
+
+class RateLimitFilter(logging.Filter):
+    """相同内容的日志在时间窗口内只放行一次
+
+    以 (级别, 格式化后的消息) 作为键，窗口内的重复记录被丢弃并计数，
+    窗口过后该消息再次出现时放行，并在末尾附上被抑制的次数。
+    断线重连、探测失败等循环路径上的日志因此不会刷屏。
+    """
+
+    def __init__(self, window=LOG_RATE_LIMIT_WINDOW, max_keys=1024):
+        super().__init__()
+        self.window = window
+        self.max_keys = max_keys
+        self._seen = OrderedDict()  # key -> [上次放行时间, 被抑制次数]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if not self.window or self.window <= 0:
+            return True
+        message = record.getMessage()
+        key = (record.levelno, message)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._seen.get(key)
+            if entry is not None and now - entry[0] < self.window:
+                entry[1] += 1
+                return False
+            suppressed = entry[1] if entry is not None else 0
+            self._seen[key] = [now, 0]
+            self._seen.move_to_end(key)
+            while len(self._seen) > self.max_keys:
+                self._seen.popitem(last=False)
+        if suppressed:
+            record.msg = f"{message} (suppressed {suppressed} repeats)"
+            record.args = None
+        return True
+
+
+def setup_logging(level=None, log_file=None):
+    """配置客户端日志（可重复调用，只生效一次）
+
+    记录经 QueueHandler 放入队列，由 QueueListener 线程写到标准输出，
+    配置了 LOG_FILE 时同时写入按大小轮转的日志文件。
+    """
+    global _log_listener
+    with _log_lock:
+        if _log_listener is not None:
+            return log
+        level = level or LOG_LEVEL
+        log_file = log_file if log_file is not None else LOG_FILE
+        formatter = logging.Formatter('%(asctime)s %(levelname)s %(message)s')
+        handlers = [logging.StreamHandler(sys.stdout)]
+        if log_file:
+            handlers.append(logging.handlers.RotatingFileHandler(
+                log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8'))
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        log_queue = queue.Queue(-1)
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.addFilter(RateLimitFilter(LOG_RATE_LIMIT_WINDOW))
+        for handler in list(log.handlers):
+            log.removeHandler(handler)
+        log.addHandler(queue_handler)
+        log.setLevel(level.upper() if isinstance(level, str) else level)
+        log.propagate = False
+
+        _log_listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _log_listener.start()
+        atexit.register(shutdown_logging)
+        return log
+
+
+def shutdown_logging():
+    """停止日志监听线程并写出队列中剩余的记录"""
+    global _log_listener
+    with _log_lock:
+        listener, _log_listener = _log_listener, None
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+    for handler in list(log.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            log.removeHandler(handler)
+
+
+def _get_http_session():
+    """获取共享的HTTP会话（带连接池），供元数据探测和IP查询复用"""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=0)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _http_session = session
+        return _http_session
+
+def _is_huawei_metadata(response):
+    """华为云元数据需要校验内容，OpenStack通用端点也会返回200"""
+    data = response.json()
+    return 'availability_zone' in data and 'huawei' in str(data).lower()
+
+# 云服务商元数据端点：(系统类型, URL, 请求头, 额外校验函数)
+CLOUD_METADATA_ENDPOINTS = [
+    ("AWS EC2", 'http://169.254.169.254/latest/meta-data/instance-id', None, None),
+    ("Azure VM", 'http://169.254.169.254/metadata/instance?api-version=2021-02-01', {'Metadata': 'true'}, None),
+    ("GCP VM", 'http://metadata.google.internal/computeMetadata/v1/instance/id', {'Metadata-Flavor': 'Google'}, None),
+    ("阿里云ECS", 'http://100.100.100.200/latest/meta-data/instance-id', None, None),
+    ("腾讯云CVM", 'http://metadata.tencentcloudapi.com/latest/meta-data/instance-id', None, None),
+    ("华为云ECS", 'http://169.254.169.254/openstack/latest/meta_data.json', None, _is_huawei_metadata),
+    ("Oracle Cloud", 'http://169.254.169.254/opc/v1/instance/', {'Authorization': 'Bearer Oracle'}, None),
+    ("DigitalOcean", 'http://169.254.169.254/metadata/v1/id', None, None),
+    ("Linode", 'http://169.254.169.254/linode/v1/instance', None, None),
+    ("Vultr", 'http://169.254.169.254/v1/instanceid', None, None),
+]
+
+def probe_cloud_metadata(endpoints=None, timeout=None, deadline=None, session=None):
+    """并发探测云元数据端点，按列表顺序取优先级最高的命中结果
+    
+    只有当所有更高优先级的端点都已失败时才返回命中；超过截止时间则返回已完成探测中
+    优先级最高的命中，全部失败返回None。endpoints/session 可替换为本地测试服务器和自定义会话。
+    """
+    endpoints = CLOUD_METADATA_ENDPOINTS if endpoints is None else endpoints
+    timeout = CLOUD_PROBE_TIMEOUT if timeout is None else timeout
+    deadline = CLOUD_PROBE_DEADLINE if deadline is None else deadline
+    session = session or _get_http_session()
+    if not endpoints:
+        return None
+    
+    def probe(endpoint):
+        system_type, url, headers, validator = endpoint
+        response = session.get(url, headers=headers, timeout=timeout, allow_redirects=False)
+        if response.status_code != 200:
+            return None
+        if validator is not None and not validator(response):
+            return None
+        return system_type
+    
+    executor = ThreadPoolExecutor(max_workers=len(endpoints), thread_name_prefix='cloud-probe')
+    futures = [executor.submit(probe, endpoint) for endpoint in endpoints]
+    index_of = {future: index for index, future in enumerate(futures)}
+    results = [None] * len(futures)  # None=未完成, False=失败, 字符串=命中
+    
+    def best_hit():
+        for result in results:
+            if result:
+                return result
+        return None
+    
+    try:
+        try:
+            for future in as_completed(futures, timeout=deadline):
+                try:
+                    results[index_of[future]] = future.result() or False
+                except Exception:
+                    results[index_of[future]] = False
+                # 第一个尚未失败的端点已命中时才返回，保证结果与响应快慢无关
+                for result in results:
+                    if result is None:
+                        break
+                    if result:
+                        return result
+            return None
+        except FuturesTimeoutError:
+            log.info(f"[Cloud] 云元数据探测超过截止时间 {deadline}s")
+            return best_hit()
+    finally:
+        # 取消尚未开始的探测，不等待仍在进行中的请求（兼容Python 3.9以下，手动取消）
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+
 def detect_system_type():
     """智能检测系统类型"""
     global _cached_system_type
@@ -67,7 +366,7 @@ def detect_system_type():
         return _cached_system_type
     
     try:
-        print("[INFO] 正在检测系统类型...")
+        log.info("[System] 正在检测系统类型...")
         system_type = "DS"  # 默认类型改为DS（物理机）
         systemd_virt_result = None  # 记录systemd-detect-virt的结果
         
@@ -78,12 +377,12 @@ def detect_system_type():
             if result.returncode == 0:
                 virt_type = result.stdout.strip().lower()
                 systemd_virt_result = virt_type  # 记录结果
-                print(f"[INFO] systemd-detect-virt 结果: '{virt_type}'")
+                log.info(f"[System] systemd-detect-virt 结果: '{virt_type}'")
                 
                 if virt_type == 'none':
                     # systemd-detect-virt 明确表示这是物理机，直接返回，不执行任何后续检测
                     _cached_system_type = "DS"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过systemd-detect-virt - 物理机，跳过所有其他检测)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过systemd-detect-virt - 物理机，跳过所有其他检测)")
                     return _cached_system_type
                 elif virt_type != '':
                     # 检测到虚拟化环境
@@ -112,79 +411,79 @@ def detect_system_type():
                         'podman': 'Podman'
                     }
                     _cached_system_type = virt_map.get(virt_type, virt_type.upper())
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过systemd-detect-virt)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过systemd-detect-virt)")
                     return _cached_system_type
         except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError) as e:
-            print(f"[INFO] systemd-detect-virt 不可用: {e}")
+            log.info(f"[System] systemd-detect-virt 不可用: {e}")
             systemd_virt_result = "unavailable"  # 标记为不可用
             pass
         
         # 如果systemd-detect-virt明确返回none，我们应该在上面已经返回了
         # 这里应该不会执行到，但为了安全起见再检查一次
         if systemd_virt_result == 'none':
-            print(f"[INFO] systemd-detect-virt 确认为物理机，强制返回DS")
+            log.info("[System] systemd-detect-virt 确认为物理机，强制返回DS")
             _cached_system_type = "DS"
             return _cached_system_type
         
         # 只有在systemd-detect-virt不可用或结果不明确时，才进行后续检测
-        print(f"[INFO] systemd-detect-virt 结果: {systemd_virt_result}，继续进行其他检测...")
+        log.info(f"[System] systemd-detect-virt 结果: {systemd_virt_result}，继续进行其他检测...")
         
         # 检测容器环境 - 使用更精确的方法
         # 1. 检查 /.dockerenv 文件（Docker特有）
         if os.path.exists('/.dockerenv'):
-            print(f"[DEBUG] 发现 /.dockerenv 文件")
+            log.debug("[System] 发现 /.dockerenv 文件")
             _cached_system_type = "Docker"
-            print(f"[INFO] 检测到系统类型: {_cached_system_type}")
+            log.info(f"[System] 检测到系统类型: {_cached_system_type}")
             return _cached_system_type
         
         # 2. 检查 /run/.containerenv 文件（Podman特有）
         if os.path.exists('/run/.containerenv'):
-            print(f"[DEBUG] 发现 /run/.containerenv 文件")
+            log.debug("[System] 发现 /run/.containerenv 文件")
             _cached_system_type = "Podman"
-            print(f"[INFO] 检测到系统类型: {_cached_system_type}")
+            log.info(f"[System] 检测到系统类型: {_cached_system_type}")
             return _cached_system_type
         
         # 3. 精确检查 /proc/1/cgroup 来检测容器
         try:
             with open('/proc/1/cgroup', 'r') as f:
                 cgroup_content = f.read()
-                print(f"[DEBUG] /proc/1/cgroup 内容样本: {cgroup_content[:200]}...")
+                log.debug(f"[System] /proc/1/cgroup 内容样本: {cgroup_content[:200]}...")
                 
                 # 检查是否在容器的cgroup中（更精确的判断）
                 lines = cgroup_content.strip().split('\n')
                 for line in lines:
                     if ':/docker/' in line or line.endswith('/docker'):
-                        print(f"[DEBUG] 发现Docker cgroup路径: {line}")
+                        log.debug(f"[System] 发现Docker cgroup路径: {line}")
                         _cached_system_type = "Docker"
-                        print(f"[INFO] 检测到系统类型: {_cached_system_type}")
+                        log.info(f"[System] 检测到系统类型: {_cached_system_type}")
                         return _cached_system_type
                     elif ':/lxc/' in line or line.endswith('/lxc'):
-                        print(f"[DEBUG] 发现LXC cgroup路径: {line}")
+                        log.debug(f"[System] 发现LXC cgroup路径: {line}")
                         _cached_system_type = "LXC"
-                        print(f"[INFO] 检测到系统类型: {_cached_system_type}")
+                        log.info(f"[System] 检测到系统类型: {_cached_system_type}")
                         return _cached_system_type
                     elif '/kubepods/' in line or 'k8s_' in line:
-                        print(f"[DEBUG] 发现Kubernetes cgroup路径: {line}")
+                        log.debug(f"[System] 发现Kubernetes cgroup路径: {line}")
                         _cached_system_type = "Kubernetes"
-                        print(f"[INFO] 检测到系统类型: {_cached_system_type}")
+                        log.info(f"[System] 检测到系统类型: {_cached_system_type}")
                         return _cached_system_type
                     elif ':/machine.slice/libpod-' in line or '/libpod-' in line:
-                        print(f"[DEBUG] 发现Podman cgroup路径: {line}")
+                        log.debug(f"[System] 发现Podman cgroup路径: {line}")
                         _cached_system_type = "Podman"
-                        print(f"[INFO] 检测到系统类型: {_cached_system_type}")
+                        log.info(f"[System] 检测到系统类型: {_cached_system_type}")
                         return _cached_system_type
                     elif '/containerd/' in line or 'containerd-' in line:
-                        print(f"[DEBUG] 发现Containerd cgroup路径: {line}")
+                        log.debug(f"[System] 发现Containerd cgroup路径: {line}")
                         _cached_system_type = "Containerd"
-                        print(f"[INFO] 检测到系统类型: {_cached_system_type}")
+                        log.info(f"[System] 检测到系统类型: {_cached_system_type}")
                         return _cached_system_type
                 
                 # 如果没有发现明确的容器路径，但包含容器关键词，需要更谨慎
                 # 避免误判：只有当路径明确指向容器时才判断为容器
-                print(f"[DEBUG] /proc/1/cgroup 检查完成，未发现明确的容器特征")
+                log.debug("[System] /proc/1/cgroup 检查完成，未发现明确的容器特征")
                 
         except (FileNotFoundError, PermissionError):
-            print(f"[DEBUG] 无法读取 /proc/1/cgroup")
+            log.debug("[System] 无法读取 /proc/1/cgroup")
             pass
         
         # 4. 检查容器环境变量
@@ -192,57 +491,57 @@ def detect_system_type():
             container_env_vars = ['CONTAINER', 'container', 'DOCKER_CONTAINER']
             for var in container_env_vars:
                 if var in os.environ:
-                    print(f"[DEBUG] 发现容器环境变量: {var}={os.environ.get(var)}")
+                    log.debug(f"[System] 发现容器环境变量: {var}={os.environ.get(var)}")
                     _cached_system_type = "Container"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type}")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type}")
                     return _cached_system_type
         except:
             pass
         
         # 容器检测完成，继续进行虚拟化检测
-        print(f"[INFO] 容器检测完成，继续进行虚拟化检测...")
+        log.info("[System] 容器检测完成，继续进行虚拟化检测...")
         
         # 检测虚拟化环境 - 通过DMI信息
         try:
             # 检查系统制造商
             with open('/sys/class/dmi/id/sys_vendor', 'r') as f:
                 vendor = f.read().strip().lower()
-                print(f"[DEBUG] sys_vendor: '{vendor}'")
+                log.debug(f"[System] sys_vendor: '{vendor}'")
                 if 'qemu' in vendor:
                     _cached_system_type = "QEMU"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过sys_vendor)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过sys_vendor)")
                     return _cached_system_type
                 elif 'vmware' in vendor:
                     _cached_system_type = "VMware"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过sys_vendor)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过sys_vendor)")
                     return _cached_system_type
                 elif 'microsoft corporation' in vendor:
                     _cached_system_type = "Hyper-V"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过sys_vendor)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过sys_vendor)")
                     return _cached_system_type
                 elif 'xen' in vendor:
                     _cached_system_type = "Xen"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过sys_vendor)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过sys_vendor)")
                     return _cached_system_type
                 elif 'parallels' in vendor:
                     _cached_system_type = "Parallels"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过sys_vendor)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过sys_vendor)")
                     return _cached_system_type
                 elif 'bochs' in vendor:
                     _cached_system_type = "Bochs"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过sys_vendor)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过sys_vendor)")
                     return _cached_system_type
                 elif 'nutanix' in vendor:
                     _cached_system_type = "Nutanix AHV"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过sys_vendor)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过sys_vendor)")
                     return _cached_system_type
                 elif 'red hat' in vendor:
                     _cached_system_type = "RHEV"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过sys_vendor)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过sys_vendor)")
                     return _cached_system_type
                 elif 'citrix' in vendor:
                     _cached_system_type = "Citrix Xen"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过sys_vendor)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过sys_vendor)")
                     return _cached_system_type
         except (FileNotFoundError, PermissionError):
             pass
@@ -251,58 +550,58 @@ def detect_system_type():
         try:
             with open('/sys/class/dmi/id/product_name', 'r') as f:
                 product = f.read().strip().lower()
-                print(f"[DEBUG] product_name: '{product}'")
+                log.debug(f"[System] product_name: '{product}'")
                 if 'virtualbox' in product:
                     _cached_system_type = "VirtualBox"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过product_name)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过product_name)")
                     return _cached_system_type
                 elif 'vmware' in product:
                     _cached_system_type = "VMware"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过product_name)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过product_name)")
                     return _cached_system_type
                 elif 'kvm' in product:
                     _cached_system_type = "KVM"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过product_name)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过product_name)")
                     return _cached_system_type
                 elif 'qemu' in product:
                     _cached_system_type = "QEMU"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过product_name)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过product_name)")
                     return _cached_system_type
                 elif 'hyper-v' in product or 'virtual machine' in product:
                     _cached_system_type = "Hyper-V"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过product_name)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过product_name)")
                     return _cached_system_type
                 elif 'bochs' in product:
                     _cached_system_type = "Bochs"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过product_name)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过product_name)")
                     return _cached_system_type
                 elif 'proxmox' in product:
                     _cached_system_type = "Proxmox VE"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过product_name)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过product_name)")
                     return _cached_system_type
                 elif 'openstack' in product:
                     _cached_system_type = "OpenStack"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过product_name)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过product_name)")
                     return _cached_system_type
                 elif 'ovirt' in product:
                     _cached_system_type = "oVirt"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过product_name)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过product_name)")
                     return _cached_system_type
                 elif 'cloudstack' in product:
                     _cached_system_type = "CloudStack"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过product_name)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过product_name)")
                     return _cached_system_type
                 elif 'eucalyptus' in product:
                     _cached_system_type = "Eucalyptus"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过product_name)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过product_name)")
                     return _cached_system_type
                 elif 'bhyve' in product:
                     _cached_system_type = "bhyve"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过product_name)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过product_name)")
                     return _cached_system_type
                 elif 'acrn' in product:
                     _cached_system_type = "ACRN"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过product_name)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过product_name)")
                     return _cached_system_type
         except (FileNotFoundError, PermissionError):
             pass
@@ -311,178 +610,69 @@ def detect_system_type():
         try:
             with open('/sys/class/dmi/id/bios_vendor', 'r') as f:
                 bios_vendor = f.read().strip().lower()
-                print(f"[DEBUG] bios_vendor: '{bios_vendor}'")
+                log.debug(f"[System] bios_vendor: '{bios_vendor}'")
                 if 'seabios' in bios_vendor:
                     _cached_system_type = "KVM"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过bios_vendor)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过bios_vendor)")
                     return _cached_system_type
                 elif 'vmware' in bios_vendor:
                     _cached_system_type = "VMware"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过bios_vendor)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过bios_vendor)")
                     return _cached_system_type
                 elif 'virtualbox' in bios_vendor:
                     _cached_system_type = "VirtualBox"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过bios_vendor)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过bios_vendor)")
                     return _cached_system_type
                 elif 'bochs' in bios_vendor:
                     _cached_system_type = "Bochs"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过bios_vendor)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过bios_vendor)")
                     return _cached_system_type
                 elif 'tianocore' in bios_vendor:
                     _cached_system_type = "UEFI VM"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过bios_vendor)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过bios_vendor)")
                     return _cached_system_type
         except (FileNotFoundError, PermissionError):
             pass
         
-        # 检测云服务商（使用更短的超时时间）
-        try:
-            # AWS检测
-            response = requests.get('http://169.254.169.254/latest/meta-data/instance-id', 
-                                  timeout=1)
-            if response.status_code == 200:
-                _cached_system_type = "AWS EC2"
-                print(f"[INFO] 检测到系统类型: {_cached_system_type}")
-                return _cached_system_type
-        except:
-            pass
-        
-        try:
-            # Azure检测
-            headers = {'Metadata': 'true'}
-            response = requests.get('http://169.254.169.254/metadata/instance?api-version=2021-02-01', 
-                                  headers=headers, timeout=1)
-            if response.status_code == 200:
-                _cached_system_type = "Azure VM"
-                print(f"[INFO] 检测到系统类型: {_cached_system_type}")
-                return _cached_system_type
-        except:
-            pass
-        
-        try:
-            # GCP检测
-            headers = {'Metadata-Flavor': 'Google'}
-            response = requests.get('http://metadata.google.internal/computeMetadata/v1/instance/id', 
-                                  headers=headers, timeout=1)
-            if response.status_code == 200:
-                _cached_system_type = "GCP VM"
-                print(f"[INFO] 检测到系统类型: {_cached_system_type}")
-                return _cached_system_type
-        except:
-            pass
-        
-        try:
-            # 阿里云检测
-            response = requests.get('http://100.100.100.200/latest/meta-data/instance-id', 
-                                  timeout=1)
-            if response.status_code == 200:
-                _cached_system_type = "阿里云ECS"
-                print(f"[INFO] 检测到系统类型: {_cached_system_type}")
-                return _cached_system_type
-        except:
-            pass
-        
-        try:
-            # 腾讯云检测
-            response = requests.get('http://metadata.tencentcloudapi.com/latest/meta-data/instance-id', 
-                                  timeout=1)
-            if response.status_code == 200:
-                _cached_system_type = "腾讯云CVM"
-                print(f"[INFO] 检测到系统类型: {_cached_system_type}")
-                return _cached_system_type
-        except:
-            pass
-        
-        try:
-            # 华为云检测
-            response = requests.get('http://169.254.169.254/openstack/latest/meta_data.json', 
-                                  timeout=1)
-            if response.status_code == 200:
-                data = response.json()
-                if 'availability_zone' in data and 'huawei' in str(data).lower():
-                    _cached_system_type = "华为云ECS"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type}")
-                    return _cached_system_type
-        except:
-            pass
-        
-        try:
-            # Oracle Cloud检测
-            headers = {'Authorization': 'Bearer Oracle'}
-            response = requests.get('http://169.254.169.254/opc/v1/instance/', 
-                                  headers=headers, timeout=1)
-            if response.status_code == 200:
-                _cached_system_type = "Oracle Cloud"
-                print(f"[INFO] 检测到系统类型: {_cached_system_type}")
-                return _cached_system_type
-        except:
-            pass
-        
-        try:
-            # DigitalOcean检测
-            response = requests.get('http://169.254.169.254/metadata/v1/id', 
-                                  timeout=1)
-            if response.status_code == 200:
-                _cached_system_type = "DigitalOcean"
-                print(f"[INFO] 检测到系统类型: {_cached_system_type}")
-                return _cached_system_type
-        except:
-            pass
-        
-        try:
-            # Linode检测
-            response = requests.get('http://169.254.169.254/linode/v1/instance', 
-                                  timeout=1)
-            if response.status_code == 200:
-                _cached_system_type = "Linode"
-                print(f"[INFO] 检测到系统类型: {_cached_system_type}")
-                return _cached_system_type
-        except:
-            pass
-        
-        try:
-            # Vultr检测
-            response = requests.get('http://169.254.169.254/v1/instanceid', 
-                                  timeout=1)
-            if response.status_code == 200:
-                _cached_system_type = "Vultr"
-                print(f"[INFO] 检测到系统类型: {_cached_system_type}")
-                return _cached_system_type
-        except:
-            pass
+        # 检测云服务商（并发探测所有元数据端点，取第一个命中的结果）
+        cloud_type = probe_cloud_metadata()
+        if cloud_type:
+            _cached_system_type = cloud_type
+            log.info(f"[System] 检测到系统类型: {_cached_system_type}")
+            return _cached_system_type
         
         # 检查CPU型号来推断虚拟化 - 只在DMI检测无结果时使用
         try:
             with open('/proc/cpuinfo', 'r') as f:
                 cpuinfo = f.read().lower()
-                print(f"[DEBUG] 检查 cpuinfo 中的虚拟化标识...")
+                log.debug("[System] 检查 cpuinfo 中的虚拟化标识...")
                 if 'qemu' in cpuinfo:
                     _cached_system_type = "QEMU"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过cpuinfo)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过cpuinfo)")
                     return _cached_system_type
                 elif 'kvm' in cpuinfo:
                     _cached_system_type = "KVM"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过cpuinfo)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过cpuinfo)")
                     return _cached_system_type
                 elif 'vmware' in cpuinfo:
                     _cached_system_type = "VMware"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过cpuinfo)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过cpuinfo)")
                     return _cached_system_type
                 elif 'virtualbox' in cpuinfo:
                     _cached_system_type = "VirtualBox"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过cpuinfo)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过cpuinfo)")
                     return _cached_system_type
                 elif 'xen' in cpuinfo:
                     _cached_system_type = "Xen"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过cpuinfo)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过cpuinfo)")
                     return _cached_system_type
                 elif 'bochs' in cpuinfo:
                     _cached_system_type = "Bochs"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过cpuinfo)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过cpuinfo)")
                     return _cached_system_type
                 elif 'bhyve' in cpuinfo:
                     _cached_system_type = "bhyve"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过cpuinfo)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过cpuinfo)")
                     return _cached_system_type
         except (FileNotFoundError, PermissionError):
             pass
@@ -491,12 +681,12 @@ def detect_system_type():
         # 注意：这里只检测虚拟化平台的接口，不检测容器接口
         try:
             interfaces = os.listdir('/sys/class/net/')
-            print(f"[DEBUG] 网络接口: {interfaces}")
+            log.debug(f"[System] 网络接口: {interfaces}")
             for iface in interfaces:
                 # 只检测明确的虚拟化平台接口，避免误判
                 if iface.startswith('vmbr'):
                     _cached_system_type = "Proxmox VE"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过网络接口)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过网络接口)")
                     return _cached_system_type
                 # 移除veth和docker接口检查，因为物理机安装Docker后也会有这些接口
         except:
@@ -509,18 +699,18 @@ def detect_system_type():
         try:
             with open('/sys/class/dmi/id/product_serial', 'r') as f:
                 serial = f.read().strip().lower()
-                print(f"[DEBUG] product_serial: '{serial}'")
+                log.debug(f"[System] product_serial: '{serial}'")
                 if serial.startswith('ec2'):
                     _cached_system_type = "AWS EC2"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过序列号)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过序列号)")
                     return _cached_system_type
                 elif 'google' in serial:
                     _cached_system_type = "GCP VM"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过序列号)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过序列号)")
                     return _cached_system_type
                 elif 'vmware' in serial:
                     _cached_system_type = "VMware"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (通过序列号)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (通过序列号)")
                     return _cached_system_type
         except (FileNotFoundError, PermissionError):
             pass
@@ -536,27 +726,27 @@ def detect_system_type():
                     
                     if 'virtualbox' in model or 'virtualbox' in manufacturer:
                         _cached_system_type = "VirtualBox"
-                        print(f"[INFO] 检测到系统类型: {_cached_system_type} (Windows WMI)")
+                        log.info(f"[System] 检测到系统类型: {_cached_system_type} (Windows WMI)")
                         return _cached_system_type
                     elif 'vmware' in model or 'vmware' in manufacturer:
                         _cached_system_type = "VMware"
-                        print(f"[INFO] 检测到系统类型: {_cached_system_type} (Windows WMI)")
+                        log.info(f"[System] 检测到系统类型: {_cached_system_type} (Windows WMI)")
                         return _cached_system_type
                     elif 'virtual machine' in model or 'microsoft corporation' in manufacturer:
                         _cached_system_type = "Hyper-V"
-                        print(f"[INFO] 检测到系统类型: {_cached_system_type} (Windows WMI)")
+                        log.info(f"[System] 检测到系统类型: {_cached_system_type} (Windows WMI)")
                         return _cached_system_type
                     elif 'parallels' in model or 'parallels' in manufacturer:
                         _cached_system_type = "Parallels"
-                        print(f"[INFO] 检测到系统类型: {_cached_system_type} (Windows WMI)")
+                        log.info(f"[System] 检测到系统类型: {_cached_system_type} (Windows WMI)")
                         return _cached_system_type
                     elif 'qemu' in model or 'qemu' in manufacturer:
                         _cached_system_type = "QEMU"
-                        print(f"[INFO] 检测到系统类型: {_cached_system_type} (Windows WMI)")
+                        log.info(f"[System] 检测到系统类型: {_cached_system_type} (Windows WMI)")
                         return _cached_system_type
                     elif 'bochs' in model or 'bochs' in manufacturer:
                         _cached_system_type = "Bochs"
-                        print(f"[INFO] 检测到系统类型: {_cached_system_type} (Windows WMI)")
+                        log.info(f"[System] 检测到系统类型: {_cached_system_type} (Windows WMI)")
                         return _cached_system_type
             except:
                 pass
@@ -571,19 +761,19 @@ def detect_system_type():
                     features = result.stdout.lower()
                     if 'hypervisor' in features:
                         _cached_system_type = "macOS VM"
-                        print(f"[INFO] 检测到系统类型: {_cached_system_type} (macOS sysctl)")
+                        log.info(f"[System] 检测到系统类型: {_cached_system_type} (macOS sysctl)")
                         return _cached_system_type
                 
                 # 检查Parallels
                 if os.path.exists('/Applications/Parallels Desktop.app'):
                     _cached_system_type = "Parallels"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (macOS)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (macOS)")
                     return _cached_system_type
                 
                 # 检查VMware Fusion
                 if os.path.exists('/Applications/VMware Fusion.app'):
                     _cached_system_type = "VMware Fusion"
-                    print(f"[INFO] 检测到系统类型: {_cached_system_type} (macOS)")
+                    log.info(f"[System] 检测到系统类型: {_cached_system_type} (macOS)")
                     return _cached_system_type
                     
             except:
@@ -591,56 +781,611 @@ def detect_system_type():
         
         # 如果都没有检测到，返回DS（物理机）
         _cached_system_type = system_type
-        print(f"[INFO] 检测到系统类型: {_cached_system_type} (默认)")
+        log.info(f"[System] 检测到系统类型: {_cached_system_type} (默认)")
         return _cached_system_type
         
     except Exception as e:
-        print(f"[WARN] Failed to detect system type: {e}")
+        log.warning(f"[System] ⚠️  Failed to detect system type: {e}")
         _cached_system_type = "未知类型"
         return _cached_system_type
 
-def get_all_disk_usage():
-    """获取所有挂载分区的磁盘使用情况总和"""
-    try:
-        total_size = 0
-        total_used = 0
-        total_free = 0
-        partitions_info = []
+class ProcFileReader:
+    """常驻文件描述符 + 预分配缓冲区，从偏移0反复读取同一个 /proc 文件"""
+    
+    def __init__(self, path, buffer_size=16384):
+        self._fd = os.open(path, os.O_RDONLY)
+        self._buffer = bytearray(buffer_size)
+    
+    def read(self):
+        """重新读取整个文件（os.preadv），缓冲区不足时自动扩容"""
+        while True:
+            size = os.preadv(self._fd, [self._buffer], 0)
+            if size < len(self._buffer):
+                return memoryview(self._buffer)[:size]
+            self._buffer = bytearray(len(self._buffer) * 2)
+    
+    def close(self):
+        if self._fd is not None:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = None
+
+class ProcSnapshotEngine:
+    """Linux /proc 单次快照引擎：每次上报只读取一遍 stat/meminfo/net/dev/loadavg/uptime/diskstats
+    
+    文件描述符在进程内常驻，读取复用预分配的缓冲区（os.preadv），所有派生指标都来自同一个快照。
+    """
+    
+    FILES = ('stat', 'meminfo', 'net/dev', 'loadavg', 'uptime')
+    OPTIONAL_FILES = ('diskstats',)  # 部分容器环境不提供，缺失时快照中没有对应字段
+    
+    def __init__(self, proc_root='/proc', buffer_size=16384):
+        self._lock = threading.Lock()
+        self._readers = {}
+        try:
+            for name in self.FILES:
+                self._readers[name] = ProcFileReader(os.path.join(proc_root, name), buffer_size)
+        except OSError:
+            self.close()
+            raise
+        for name in self.OPTIONAL_FILES:
+            try:
+                self._readers[name] = ProcFileReader(os.path.join(proc_root, name), buffer_size)
+            except OSError:
+                pass
+        self.current = None
+    
+    def close(self):
+        """关闭常驻的文件描述符"""
+        for reader in self._readers.values():
+            reader.close()
+        self._readers = {}
+    
+    def _read(self, name):
+        return self._readers[name].read()
+    
+    def capture(self):
+        """读取所有 /proc 文件并生成新的快照"""
+        with self._lock:
+            timestamp_ns = time.monotonic_ns()
+            snapshot = {
+                'timestamp': timestamp_ns / 1e9,
+                'timestamp_ns': timestamp_ns,
+                'wall_time': time.time()
+            }
+            snapshot.update(_parse_proc_stat(self._read('stat')))
+            snapshot['meminfo'] = _parse_proc_meminfo(self._read('meminfo'))
+            snapshot['net'] = _parse_proc_net_dev(self._read('net/dev'))
+            snapshot['loadavg'] = tuple(float(x) for x in bytes(self._read('loadavg')).split()[:3])
+            snapshot['uptime'] = float(bytes(self._read('uptime')).split()[0])
+            if 'diskstats' in self._readers:
+                snapshot['diskstats'] = _parse_proc_diskstats(self._read('diskstats'))
+            self.current = snapshot
+            return snapshot
+
+RateSample = namedtuple('RateSample', ['delta', 'elapsed', 'rate'])
+
+def _counter_delta(previous, current):
+    """累计计数器的增量；计数器回绕（32位或64位）时按回绕计算，其他回退（计数器重置）返回None
+    
+    只有上次读数位于该位宽上半区时才认为是回绕，较小的计数器变小视为重置（网卡重建、设备重新挂载等）。
+    """
+    if current >= previous:
+        return current - previous
+    for bits in (32, 64):
+        limit = 1 << bits
+        if limit >> 1 <= previous < limit:
+            return current + limit - previous
+    return None
+
+class RateEngine:
+    """累计计数器的速率计算：网络、磁盘I/O、CPU节拍共用
+    
+    每个计数器用一个键标识，时间取 time.monotonic_ns()，不受NTP校时影响。计数器第一次出现或被重置时
+    返回None并重新建立基准；回绕按位宽补齐。RATE_EWMA_TAU 大于0时按时间常数做EWMA平滑，
+    采样间隔不固定（自适应上报）时平滑程度仍然一致。
+    """
+    
+    def __init__(self, tau=None):
+        self.tau = RATE_EWMA_TAU if tau is None else tau
+        self._state = {}  # key -> [timestamp_ns, 计数值, 平滑后的速率]
+        self.stats = {'resets': 0, 'wraps': 0}
+    
+    def update(self, key, value, timestamp_ns):
+        """输入计数器的新读数，返回 RateSample(增量, 间隔秒数, 每秒速率)，无法计算时返回None"""
+        state = self._state.get(key)
+        if state is None:
+            self._state[key] = [timestamp_ns, value, None]
+            return None
+        elapsed_ns = timestamp_ns - state[0]
+        if elapsed_ns <= 0:
+            return None
+        delta = _counter_delta(state[1], value)
+        if delta is None:
+            self.stats['resets'] += 1
+            self._state[key] = [timestamp_ns, value, None]
+            return None
+        if value < state[1]:
+            self.stats['wraps'] += 1
         
-        # 获取所有挂载分区
-        partitions = psutil.disk_partitions()
+        elapsed = elapsed_ns / 1e9
+        rate = delta / elapsed
+        if self.tau > 0 and state[2] is not None:
+            rate = state[2] + (1 - math.exp(-elapsed / self.tau)) * (rate - state[2])
+        state[0], state[1], state[2] = timestamp_ns, value, rate
+        return RateSample(delta, elapsed, rate)
+    
+    def retain(self, keys):
+        """只保留给定的计数器，消失的网卡/设备不再占用内存"""
+        keys = set(keys)
+        for key in [key for key in self._state if key not in keys]:
+            del self._state[key]
+    
+    def clear(self):
+        self._state.clear()
+
+def _cpu_percent_from_ticks(engine, key, total, idle, timestamp_ns):
+    """根据CPU总节拍和空闲节拍计算使用率（%），无法计算时返回None"""
+    total_rate = engine.update((key, 'total'), total, timestamp_ns)
+    idle_rate = engine.update((key, 'idle'), idle, timestamp_ns)
+    if total_rate is None or idle_rate is None or total_rate.rate <= 0:
+        return None
+    return max(0.0, min(100.0, (1 - idle_rate.rate / total_rate.rate) * 100))
+
+class CpuSampler:
+    """后台CPU采样线程：按固定节奏计算汇总及每核使用率，上报路径直接读取最新值
+    
+    Linux读取 /proc/stat 节拍差值，其他平台使用非阻塞的 psutil.cpu_percent(percpu=True)。
+    """
+    
+    def __init__(self, interval=None, proc_root='/proc'):
+        self.interval = CPU_SAMPLE_INTERVAL if interval is None else interval
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._rates = RateEngine()
+        self._psutil_primed = False
+        self._aggregate = None
+        self._per_core = []
+        self._reader = None
+        if platform.system() == 'Linux':
+            try:
+                self._reader = ProcFileReader(os.path.join(proc_root, 'stat'))
+            except (OSError, AttributeError) as e:
+                log.info(f"[CPU] /proc/stat unavailable for sampler, using psutil: {e}")
+    
+    def sample_once(self):
+        """采样一次并更新最新值"""
+        if self._reader is not None:
+            stat = _parse_proc_stat(self._reader.read())
+            timestamp_ns = time.monotonic_ns()
+            current = [(stat['cpu_total'], stat['cpu_idle'])] + stat['per_cpu']
+            percents = [_cpu_percent_from_ticks(self._rates, index, total, idle, timestamp_ns)
+                        for index, (total, idle) in enumerate(current)]
+            if percents[0] is None:
+                return
+            aggregate = percents[0]
+            per_core = [0.0 if percent is None else percent for percent in percents[1:]]
+        else:
+            per_core = psutil.cpu_percent(interval=None, percpu=True)
+            if not self._psutil_primed:
+                # psutil第一次调用只建立基准
+                self._psutil_primed = True
+                return
+            aggregate = sum(per_core) / len(per_core) if per_core else 0.0
         
-        for partition in partitions:
+        with self._lock:
+            self._aggregate = aggregate
+            self._per_core = per_core
+    
+    def latest(self):
+        """返回 (汇总使用率, 每核使用率列表)，尚无数据时返回 (None, [])"""
+        with self._lock:
+            return self._aggregate, list(self._per_core)
+    
+    def _run(self):
+        while not self._stop_event.is_set():
             try:
-                # 跳过某些特殊的文件系统类型
-                if partition.fstype in ['', 'squashfs', 'tmpfs', 'devtmpfs', 'proc', 'sysfs', 'devpts', 'cgroup', 'cgroup2', 'pstore', 'bpf', 'autofs']:
-                    continue
-                
-                # 跳过某些特殊的挂载点
-                if partition.mountpoint in ['/dev', '/proc', '/sys', '/run', '/boot/efi', '/run/lock', '/run/shm', '/run/user']:
-                    continue
-                
-                # 获取分区使用情况
-                disk_usage = psutil.disk_usage(partition.mountpoint)
-                
-                # 累加到总量
-                total_size += disk_usage.total
-                total_used += disk_usage.used
-                total_free += disk_usage.free
+                self.sample_once()
+            except Exception as e:
+                log.warning(f"[CPU] Sampler error: {e}")
+            self._stop_event.wait(self.interval)
+    
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='cpu-sampler', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stop_event.set()
+        if self._reader is not None:
+            if self._thread is not None:
+                self._thread.join(timeout=self.interval + 1)
+            self._reader.close()
+
+class MetricWindow:
+    """定长采样窗口：array('d') 环形存储最近 size 个采样点"""
+    
+    def __init__(self, size):
+        self.size = max(1, int(size))
+        self._values = array('d', bytes(8 * self.size))
+        self._next = 0
+        self._count = 0
+    
+    def add(self, value):
+        self._values[self._next] = value
+        self._next = (self._next + 1) % self.size
+        self._count = min(self._count + 1, self.size)
+    
+    def summary(self):
+        """返回窗口内的 {'min', 'max', 'avg', 'last', 'count'}，没有采样点时返回None"""
+        if not self._count:
+            return None
+        last_index = (self._next - 1) % self.size
+        if self._count == self.size:
+            values = self._values
+        else:
+            values = self._values[last_index - self._count + 1:last_index + 1]
+        return {
+            'min': round(min(values), 2),
+            'max': round(max(values), 2),
+            'avg': round(sum(values) / self._count, 2),
+            'last': round(self._values[last_index], 2),
+            'count': self._count
+        }
+    
+    def clear(self):
+        self._next = 0
+        self._count = 0
+
+class MetricsSampler(CpuSampler):
+    """高频采样线程：在CPU采样的基础上同时采样网络收发速率，写入各指标的定长窗口
+    
+    采样与上报解耦：上报时调用 drain_stats() 取得自上次上报以来各指标的 min/max/avg/last 并清空窗口。
+    """
+    
+    METRICS = ('cpu', 'net_in', 'net_out')
+    
+    def __init__(self, interval=None, proc_root='/proc', window_size=None):
+        super().__init__(interval=interval, proc_root=proc_root)
+        self.window_size = SAMPLE_WINDOW_SIZE if window_size is None else window_size
+        self._windows = {name: MetricWindow(self.window_size) for name in self.METRICS}
+        self._net_reader = None
+        self._net_source = None
+        if self._reader is not None:
+            try:
+                self._net_reader = ProcFileReader(os.path.join(proc_root, 'net', 'dev'))
+                self._net_source = 'proc'
+            except OSError as e:
+                log.info(f"[CPU] /proc/net/dev unavailable for sampler: {e}")
+        else:
+            self._net_source = 'psutil'
+    
+    def _read_net_totals(self):
+        if self._net_source == 'proc':
+            return _net_totals_from_snapshot({'net': _parse_proc_net_dev(self._net_reader.read())})
+        if self._net_source == 'psutil':
+            return _net_totals_from_counters(_net_counters_from_psutil())
+        return None
+    
+    def sample_once(self):
+        super().sample_once()
+        totals = self._read_net_totals()
+        rates = None
+        if totals is not None:
+            now = time.monotonic_ns()
+            rate_in = self._rates.update('net_in', totals.bytes_recv, now)
+            rate_out = self._rates.update('net_out', totals.bytes_sent, now)
+            if rate_in is not None and rate_out is not None:
+                rates = (rate_in.rate, rate_out.rate)
+        
+        with self._lock:
+            if self._aggregate is not None:
+                self._windows['cpu'].add(self._aggregate)
+            if rates is not None:
+                self._windows['net_in'].add(rates[0])
+                self._windows['net_out'].add(rates[1])
+    
+    def latest_values(self):
+        """返回各指标最新的采样值"""
+        with self._lock:
+            values = {}
+            for name, window in self._windows.items():
+                summary = window.summary()
+                if summary is not None:
+                    values[name] = summary['last']
+            return values
+    
+    def drain_stats(self):
+        """返回自上次调用以来各指标的统计 {指标: {'min', 'max', 'avg', 'last', 'count'}} 并清空窗口"""
+        with self._lock:
+            stats = {}
+            for name, window in self._windows.items():
+                summary = window.summary()
+                if summary is not None:
+                    stats[name] = summary
+                window.clear()
+            return stats
+    
+    def stop(self):
+        super().stop()
+        if self._net_reader is not None:
+            self._net_reader.close()
+
+def start_cpu_sampler():
+    """启动全局高频采样线程（CPU及网络速率，幂等）"""
+    global _cpu_sampler
+    if _cpu_sampler is None:
+        _cpu_sampler = MetricsSampler()
+    _cpu_sampler.start()
+    return _cpu_sampler
+
+def get_sampled_latest():
+    """高频采样窗口中各指标的最新值 {'cpu', 'net_in', 'net_out'}，没有数据的指标不返回"""
+    if _cpu_sampler is None or not hasattr(_cpu_sampler, 'latest_values'):
+        return {}
+    return _cpu_sampler.latest_values()
+
+def drain_sample_stats():
+    """取得高频采样窗口的统计并清空，采样线程未启动时返回空字典"""
+    if _cpu_sampler is None or not hasattr(_cpu_sampler, 'drain_stats'):
+        return {}
+    return _cpu_sampler.drain_stats()
+
+def get_sampled_cpu():
+    """读取采样线程的最新结果 (汇总, 每核)，采样线程未启动或尚无数据时返回 (None, [])"""
+    if _cpu_sampler is None:
+        return None, []
+    return _cpu_sampler.latest()
+
+def _parse_proc_stat(data):
+    """解析 /proc/stat：汇总及每核CPU的(总时间, 空闲时间)节拍数"""
+    cpu_total = cpu_idle = 0
+    per_cpu = []
+    boot_time = None
+    for line in bytes(data).split(b'\n'):
+        if line.startswith(b'cpu'):
+            fields = line.split()
+            # user nice system idle iowait irq softirq steal（guest已包含在user中）
+            values = [int(x) for x in fields[1:9]]
+            total = sum(values)
+            idle = values[3] + (values[4] if len(values) > 4 else 0)
+            if fields[0] == b'cpu':
+                cpu_total, cpu_idle = total, idle
+            else:
+                per_cpu.append((total, idle))
+        elif line.startswith(b'btime'):
+            boot_time = int(line.split()[1])
+    return {'cpu_total': cpu_total, 'cpu_idle': cpu_idle, 'per_cpu': per_cpu, 'boot_time': boot_time}
+
+def _parse_proc_meminfo(data):
+    """解析 /proc/meminfo，返回字节数字典"""
+    meminfo = {}
+    for line in bytes(data).split(b'\n'):
+        fields = line.split()
+        if len(fields) >= 2:
+            value = int(fields[1])
+            if len(fields) >= 3 and fields[2] == b'kB':
+                value *= 1024
+            meminfo[fields[0].rstrip(b':').decode()] = value
+    return meminfo
+
+def _parse_proc_net_dev(data):
+    """解析 /proc/net/dev，返回 {网卡: (rx_bytes, rx_packets, rx_errs, rx_drop, tx_bytes, tx_packets, tx_errs, tx_drop)}"""
+    interfaces = {}
+    for line in bytes(data).split(b'\n')[2:]:
+        if b':' not in line:
+            continue
+        name, counters = line.split(b':', 1)
+        fields = counters.split()
+        if len(fields) < 16:
+            continue
+        values = [int(x) for x in fields]
+        interfaces[name.strip().decode()] = (values[0], values[1], values[2], values[3],
+                                             values[8], values[9], values[10], values[11])
+    return interfaces
+
+DiskStat = namedtuple('DiskStat', ['reads', 'read_sectors', 'read_ms', 'writes', 'write_sectors', 'write_ms',
+                                   'in_flight', 'io_ms', 'weighted_ms'])
+
+def _parse_proc_diskstats(data):
+    """解析 /proc/diskstats，返回 {设备名: DiskStat}"""
+    devices = {}
+    for line in bytes(data).split(b'\n'):
+        fields = line.split()
+        if len(fields) < 14:
+            continue
+        values = [int(x) for x in fields[3:14]]
+        # reads merged(1) 和 writes merged(5) 不需要
+        devices[fields[2].decode()] = DiskStat(values[0], values[2], values[3], values[4], values[6], values[7],
+                                               values[8], values[9], values[10])
+    return devices
+
+def get_snapshot_engine():
+    """获取 /proc 快照引擎，非Linux或不可用时返回None（调用方回退到psutil）"""
+    global _snapshot_engine, _snapshot_engine_failed
+    if _snapshot_engine is None and not _snapshot_engine_failed:
+        if platform.system() != 'Linux':
+            _snapshot_engine_failed = True
+            return None
+        try:
+            _snapshot_engine = ProcSnapshotEngine()
+        except (OSError, AttributeError) as e:
+            log.info(f"[Snapshot] /proc snapshot engine unavailable, using psutil: {e}")
+            _snapshot_engine_failed = True
+    return _snapshot_engine
+
+def capture_proc_snapshot():
+    """为本次上报采集一个新的 /proc 快照"""
+    engine = get_snapshot_engine()
+    if engine is None:
+        return None
+    try:
+        return engine.capture()
+    except (OSError, ValueError, IndexError) as e:
+        log.warning(f"[Snapshot] Failed to capture /proc snapshot: {e}")
+        _collector_profiler.record_fallback('proc_snapshot')
+        return None
+
+def _current_proc_snapshot(max_age=1.0):
+    """返回当前快照；本次上报已采集则直接复用，过旧时重新采集"""
+    engine = get_snapshot_engine()
+    if engine is None:
+        return None
+    snapshot = engine.current
+    if snapshot is None or time.monotonic() - snapshot['timestamp'] > max_age:
+        snapshot = capture_proc_snapshot()
+    return snapshot
+
+DISK_SKIP_FSTYPES = frozenset(['', 'squashfs', 'tmpfs', 'devtmpfs', 'proc', 'sysfs', 'devpts', 'cgroup', 'cgroup2', 'pstore', 'bpf', 'autofs'])
+DISK_SKIP_MOUNTPOINTS = frozenset(['/dev', '/proc', '/sys', '/run', '/boot/efi', '/run/lock', '/run/shm', '/run/user'])
+
+DiskMount = namedtuple('DiskMount', ['device', 'mountpoint', 'fstype'])
+
+def _filter_disk_partitions(partitions):
+    """过滤掉伪文件系统和系统挂载点"""
+    return [DiskMount(p.device, p.mountpoint, p.fstype) for p in partitions
+            if p.fstype not in DISK_SKIP_FSTYPES and p.mountpoint not in DISK_SKIP_MOUNTPOINTS]
+
+class DiskCollector:
+    """磁盘使用率采集器
+    
+    过滤后的挂载表只在变化时重建：Linux上 poll /proc/self/mountinfo（挂载/卸载时内核置 POLLPRI），
+    其他平台按 DISK_MOUNT_REFRESH_INTERVAL 刷新。每次statvfs在独立的短生命周期线程中执行，
+    截止时间从该挂载点的查询开始时计算，挂载点之间互不排队。超时的挂载点标记为stale并沿用上次成功的值，
+    卡住的线程留着等待内核返回，完成前不会为该挂载点再启动查询，也不再占用后续上报的等待时间。
+    因此一台NFS服务器失联带走多个挂载点时，本地磁盘仍能按时采集。
+    """
+    
+    def __init__(self, timeout=None, refresh_interval=None,
+                 mountinfo_path='/proc/self/mountinfo', partitions_fn=None, usage_fn=None):
+        self.timeout = DISK_STATVFS_TIMEOUT if timeout is None else timeout
+        self.refresh_interval = DISK_MOUNT_REFRESH_INTERVAL if refresh_interval is None else refresh_interval
+        self._partitions_fn = partitions_fn or psutil.disk_partitions
+        self._usage_fn = usage_fn or psutil.disk_usage
+        self._lock = threading.Lock()
+        self._mounts = None
+        self._mounts_refreshed_at = 0
+        self._pending = {}  # mountpoint -> (查询开始时间, statvfs Future)，完成并取走结果后删除
+        self._last_good = {}  # mountpoint -> 上次成功的 disk_usage 结果
+        self._mountinfo = None
+        self._poller = None
+        self.stats = {'mount_refreshes': 0, 'timeouts': 0, 'errors': 0}
+        self._watch_mountinfo(mountinfo_path)
+    
+    def _watch_mountinfo(self, path):
+        if not path or not hasattr(select, 'poll'):
+            return
+        try:
+            self._mountinfo = open(path, 'rb')
+            self._poller = select.poll()
+            self._poller.register(self._mountinfo.fileno(), select.POLLPRI | select.POLLERR)
+        except OSError:
+            self._close_mountinfo()
+    
+    def _close_mountinfo(self):
+        if self._mountinfo is not None:
+            self._mountinfo.close()
+        self._mountinfo = None
+        self._poller = None
+    
+    def mount_table_changed(self):
+        """挂载表自上次刷新后是否可能发生了变化"""
+        if self._mounts is None:
+            return True
+        if self._poller is not None:
+            try:
+                return bool(self._poller.poll(0))
+            except OSError:
+                self._close_mountinfo()
+        return time.monotonic() - self._mounts_refreshed_at >= self.refresh_interval
+    
+    def mounts(self):
+        """返回过滤后的挂载表，仅在变化时重新读取"""
+        if self.mount_table_changed():
+            mounts = _filter_disk_partitions(self._partitions_fn())
+            current = {mount.mountpoint for mount in mounts}
+            for mountpoint in list(self._last_good):
+                if mountpoint not in current:
+                    del self._last_good[mountpoint]
+            for mountpoint in list(self._pending):
+                if mountpoint not in current:
+                    del self._pending[mountpoint]
+            self._mounts = mounts
+            self._mounts_refreshed_at = time.monotonic()
+            self.stats['mount_refreshes'] += 1
+            log.debug(f"[Disk] Mount table refreshed: {len(mounts)} mounts")
+        return self._mounts
+    
+    def _start_query(self, mountpoint):
+        """在新的守护线程中执行一次statvfs，返回 (开始时间, Future)"""
+        future = Future()
+        future.set_running_or_notify_cancel()
+        
+        def run():
+            try:
+                future.set_result(self._usage_fn(mountpoint))
+            except BaseException as e:
+                future.set_exception(e)
+        
+        started = time.monotonic()
+        threading.Thread(target=run, name=f'statvfs:{mountpoint}', daemon=True).start()
+        return started, future
+    
+    def collect(self):
+        """采集所有挂载点，返回 get_all_disk_usage() 格式的结果（附带 partitions 列表）"""
+        with self._lock:
+            mounts = self.mounts()
+            
+            # 只为没有进行中查询的挂载点启动statvfs，并只等待本次新启动的查询
+            fresh = []
+            for mount in mounts:
+                if mount.mountpoint not in self._pending:
+                    self._pending[mount.mountpoint] = self._start_query(mount.mountpoint)
+                    fresh.append(self._pending[mount.mountpoint])
+            for started, future in fresh:
+                futures_wait([future], timeout=max(0.0, started + self.timeout - time.monotonic()))
+            
+            total_size = total_used = total_free = 0
+            partitions = []
+            for mount in mounts:
+                future = self._pending[mount.mountpoint][1]
+                stale = not future.done()
+                if stale:
+                    usage = self._last_good.get(mount.mountpoint)
+                    self.stats['timeouts'] += 1
+                    log.warning(f"[Disk] ⚠️  statvfs on {mount.mountpoint} did not finish in {self.timeout}s, reporting last known value")
+                else:
+                    del self._pending[mount.mountpoint]
+                    try:
+                        usage = future.result()
+                    except OSError:
+                        # 某些分区可能没有权限访问或者已不存在，跳过
+                        self.stats['errors'] += 1
+                        self._last_good.pop(mount.mountpoint, None)
+                        continue
+                    self._last_good[mount.mountpoint] = usage
                 
-                # 记录分区信息（用于调试）
-                partitions_info.append({
-                    'device': partition.device,
-                    'mountpoint': partition.mountpoint,
-                    'fstype': partition.fstype,
-                    'size_gb': round(disk_usage.total / (1024**3), 2),
-                    'used_gb': round(disk_usage.used / (1024**3), 2),
-                    'percent': round((disk_usage.used / disk_usage.total) * 100, 1) if disk_usage.total > 0 else 0
+                total = usage.total if usage is not None else 0
+                used = usage.used if usage is not None else 0
+                free = usage.free if usage is not None else 0
+                total_size += total
+                total_used += used
+                total_free += free
+                partitions.append({
+                    'device': mount.device,
+                    'mountpoint': mount.mountpoint,
+                    'fstype': mount.fstype,
+                    'total': total,
+                    'used': used,
+                    'free': free,
+                    'percent': round((used / total) * 100, 1) if total > 0 else 0,
+                    'stale': stale
                 })
-                
-            except (PermissionError, OSError, FileNotFoundError):
-                # 某些分区可能没有权限访问或者不存在，跳过
-                continue
         
         # 计算总体使用率
         total_percent = round((total_used / total_size) * 100, 1) if total_size > 0 else 0
@@ -650,12 +1395,31 @@ def get_all_disk_usage():
             'total_used': total_used,
             'total_free': total_free,
             'percent': total_percent,
-            'partitions_count': len(partitions_info),
+            'partitions_count': len(partitions),
+            'partitions': partitions,
+            'stale_count': sum(1 for partition in partitions if partition['stale']),
             'detail': f"{total_used/(1024**3):.2f} GiB / {total_size/(1024**3):.2f} GiB"
         }
+    
+    def close(self):
+        self._close_mountinfo()
+
+def get_disk_collector():
+    """获取全局磁盘采集器"""
+    global _disk_collector
+    with _disk_collector_lock:
+        if _disk_collector is None:
+            _disk_collector = DiskCollector()
+        return _disk_collector
+
+def get_all_disk_usage():
+    """获取所有挂载分区的磁盘使用情况总和"""
+    try:
+        return get_disk_collector().collect()
         
     except Exception as e:
-        print(f"[Disk] Error getting disk usage: {e}")
+        log.warning(f"[Disk] Error getting disk usage: {e}")
+        _collector_profiler.record_fallback('disk')
         # 如果出错，回退到根分区
         try:
             disk = psutil.disk_usage('/')
@@ -665,76 +1429,540 @@ def get_all_disk_usage():
                 'total_free': disk.free,
                 'percent': round((disk.used / disk.total) * 100, 1),
                 'partitions_count': 1,
+                'partitions': [],
+                'stale_count': 0,
                 'detail': f"{disk.used/(1024**3):.2f} GiB / {disk.total/(1024**3):.2f} GiB"
             }
-        except:
+        except Exception:
+            _collector_profiler.record_error('disk')
             return {
                 'total_size': 0,
                 'total_used': 0,
                 'total_free': 0,
                 'percent': 0,
                 'partitions_count': 0,
+                'partitions': [],
+                'stale_count': 0,
                 'detail': "0 GiB / 0 GiB"
             }
 
-def get_cpu_usage():
-    """获取更精确的CPU使用率 - 性能优化版本"""
-    try:
-        # 使用非阻塞方式获取CPU使用率
-        # 第一次调用初始化，返回值可能不准确
-        cpu_percent = psutil.cpu_percent(interval=None)
-        
-        # 如果是第一次调用或者返回0，使用短间隔采样
-        if cpu_percent == 0.0:
-            cpu_percent = psutil.cpu_percent(interval=0.1)
-        
-        return int(round(cpu_percent))
-    except:
+DISKSTATS_SECTOR_SIZE = 512  # /proc/diskstats 中的扇区数固定按512字节计
+_DISK_IO_SKIP_RE = re.compile(r'^(loop|ram|zram)\d+$')
+_DISK_PARTITION_RE = re.compile(r'^((sd|vd|xvd|hd)[a-z]+\d+|(nvme\d+n\d+|mmcblk\d+|nbd\d+)p\d+)$')
+
+def _classify_block_device(name, sys_block='/sys/block'):
+    """块设备分类：None（跳过：分区、loop、ram）、'physical'（物理盘）、'virtual'（dm/md等叠加在其他设备上的设备）
+    
+    有 /sys/block 时以其为准：分区不在 /sys/block 下，有 slaves 的设备是叠加设备。
+    汇总只统计物理盘，避免LVM/RAID上的I/O被计算两次。
+    """
+    if _DISK_IO_SKIP_RE.match(name):
+        return None
+    if sys_block and os.path.isdir(sys_block):
+        path = os.path.join(sys_block, name.replace('/', '!'))
+        if not os.path.isdir(path):
+            return None
         try:
-            # 备用方法：使用较短的间隔
-            return int(psutil.cpu_percent(interval=0.5))
-        except:
-            return 0
+            return 'virtual' if os.listdir(os.path.join(path, 'slaves')) else 'physical'
+        except OSError:
+            return 'physical'
+    if _DISK_PARTITION_RE.match(name):
+        return None
+    return 'physical'
 
-def get_memory_info():
-    """获取更详细的内存信息"""
-    try:
-        memory = psutil.virtual_memory()
-        swap = psutil.swap_memory()
+def _disk_stats_from_psutil():
+    """非Linux平台：psutil.disk_io_counters(perdisk=True) 转换为 {设备名: DiskStat}"""
+    counters = psutil.disk_io_counters(perdisk=True) or {}
+    return {
+        name: DiskStat(c.read_count, c.read_bytes // DISKSTATS_SECTOR_SIZE, c.read_time,
+                       c.write_count, c.write_bytes // DISKSTATS_SECTOR_SIZE, c.write_time,
+                       0, getattr(c, 'busy_time', 0), 0)
+        for name, c in counters.items()
+    }
+
+class DiskIOCollector:
+    """块设备I/O指标：根据 /proc/diskstats 计数器计算每个设备及物理盘汇总的速率
+    
+    每个设备输出读写吞吐（B/s）、IOPS、平均队列深度、利用率（%）和平均等待（毫秒）。
+    分区、loop、ram（含zram）设备不统计；速率由 RateEngine 计算，某个计数器被重置的那一次该设备不输出。
+    """
+    
+    COUNTERS = ('reads', 'read_sectors', 'read_ms', 'writes', 'write_sectors', 'write_ms', 'io_ms', 'weighted_ms')
+    
+    def __init__(self, sys_block='/sys/block', rate_engine=None):
+        self.sys_block = sys_block
+        self._kinds = {}  # 设备名 -> 分类结果（设备热插拔很少，按名字缓存）
+        self._rates = rate_engine or RateEngine()
+        self._devices = set()
+        self._primed = False
+    
+    def _kind(self, name):
+        if name not in self._kinds:
+            self._kinds[name] = _classify_block_device(name, self.sys_block)
+        return self._kinds[name]
+    
+    def update(self, devices, timestamp_ns):
+        """输入本次的计数器快照，返回 {'total': {...}, 'devices': {设备名: {...}}}，首次调用返回None"""
+        devices = {name: stat for name, stat in devices.items() if self._kind(name) is not None}
+        if set(devices) != self._devices:
+            self._devices = set(devices)
+            self._rates.retain((name, field) for name in devices for field in self.COUNTERS)
         
-        # 计算更精确的内存使用率（排除缓存）
-        # 在Linux上，available字段比free更准确
-        if hasattr(memory, 'available'):
-            actual_used = memory.total - memory.available
-            actual_percent = round((actual_used / memory.total) * 100, 1)
-        else:
-            actual_used = memory.used
-            actual_percent = round(memory.percent, 1)
+        primed, self._primed = self._primed, True
+        result = {}
+        total = dict.fromkeys(('read_bps', 'write_bps', 'read_iops', 'write_iops', 'queue_depth'), 0.0)
+        total_ops = total_wait_ms = 0
+        total_util = 0.0
+        for name, stat in devices.items():
+            samples = {field: self._rates.update((name, field), getattr(stat, field), timestamp_ns)
+                       for field in self.COUNTERS}
+            if any(sample is None for sample in samples.values()):
+                continue
+            reads, writes = samples['reads'].delta, samples['writes'].delta
+            util = min(100.0, samples['io_ms'].rate / 10)  # 每秒忙碌毫秒数 / 1000 * 100
+            device = {
+                'read_bps': int(samples['read_sectors'].rate * DISKSTATS_SECTOR_SIZE),
+                'write_bps': int(samples['write_sectors'].rate * DISKSTATS_SECTOR_SIZE),
+                'read_iops': round(samples['reads'].rate, 1),
+                'write_iops': round(samples['writes'].rate, 1),
+                'queue_depth': round(samples['weighted_ms'].rate / 1000, 2),
+                'util': round(util, 1),
+                'read_await_ms': round(samples['read_ms'].delta / reads, 2) if reads else 0,
+                'write_await_ms': round(samples['write_ms'].delta / writes, 2) if writes else 0,
+                'in_flight': stat.in_flight
+            }
+            result[name] = device
+            if self._kind(name) == 'physical':
+                for field in total:
+                    total[field] += device[field]
+                total_ops += reads + writes
+                total_wait_ms += samples['read_ms'].delta + samples['write_ms'].delta
+                total_util = max(total_util, util)
         
+        if not primed:
+            return None
         return {
-            'percent': int(actual_percent),
-            'total': memory.total,
-            'used': actual_used,
-            'available': getattr(memory, 'available', memory.free),
-            'swap_total': swap.total,
-            'swap_used': swap.used,
-            'swap_percent': round(swap.percent, 1),
-            'detail': f"{actual_used/(1024**2):.2f} MiB / {memory.total/(1024**2):.2f} MiB",
-            'swap_detail': f"{swap.used/(1024**2):.2f} MiB / {swap.total/(1024**2):.2f} MiB"
+            'total': {
+                'read_bps': int(total['read_bps']),
+                'write_bps': int(total['write_bps']),
+                'read_iops': round(total['read_iops'], 1),
+                'write_iops': round(total['write_iops'], 1),
+                'queue_depth': round(total['queue_depth'], 2),
+                'util': round(total_util, 1),  # 最忙的物理盘
+                'await_ms': round(total_wait_ms / total_ops, 2) if total_ops else 0
+            },
+            'devices': result
         }
+    
+    def collect(self):
+        """从当前 /proc 快照（或psutil）采集一次"""
+        snapshot = _current_proc_snapshot()
+        if snapshot is not None and 'diskstats' in snapshot:
+            return self.update(snapshot['diskstats'], snapshot['timestamp_ns'])
+        return self.update(_disk_stats_from_psutil(), time.monotonic_ns())
+
+def get_disk_io_rates():
+    """块设备I/O速率，第一次调用或不可用时返回None"""
+    global _disk_io_collector
+    if _disk_io_collector is None:
+        _disk_io_collector = DiskIOCollector()
+    try:
+        return _disk_io_collector.collect()
     except Exception as e:
-        print(f"[Memory] Error getting memory info: {e}")
-        return {
-            'percent': 0,
-            'total': 0,
-            'used': 0,
-            'available': 0,
-            'swap_total': 0,
-            'swap_used': 0,
-            'swap_percent': 0,
-            'detail': "0 MiB / 0 MiB",
-            'swap_detail': "0 MiB / 0 MiB"
-        }
+        log.warning(f"[Disk] Error getting disk I/O stats: {e}")
+        _collector_profiler.record_fallback('disk_io')
+        return None
+
+class ProcessCollector:
+    """增量式进程采集：按CPU和内存（RSS）取占用最高的进程
+    
+    Linux上每个进程只读取 /proc/[pid]/stat 一次（名称、CPU时间、启动时间、RSS），CPU使用率由 RateEngine
+    按 (pid, 启动时间) 计算，PID复用不会串号。命令行和所属用户只在进程进入排行时读取并按进程缓存。
+    每次扫描受 PROCESS_SCAN_BUDGET 限制，进程很多时分几次上报轮流扫完，未扫到的进程沿用上次的值。
+    其他平台通过 psutil 采集。CPU使用率以单核为100%（与top一致）。
+    """
+    
+    def __init__(self, proc_root='/proc', top_n=None, budget=None, rate_engine=None):
+        self.proc_root = proc_root
+        self.top_n = PROCESS_TOP_N if top_n is None else top_n
+        self.budget = PROCESS_SCAN_BUDGET if budget is None else budget
+        self._rates = rate_engine or RateEngine()
+        self._use_proc = platform.system() == 'Linux' and os.path.isdir(proc_root)
+        self._clk_tck = os.sysconf('SC_CLK_TCK') if self._use_proc else 100
+        self._page_size = os.sysconf('SC_PAGE_SIZE') if self._use_proc else 4096
+        self._procs = {}  # pid -> {'start', 'name', 'cpu', 'rss', 'static'}
+        self._next_pid = 0  # 上次扫描中断的位置
+        self._users = {}  # uid -> 用户名
+        self.stats = {'scans': 0, 'partial_scans': 0, 'last_scanned': 0, 'last_scan_ms': 0}
+    
+    def _read_stat(self, pid):
+        """读取 /proc/[pid]/stat，返回 (名称, CPU时间秒数, 启动时间, RSS字节)"""
+        fd = os.open(f"{self.proc_root}/{pid}/stat", os.O_RDONLY)
+        try:
+            data = os.read(fd, 4096)
+        finally:
+            os.close(fd)
+        # 进程名可能包含空格和括号，以最后一个 ')' 为界
+        end = data.rfind(b')')
+        name = data[data.index(b'(') + 1:end].decode('utf-8', 'replace')
+        fields = data[end + 2:].split()
+        cpu_seconds = (int(fields[11]) + int(fields[12])) / self._clk_tck
+        return name, cpu_seconds, int(fields[19]), int(fields[21]) * self._page_size
+    
+    def _rotated(self, pids):
+        """PID排序后从上次中断处开始，绕回开头"""
+        pids = sorted(pids)
+        start = bisect.bisect_left(pids, self._next_pid)
+        return pids[start:] + pids[:start]
+    
+    def _iter_proc(self, pids):
+        """按PID顺序从上次中断处开始遍历，产生 (pid, 名称, CPU时间, 启动时间, RSS)"""
+        for pid in self._rotated(pids):
+            try:
+                yield (pid,) + self._read_stat(pid)
+            except (OSError, ValueError, IndexError):
+                # 进程在读取前退出或内容不完整
+                continue
+    
+    def _iter_psutil(self, pids):
+        """与 _iter_proc 相同的遍历顺序，通过psutil读取"""
+        for pid in self._rotated(pids):
+            try:
+                process = psutil.Process(pid)
+                with process.oneshot():
+                    times = process.cpu_times()
+                    yield (pid, process.name(), times.user + times.system,
+                           process.create_time(), process.memory_info().rss)
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+    
+    def scan(self):
+        """扫描进程直到扫完一轮或用完CPU时间预算"""
+        started = time.thread_time()
+        started_wall = time.perf_counter()
+        now = time.monotonic_ns()
+        if self._use_proc:
+            live = {int(name) for name in os.listdir(self.proc_root) if name.isdigit()}
+            iterator = self._iter_proc(live)
+        else:
+            live = set(psutil.pids())
+            iterator = self._iter_psutil(live)
+        for pid in [pid for pid in self._procs if pid not in live]:
+            del self._procs[pid]
+        
+        scanned = 0
+        complete = True
+        for pid, name, cpu_seconds, start_time, rss in iterator:
+            if scanned and time.thread_time() - started >= self.budget:
+                # 预算用完，下次从这个进程继续
+                self._next_pid = pid
+                complete = False
+                break
+            entry = self._procs.get(pid)
+            if entry is None or entry['start'] != start_time:
+                entry = {'start': start_time, 'name': name, 'cpu': 0.0, 'rss': rss, 'static': None}
+                self._procs[pid] = entry
+            entry['name'] = name
+            entry['rss'] = rss
+            sample = self._rates.update((pid, start_time), cpu_seconds, now)
+            if sample is not None:
+                entry['cpu'] = round(sample.rate * 100, 1)
+            scanned += 1
+        if complete:
+            self._next_pid = 0
+        else:
+            self.stats['partial_scans'] += 1
+        
+        self._rates.retain((pid, entry['start']) for pid, entry in self._procs.items())
+        self.stats['scans'] += 1
+        self.stats['last_scanned'] = scanned
+        self.stats['last_scan_ms'] = round((time.perf_counter() - started_wall) * 1000, 2)
+        return complete
+    
+    def _user_name(self, uid):
+        if uid not in self._users:
+            try:
+                import pwd
+                self._users[uid] = pwd.getpwuid(uid).pw_name
+            except (ImportError, KeyError):
+                self._users[uid] = str(uid)
+        return self._users[uid]
+    
+    def _static_info(self, pid):
+        """进程的命令行和所属用户，只在进程进入排行时读取一次"""
+        if self._use_proc:
+            path = f"{self.proc_root}/{pid}"
+            with open(f"{path}/cmdline", 'rb') as f:
+                cmdline = f.read(PROCESS_CMDLINE_MAX * 4).replace(b'\0', b' ').strip().decode('utf-8', 'replace')
+            user = self._user_name(os.stat(path).st_uid)
+        else:
+            process = psutil.Process(pid)
+            cmdline = ' '.join(process.cmdline())
+            user = process.username()
+        return {'cmdline': cmdline[:PROCESS_CMDLINE_MAX], 'user': user}
+    
+    def _describe(self, pid, entry):
+        if entry['static'] is None:
+            try:
+                entry['static'] = self._static_info(pid)
+            except (OSError, psutil.Error):
+                entry['static'] = {'cmdline': '', 'user': None}
+        return {
+            'pid': pid,
+            'name': entry['name'],
+            'user': entry['static']['user'],
+            'cmdline': entry['static']['cmdline'] or f"[{entry['name']}]",  # 内核线程没有命令行
+            'cpu': entry['cpu'],
+            'rss': entry['rss']
+        }
+    
+    def top(self, n=None):
+        """返回 {'top_cpu': [...], 'top_mem': [...], 'count': 进程数}"""
+        n = self.top_n if n is None else n
+        entries = list(self._procs.items())
+        top_cpu = heapq.nlargest(n, entries, key=lambda item: item[1]['cpu'])
+        top_mem = heapq.nlargest(n, entries, key=lambda item: item[1]['rss'])
+        return {
+            'top_cpu': [self._describe(pid, entry) for pid, entry in top_cpu],
+            'top_mem': [self._describe(pid, entry) for pid, entry in top_mem],
+            'count': len(entries)
+        }
+    
+    def collect(self):
+        self.scan()
+        return self.top()
+
+def get_top_processes():
+    """CPU和内存占用最高的进程，不可用时返回None"""
+    global _process_collector
+    if _process_collector is None:
+        _process_collector = ProcessCollector()
+    try:
+        return _process_collector.collect()
+    except Exception as e:
+        log.warning(f"[Process] Error collecting processes: {e}")
+        _collector_profiler.record_fallback('processes')
+        return None
+
+def get_cpu_usage():
+    """获取更精确的CPU使用率 - 读取后台采样线程的最新值，不阻塞"""
+    global _cpu_fallback_rates
+    
+    aggregate, _ = get_sampled_cpu()
+    if aggregate is not None:
+        return int(round(aggregate))
+    _collector_profiler.record_fallback('cpu')
+    
+    # 采样线程尚无数据：Linux基于两次 /proc/stat 快照的节拍差值计算
+    snapshot = _current_proc_snapshot()
+    if snapshot is not None:
+        if _cpu_fallback_rates is None:
+            _cpu_fallback_rates = RateEngine()
+        percent = _cpu_percent_from_ticks(_cpu_fallback_rates, 'cpu', snapshot['cpu_total'], snapshot['cpu_idle'],
+                                          snapshot['timestamp_ns'])
+        if percent is not None:
+            return int(round(percent))
+    
+    try:
+        # 使用非阻塞方式获取CPU使用率（第一次调用只建立基准，返回0）
+        return int(round(psutil.cpu_percent(interval=None)))
+    except:
+        return 0
+
+def _memory_info_from_meminfo(meminfo):
+    """根据 /proc/meminfo 快照计算内存信息，字段与 get_memory_info() 一致"""
+    total = meminfo['MemTotal']
+    available = meminfo.get('MemAvailable')
+    if available is None:
+        available = meminfo.get('MemFree', 0) + meminfo.get('Buffers', 0) + meminfo.get('Cached', 0)
+    actual_used = total - available
+    actual_percent = round((actual_used / total) * 100, 1) if total > 0 else 0
+    
+    swap_total = meminfo.get('SwapTotal', 0)
+    swap_used = swap_total - meminfo.get('SwapFree', 0)
+    swap_percent = round((swap_used / swap_total) * 100, 1) if swap_total > 0 else 0
+    
+    return {
+        'percent': int(actual_percent),
+        'total': total,
+        'used': actual_used,
+        'available': available,
+        'swap_total': swap_total,
+        'swap_used': swap_used,
+        'swap_percent': swap_percent,
+        'detail': f"{actual_used/(1024**2):.2f} MiB / {total/(1024**2):.2f} MiB",
+        'swap_detail': f"{swap_used/(1024**2):.2f} MiB / {swap_total/(1024**2):.2f} MiB"
+    }
+
+def get_memory_info():
+    """获取更详细的内存信息"""
+    try:
+        snapshot = _current_proc_snapshot()
+        if snapshot is not None and snapshot['meminfo'].get('MemTotal'):
+            return _memory_info_from_meminfo(snapshot['meminfo'])
+        
+        memory = psutil.virtual_memory()
+        swap = psutil.swap_memory()
+        
+        # 计算更精确的内存使用率（排除缓存）
+        # 在Linux上，available字段比free更准确
+        if hasattr(memory, 'available'):
+            actual_used = memory.total - memory.available
+            actual_percent = round((actual_used / memory.total) * 100, 1)
+        else:
+            actual_used = memory.used
+            actual_percent = round(memory.percent, 1)
+        
+        return {
+            'percent': int(actual_percent),
+            'total': memory.total,
+            'used': actual_used,
+            'available': getattr(memory, 'available', memory.free),
+            'swap_total': swap.total,
+            'swap_used': swap.used,
+            'swap_percent': round(swap.percent, 1),
+            'detail': f"{actual_used/(1024**2):.2f} MiB / {memory.total/(1024**2):.2f} MiB",
+            'swap_detail': f"{swap.used/(1024**2):.2f} MiB / {swap.total/(1024**2):.2f} MiB"
+        }
+    except Exception as e:
+        log.warning(f"[Memory] Error getting memory info: {e}")
+        _collector_profiler.record_error('memory')
+        return {
+            'percent': 0,
+            'total': 0,
+            'used': 0,
+            'available': 0,
+            'swap_total': 0,
+            'swap_used': 0,
+            'swap_percent': 0,
+            'detail': "0 MiB / 0 MiB",
+            'swap_detail': "0 MiB / 0 MiB"
+        }
+
+def _read_sysfs_int(path):
+    """读取sysfs中的整数值，失败返回None"""
+    try:
+        with open(path, 'r') as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+def _parse_linux_cpu_static(proc_root='/proc', sys_root='/sys'):
+    """解析 /proc/cpuinfo 和 /sys/devices/system/cpu/*/topology，返回CPU静态信息"""
+    with open(os.path.join(proc_root, 'cpuinfo'), 'r') as f:
+        content = f.read()
+    
+    cpu_model = None
+    is_virtual = False
+    cpuinfo_topology = set()  # (physical id, core id)
+    cpuinfo_packages = set()
+    processors = 0
+    
+    for block in content.split('\n\n'):
+        fields = {}
+        for line in block.split('\n'):
+            if ':' in line:
+                key, value = line.split(':', 1)
+                fields[key.strip()] = value.strip()
+        if 'processor' in fields:
+            processors += 1
+        # x86使用model name，其他架构可能是Processor/cpu model/Hardware
+        for key in ('model name', 'Processor', 'cpu model', 'Hardware'):
+            if cpu_model is None and fields.get(key):
+                cpu_model = fields[key]
+        if 'hypervisor' in fields.get('flags', '').split():
+            is_virtual = True
+        if 'physical id' in fields:
+            cpuinfo_packages.add(fields['physical id'])
+            if 'core id' in fields:
+                cpuinfo_topology.add((fields['physical id'], fields['core id']))
+    
+    # 优先使用sysfs拓扑（跨架构，与lscpu一致）
+    cpu_root = os.path.join(sys_root, 'devices', 'system', 'cpu')
+    packages = set()
+    cores = set()
+    logical_cpus = 0
+    try:
+        entries = os.listdir(cpu_root)
+    except OSError:
+        entries = []
+    for entry in entries:
+        if not re.match(r'^cpu\d+$', entry):
+            continue
+        topology_dir = os.path.join(cpu_root, entry, 'topology')
+        package_id = _read_sysfs_int(os.path.join(topology_dir, 'physical_package_id'))
+        core_id = _read_sysfs_int(os.path.join(topology_dir, 'core_id'))
+        if package_id is None or core_id is None:
+            continue  # 离线CPU没有topology
+        logical_cpus += 1
+        packages.add(package_id)
+        cores.add((package_id, core_id))
+    
+    if logical_cpus == 0:
+        logical_cpus = processors or psutil.cpu_count(logical=True) or 1
+        packages = cpuinfo_packages
+        cores = cpuinfo_topology
+    
+    socket_count = max(len(packages), 1)
+    physical_cores = len(cores) or logical_cpus
+    threads_per_core = max(logical_cpus // physical_cores, 1)
+    
+    # Xen等平台不一定暴露hypervisor标志
+    hypervisor_type = None
+    try:
+        with open(os.path.join(sys_root, 'hypervisor', 'type'), 'r') as f:
+            hypervisor_type = f.read().strip()
+    except OSError:
+        pass
+    if hypervisor_type:
+        is_virtual = True
+    
+    return {
+        'model': cpu_model or "Unknown CPU",
+        'is_virtual': is_virtual,
+        'socket_count': socket_count,
+        'cores': physical_cores,
+        'threads': logical_cpus,
+        'threads_per_core': threads_per_core
+    }
+
+def get_linux_cpu_static():
+    """获取Linux CPU静态信息（进程内只解析一次），不可用时返回None"""
+    global _linux_cpu_static
+    if _linux_cpu_static is None:
+        try:
+            _linux_cpu_static = _parse_linux_cpu_static()
+        except (OSError, ValueError) as e:
+            log.warning(f"[CPU] Failed to read /proc/cpuinfo: {e}")
+            return None
+    return _linux_cpu_static
+
+def _find_cpufreq_paths(sys_root='/sys'):
+    """查找各CPU的 cpufreq/scaling_cur_freq 文件"""
+    cpu_root = os.path.join(sys_root, 'devices', 'system', 'cpu')
+    paths = []
+    try:
+        for entry in sorted(os.listdir(cpu_root)):
+            path = os.path.join(cpu_root, entry, 'cpufreq', 'scaling_cur_freq')
+            if re.match(r'^cpu\d+$', entry) and os.path.exists(path):
+                paths.append(path)
+    except OSError:
+        pass
+    return paths
+
+def get_linux_cpu_frequency():
+    """读取各CPU当前频率的平均值（MHz），每次上报只读取这些文件，不可用时返回None"""
+    global _linux_cpufreq_paths
+    if _linux_cpufreq_paths is None:
+        _linux_cpufreq_paths = _find_cpufreq_paths()
+    return _average_cpufreq(_linux_cpufreq_paths)
+
+def _average_cpufreq(paths):
+    """计算cpufreq文件（kHz）的平均频率（MHz）"""
+    values = [value for value in (_read_sysfs_int(path) for path in paths) if value]
+    if not values:
+        return None
+    return round(sum(values) / len(values) / 1000)
 
 def get_cpu_info():
     """获取CPU详细信息：型号、频率、核心数、虚拟化状态 - 优化的Windows兼容版本"""
@@ -743,7 +1971,10 @@ def get_cpu_info():
     try:
         # 对于Windows，如果已经缓存了CPU信息，直接返回
         # 这是因为Windows的WMI在多线程环境中容易出问题
-        if platform.system() == 'Windows' and _cached_cpu_info is not None:
+        # 指纹缓存就绪时，所有平台都直接使用缓存的静态信息（Linux每次只刷新当前频率）
+        if _cached_cpu_info is not None and (platform.system() == 'Windows' or _fingerprint_ready):
+            if platform.system() == 'Linux':
+                return {**_cached_cpu_info, 'current_mhz': get_linux_cpu_frequency()}
             return _cached_cpu_info
         
         # 获取逻辑CPU数量（线程数）
@@ -763,45 +1994,15 @@ def get_cpu_info():
         
         # 根据操作系统获取CPU详细信息
         if platform.system() == 'Linux':
-            try:
-                # 从 /proc/cpuinfo 获取基本信息
-                with open('/proc/cpuinfo', 'r') as f:
-                    content = f.read()
-                    for line in content.split('\n'):
-                        if line.startswith('model name'):
-                            cpu_model = line.split(':', 1)[1].strip()
-                        elif line.startswith('flags') and 'hypervisor' in line:
-                            is_virtual = True
-                
-                # 尝试使用 lscpu 获取更详细信息
-                try:
-                    result = subprocess.run(['lscpu'], capture_output=True, text=True, timeout=5)
-                    if result.returncode == 0:
-                        lscpu_output = result.stdout
-                        for line in lscpu_output.split('\n'):
-                            line = line.strip()
-                            if line.startswith('Model name:'):
-                                cpu_model = line.split(':', 1)[1].strip()
-                            elif line.startswith('Hypervisor vendor:'):
-                                is_virtual = True
-                            elif line.startswith('Virtualization type:'):
-                                if 'full' in line.lower():
-                                    is_virtual = True
-                            elif line.startswith('Socket(s):'):
-                                try:
-                                    socket_count = int(line.split(':', 1)[1].strip())
-                                except:
-                                    pass
-                            elif line.startswith('Thread(s) per core:'):
-                                try:
-                                    threads_per_core = int(line.split(':', 1)[1].strip())
-                                except:
-                                    pass
-                except:
-                    pass
-                    
-            except (FileNotFoundError, PermissionError):
-                pass
+            # 直接读取 /proc/cpuinfo 和 /sys/devices/system/cpu，静态信息只解析一次
+            linux_static = get_linux_cpu_static()
+            if linux_static is not None:
+                cpu_model = linux_static['model']
+                is_virtual = linux_static['is_virtual']
+                socket_count = linux_static['socket_count']
+                threads_per_core = linux_static['threads_per_core']
+                physical_cpus = linux_static['cores']
+                logical_cpus = linux_static['threads']
                 
         elif platform.system() == 'Windows':
             # Windows平台：使用多种方法检测，并缓存结果
@@ -842,7 +2043,7 @@ def get_cpu_info():
                     pass
                     
             except (ImportError, Exception) as e:
-                print(f"[CPU] WMI detection failed: {e}, trying registry method...")
+                log.warning(f"[CPU] WMI detection failed: {e}, trying registry method...")
                 
             # 如果WMI失败，使用注册表方法作为备选
             if not wmi_success:
@@ -852,9 +2053,9 @@ def get_cpu_info():
                                        r"HARDWARE\DESCRIPTION\System\CentralProcessor\0")
                     cpu_model = winreg.QueryValueEx(key, "ProcessorNameString")[0].strip()
                     winreg.CloseKey(key)
-                    print(f"[CPU] Registry detection successful: {cpu_model}")
+                    log.info(f"[CPU] Registry detection successful: {cpu_model}")
                 except Exception as e:
-                    print(f"[CPU] Registry detection failed: {e}")
+                    log.warning(f"[CPU] Registry detection failed: {e}")
                     pass
                     
         elif platform.system() == 'Darwin':  # macOS
@@ -934,16 +2135,19 @@ def get_cpu_info():
         # 对于Windows，缓存CPU信息以避免后续的WMI问题
         if platform.system() == 'Windows':
             _cached_cpu_info = cpu_info_result
-            print(f"[CPU] Windows CPU info cached: {info_string}")
+            log.info(f"[CPU] Windows CPU info cached: {info_string}")
+        elif platform.system() == 'Linux':
+            return {**cpu_info_result, 'current_mhz': get_linux_cpu_frequency()}
         
         return cpu_info_result
         
     except Exception as e:
-        print(f"[CPU] Error getting CPU info: {e}")
+        log.warning(f"[CPU] Error getting CPU info: {e}")
+        _collector_profiler.record_error('cpu_info')
         
         # 如果是Windows且有缓存，返回缓存的信息
         if platform.system() == 'Windows' and _cached_cpu_info is not None:
-            print(f"[CPU] Using cached CPU info due to error")
+            log.info("[CPU] Using cached CPU info due to error")
             return _cached_cpu_info
         
         # 否则返回默认信息
@@ -964,19 +2168,130 @@ def get_cpu_info():
         
         return fallback_result
 
-def get_uptime():
-    """获取系统运行时间（天）"""
+def _read_first_line(paths):
+    """读取第一个存在的文件的首行内容"""
+    for path in paths:
+        try:
+            with open(path, 'r') as f:
+                value = f.readline().strip()
+                if value:
+                    return value
+        except (FileNotFoundError, PermissionError, OSError):
+            continue
+    return None
+
+def get_fingerprint_key():
+    """生成指纹缓存键：启动ID + 机器ID + 硬件特征，重启或硬件变化后失效"""
+    boot_id = _read_first_line(['/proc/sys/kernel/random/boot_id'])
+    if boot_id is None:
+        try:
+            boot_id = str(int(psutil.boot_time()))
+        except Exception:
+            boot_id = 'unknown'
+    
+    machine_id = _read_first_line(['/etc/machine-id', '/var/lib/dbus/machine-id'])
+    if machine_id is None:
+        import uuid
+        machine_id = f"{uuid.getnode():012x}"
+    
+    return {
+        'boot_id': boot_id,
+        'machine_id': machine_id,
+        'logical_cpus': psutil.cpu_count(logical=True),
+        'product_uuid': _read_first_line(['/sys/class/dmi/id/product_uuid']),
+        'client_version': CLIENT_VERSION
+    }
+
+def load_fingerprint(path=None):
+    """从磁盘加载指纹缓存，键匹配时填充系统类型和CPU信息缓存，返回是否命中"""
+    global _cached_system_type, _cached_cpu_info, _fingerprint_ready
+    path = path or FINGERPRINT_CACHE_FILE
     try:
-        boot_time = psutil.boot_time()
-        uptime_seconds = time.time() - boot_time
-        uptime_days = int(uptime_seconds / 86400)  # 转换为天
-        return uptime_days
-    except:
+        with open(path, 'r', encoding='utf-8') as f:
+            fingerprint = json.load(f)
+    except FileNotFoundError:
+        return False
+    except (OSError, ValueError) as e:
+        log.warning(f"[Fingerprint] Ignoring unreadable cache {path}: {e}")
+        return False
+    
+    if fingerprint.get('version') != FINGERPRINT_VERSION or fingerprint.get('key') != get_fingerprint_key():
+        log.info("[Fingerprint] Cache invalidated (reboot or hardware change)")
+        return False
+    
+    system_type = fingerprint.get('system_type')
+    cpu_info = fingerprint.get('cpu_info')
+    if not system_type or not isinstance(cpu_info, dict) or 'info_string' not in cpu_info:
+        return False
+    
+    _cached_system_type = system_type
+    _cached_cpu_info = cpu_info
+    _fingerprint_ready = True
+    log.info(f"[Fingerprint] Loaded cached fingerprint: {system_type} / {cpu_info['info_string']}")
+    return True
+
+def save_fingerprint(system_type, cpu_info, path=None):
+    """将系统类型和CPU静态信息写入磁盘指纹缓存（原子替换）"""
+    path = path or FINGERPRINT_CACHE_FILE
+    fingerprint = {
+        'version': FINGERPRINT_VERSION,
+        'key': get_fingerprint_key(),
+        'system_type': system_type,
+        'cpu_info': cpu_info,
+        'created': int(time.time())
+    }
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(fingerprint, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return True
+    except OSError as e:
+        log.warning(f"[Fingerprint] Failed to save cache {path}: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return False
+
+def warm_start_fingerprint():
+    """启动时加载指纹缓存；未命中则检测一次并保存"""
+    global _cached_cpu_info, _fingerprint_ready
+    if load_fingerprint():
+        return
+    
+    system_type = detect_system_type()
+    cpu_info = get_cpu_info()
+    cpu_info.pop('current_mhz', None)  # 当前频率每次实时读取，不属于静态指纹
+    _cached_cpu_info = cpu_info
+    _fingerprint_ready = True
+    
+    # 检测失败的结果不写入磁盘，下次启动重新检测
+    if system_type != "未知类型" and cpu_info.get('model') != "Unknown CPU":
+        save_fingerprint(system_type, cpu_info)
+
+def get_uptime_seconds():
+    """获取系统运行时间（秒）"""
+    try:
+        snapshot = _current_proc_snapshot()
+        if snapshot is not None:
+            return int(snapshot['uptime'])
+        return int(time.time() - psutil.boot_time())
+    except Exception:
+        _collector_profiler.record_error('uptime')
         return 0
 
+def get_uptime():
+    """获取系统运行时间（天）"""
+    return int(get_uptime_seconds() / 86400)
+
 def get_load_average():
     """获取系统负载 - 性能优化版本"""
     try:
+        snapshot = _current_proc_snapshot()
+        if snapshot is not None:
+            return round(snapshot['loadavg'][0], 2)
+        
         if hasattr(os, 'getloadavg'):
             # Unix系统使用load average（最高效的方法）
             load_1, load_5, load_15 = os.getloadavg()
@@ -984,56 +2299,153 @@ def get_load_average():
         else:
             # Windows系统计算基于CPU核心数的负载
             cpu_count = psutil.cpu_count()
-            # 使用非阻塞方式获取CPU使用率
-            cpu_percent = psutil.cpu_percent(interval=None)
-            if cpu_percent == 0.0:
-                cpu_percent = psutil.cpu_percent(interval=0.1)
+            # 使用采样线程的最新值，不阻塞
+            cpu_percent, _ = get_sampled_cpu()
+            if cpu_percent is None:
+                cpu_percent = psutil.cpu_percent(interval=None)
             # 将CPU使用率转换为类似load average的值
             load_equivalent = round((cpu_percent / 100) * cpu_count, 2)
             return load_equivalent
-    except:
+    except Exception:
+        _collector_profiler.record_error('load')
         return 0.0
 
+def format_bytes(bytes_val):
+    """格式化网络速率（B/s）"""
+    if bytes_val < 0:
+        return "0B"
+    elif bytes_val < 1024:
+        return f"{int(bytes_val)}B"
+    elif bytes_val < 1024 * 1024:
+        return f"{bytes_val/1024:.1f}K"
+    elif bytes_val < 1024 * 1024 * 1024:
+        return f"{bytes_val/(1024*1024):.1f}M"
+    else:
+        return f"{bytes_val/(1024*1024*1024):.1f}G"
+
 def get_network_speed():
-    """获取网络速度（B/s）- 优化版本"""
-    global previous_net_io, last_net_time
+    """获取网络速度（格式化字符串）"""
+    bytes_recv_speed, bytes_sent_speed = get_network_rates()
+    return format_bytes(bytes_recv_speed), format_bytes(bytes_sent_speed)
+
+def get_network_rates():
+    """获取网络速率 (接收B/s, 发送B/s)，只统计 NET_INTERFACE_INCLUDE/EXCLUDE 选中的网卡"""
+    rates = get_interface_rates()
+    if rates is None:
+        return 0.0, 0.0
+    return rates['total']['rx_bps'], rates['total']['tx_bps']
+
+def get_interface_rates():
+    """每网卡速率及去重后的汇总，第一次调用或出错时返回None"""
+    global _network_collector
+    if _network_collector is None:
+        _network_collector = NetworkCollector()
     try:
-        current_net_io = psutil.net_io_counters()
-        current_time = time.time()
-        
-        if previous_net_io is None or last_net_time is None:
-            previous_net_io = current_net_io
-            last_net_time = current_time
-            return "0B", "0B"
+        return _network_collector.collect()
+    except Exception as e:
+        log.warning(f"[Network] Error calculating network speed: {e}")
+        _collector_profiler.record_fallback('network_rates')
+        return None
+
+# 与 psutil.net_io_counters() 字段名一致的汇总计数
+_NetTotals = namedtuple('_NetTotals', ['bytes_sent', 'bytes_recv'])
+
+NET_COUNTER_FIELDS = ('rx_bytes', 'rx_packets', 'rx_errs', 'rx_drop', 'tx_bytes', 'tx_packets', 'tx_errs', 'tx_drop')
+
+def _interface_selected(name, include=None, exclude=None):
+    """网卡是否参与统计：先匹配排除模式，再匹配包含模式（包含列表为空表示全部）"""
+    include = NET_INTERFACE_INCLUDE if include is None else include
+    exclude = NET_INTERFACE_EXCLUDE if exclude is None else exclude
+    if any(fnmatch.fnmatchcase(name, pattern) for pattern in exclude):
+        return False
+    return not include or any(fnmatch.fnmatchcase(name, pattern) for pattern in include)
+
+def _select_interfaces(interfaces):
+    return {name: counters for name, counters in interfaces.items() if _interface_selected(name)}
+
+def _net_counters_from_psutil():
+    """psutil.net_io_counters(pernic=True) 转换为与 /proc/net/dev 解析结果相同的元组"""
+    return {
+        name: (c.bytes_recv, c.packets_recv, c.errin, c.dropin, c.bytes_sent, c.packets_sent, c.errout, c.dropout)
+        for name, c in (psutil.net_io_counters(pernic=True) or {}).items()
+    }
+
+def _net_totals_from_counters(interfaces):
+    """汇总选中网卡的收发字节数，容器/回环网卡不计入，避免同一份流量被计算多次"""
+    bytes_recv = bytes_sent = 0
+    for counters in _select_interfaces(interfaces).values():
+        bytes_recv += counters[0]
+        bytes_sent += counters[4]
+    return _NetTotals(bytes_sent, bytes_recv)
+
+def _net_totals_from_snapshot(snapshot):
+    """汇总快照中选中网卡的收发字节数"""
+    return _net_totals_from_counters(snapshot['net'])
+
+def get_network_totals():
+    """获取网络总流量 (bytes_recv, bytes_sent)"""
+    snapshot = _current_proc_snapshot()
+    if snapshot is not None:
+        totals = _net_totals_from_snapshot(snapshot)
+    else:
+        totals = _net_totals_from_counters(_net_counters_from_psutil())
+    return totals.bytes_recv, totals.bytes_sent
+
+class NetworkCollector:
+    """每网卡网络速率：字节/包速率及本周期内的错误、丢包增量
+    
+    只统计 NET_INTERFACE_INCLUDE/EXCLUDE 选中的网卡，汇总值即上报的 net_in/net_out。
+    速率由 RateEngine 计算：新出现的网卡下一次才有速率，计数器重置（网卡重建）的那一次不输出。
+    """
+    
+    def __init__(self, rate_engine=None):
+        self._rates = rate_engine or RateEngine()
+        self._interfaces = set()
+        self._primed = False
+    
+    def update(self, interfaces, timestamp_ns):
+        """输入本次的计数器快照，返回 {'total': {...}, 'interfaces': {网卡: {...}}}，首次调用返回None"""
+        interfaces = _select_interfaces(interfaces)
+        if set(interfaces) != self._interfaces:
+            self._interfaces = set(interfaces)
+            self._rates.retain((name, field) for name in interfaces for field in NET_COUNTER_FIELDS)
         
-        time_delta = current_time - last_net_time
-        if time_delta <= 0:
-            return "0B", "0B"
-            
-        # 计算速度 (bytes per second)
-        bytes_sent_speed = (current_net_io.bytes_sent - previous_net_io.bytes_sent) / time_delta
-        bytes_recv_speed = (current_net_io.bytes_recv - previous_net_io.bytes_recv) / time_delta
-        
-        # 更新记录
-        previous_net_io = current_net_io
-        last_net_time = current_time
-        
-        def format_bytes(bytes_val):
-            if bytes_val < 0:
-                return "0B"
-            elif bytes_val < 1024:
-                return f"{int(bytes_val)}B"
-            elif bytes_val < 1024 * 1024:
-                return f"{bytes_val/1024:.1f}K"
-            elif bytes_val < 1024 * 1024 * 1024:
-                return f"{bytes_val/(1024*1024):.1f}M"
-            else:
-                return f"{bytes_val/(1024*1024*1024):.1f}G"
+        primed, self._primed = self._primed, True
+        result = {}
+        total_rx = total_tx = 0.0
+        for name, counters in interfaces.items():
+            samples = [self._rates.update((name, field), value, timestamp_ns)
+                       for field, value in zip(NET_COUNTER_FIELDS, counters)]
+            if None in samples:
+                continue
+            sample = dict(zip(NET_COUNTER_FIELDS, samples))
+            result[name] = {
+                'rx_bps': int(sample['rx_bytes'].rate),
+                'tx_bps': int(sample['tx_bytes'].rate),
+                'rx_pps': round(sample['rx_packets'].rate, 1),
+                'tx_pps': round(sample['tx_packets'].rate, 1),
+                # 错误和丢包为本周期内的增量
+                'rx_errs': sample['rx_errs'].delta,
+                'tx_errs': sample['tx_errs'].delta,
+                'rx_drop': sample['rx_drop'].delta,
+                'tx_drop': sample['tx_drop'].delta
+            }
+            total_rx += sample['rx_bytes'].rate
+            total_tx += sample['tx_bytes'].rate
         
-        return format_bytes(bytes_recv_speed), format_bytes(bytes_sent_speed)
-    except Exception as e:
-        print(f"[Network] Error calculating network speed: {e}")
-        return "0B", "0B"
+        if not primed:
+            return None
+        return {
+            'total': {'rx_bps': total_rx, 'tx_bps': total_tx},
+            'interfaces': result
+        }
+    
+    def collect(self):
+        """从当前 /proc 快照（或psutil）采集一次"""
+        snapshot = _current_proc_snapshot()
+        if snapshot is not None:
+            return self.update(snapshot['net'], snapshot['timestamp_ns'])
+        return self.update(_net_counters_from_psutil(), time.monotonic_ns())
 
 def format_bytes_total(bytes_val):
     """格式化总流量"""
@@ -1051,84 +2463,223 @@ def format_bytes_total(bytes_val):
     except:
         return "0B"
 
-def get_public_ipv6():
-    """获取公网IPv6地址"""
+def _race_ip_services(services, validator, timeout=3):
+    """并发请求多个IP查询服务，返回第一个通过校验的结果"""
+    executor = ThreadPoolExecutor(max_workers=len(services))
+    
+    def fetch(service):
+        response = _get_http_session().get(service, timeout=timeout)
+        if response.status_code == 200:
+            return validator(response.text.strip())
+        return None
+    
+    futures = [executor.submit(fetch, service) for service in services]
     try:
-        # 尝试多个IPv6服务来获取公网IPv6
-        ipv6_services = [
-            'https://ipv6.icanhazip.com',
-            'https://v6.ident.me',
-            'https://ipv6.whatismyipaddress.com/api',
-            'https://6.ipw.cn'
-        ]
-        
-        for service in ipv6_services:
+        for future in as_completed(futures):
             try:
-                response = requests.get(service, timeout=3)
-                if response.status_code == 200:
-                    ipv6 = response.text.strip()
-                    # 验证IPv6格式
+                result = future.result()
+                if result:
+                    return result
+            except Exception:
+                continue
+        return None
+    finally:
+        # 不等待其余慢速请求，已拿到结果即可返回（兼容Python 3.9以下，手动取消）
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+def _validate_ipv4(text):
+    """校验IPv4格式，合法则返回地址"""
+    parts = text.split('.')
+    if len(parts) == 4 and all(part.isdigit() and 0 <= int(part) <= 255 for part in parts):
+        return text
+    return None
+
+def _validate_ipv6(text):
+    """校验IPv6格式，合法则返回地址"""
+    try:
+        ipaddress.IPv6Address(text)
+        return text
+    except ipaddress.AddressValueError:
+        return None
+
+# 公网IP查询服务
+IPV4_SERVICES = [
+    'https://api.ipify.org',
+    'https://icanhazip.com', 
+    'https://ipinfo.io/ip',
+    'https://checkip.amazonaws.com'
+]
+
+IPV6_SERVICES = [
+    'https://ipv6.icanhazip.com',
+    'https://v6.ident.me',
+    'https://ipv6.whatismyipaddress.com/api',
+    'https://6.ipw.cn'
+]
+
+def _get_local_global_ipv6():
+    """从本地网络接口获取全局单播IPv6地址"""
+    try:
+        for interface, addrs in psutil.net_if_addrs().items():
+            for addr in addrs:
+                if addr.family == socket.AF_INET6:
+                    ipv6_addr = addr.address.split('%')[0]  # 移除zone id
                     try:
-                        ipaddress.IPv6Address(ipv6)
-                        return ipv6
+                        ip = ipaddress.IPv6Address(ipv6_addr)
+                        # 只返回全局单播地址（公网地址）
+                        if ip.is_global:
+                            return ipv6_addr
                     except ipaddress.AddressValueError:
                         continue
-            except:
-                continue
+    except:
+        pass
+    return None
+
+def _get_local_ipv4():
+    """获取本机主机名对应的IPv4地址（公网查询失败时的备选）"""
+    try:
+        return socket.gethostbyname(socket.gethostname())
+    except:
+        return '127.0.0.1'
+
+def get_public_ipv6():
+    """获取公网IPv6地址"""
+    try:
+        # 并发请求多个IPv6服务，取第一个有效结果
+        ipv6 = _race_ip_services(IPV6_SERVICES, _validate_ipv6)
+        if ipv6:
+            return ipv6
                 
         # 如果所有服务都失败，尝试从本地网络接口获取IPv6
-        try:
-            for interface, addrs in psutil.net_if_addrs().items():
-                for addr in addrs:
-                    if addr.family == socket.AF_INET6:
-                        ipv6_addr = addr.address.split('%')[0]  # 移除zone id
-                        try:
-                            ip = ipaddress.IPv6Address(ipv6_addr)
-                            # 只返回全局单播地址（公网地址）
-                            if ip.is_global:
-                                return ipv6_addr
-                        except ipaddress.AddressValueError:
-                            continue
-        except:
-            pass
-            
-        return None
+        return _get_local_global_ipv6()
     except Exception as e:
-        print(f"[IPv6] Error getting IPv6 address: {e}")
+        log.warning(f"[IPv6] Error getting IPv6 address: {e}")
         return None
 
 def get_public_ip():
     """获取公网IP地址"""
     try:
-        # 尝试多个服务来获取公网IP
-        services = [
-            'https://api.ipify.org',
-            'https://icanhazip.com', 
-            'https://ipinfo.io/ip',
-            'https://checkip.amazonaws.com'
-        ]
-        
-        for service in services:
-            try:
-                response = requests.get(service, timeout=3)
-                if response.status_code == 200:
-                    ip = response.text.strip()
-                    # 简单验证IP格式
-                    parts = ip.split('.')
-                    if len(parts) == 4 and all(part.isdigit() and 0 <= int(part) <= 255 for part in parts):
-                        return ip
-            except:
-                continue
+        # 并发请求多个服务来获取公网IP，取第一个有效结果
+        ip = _race_ip_services(IPV4_SERVICES, _validate_ipv4)
+        if ip:
+            return ip
                 
         # 如果所有服务都失败，返回内网IP作为备选
         return socket.gethostbyname(socket.gethostname())
     except:
         return '127.0.0.1'
 
+def _get_temporary_ipv6_addresses():
+    """读取Linux临时（隐私）IPv6地址集合，这类地址会定期轮换"""
+    temporary = set()
+    try:
+        with open('/proc/net/if_inet6', 'r') as f:
+            for line in f:
+                fields = line.split()
+                # 字段: 地址 网卡序号 前缀长度 作用域 标志 网卡名，标志0x01为IFA_F_TEMPORARY
+                if len(fields) >= 5 and int(fields[4], 16) & 0x01:
+                    temporary.add(str(ipaddress.IPv6Address(int(fields[0], 16))))
+    except (OSError, ValueError):
+        pass
+    return temporary
+
+def _get_interface_signature():
+    """获取本地网卡地址指纹，用于检测地址变化
+    
+    忽略回环、链路本地和临时IPv6地址，避免隐私地址轮换触发无意义的刷新。
+    """
+    try:
+        temporary_ipv6 = _get_temporary_ipv6_addresses()
+        signature = set()
+        for interface, addrs in psutil.net_if_addrs().items():
+            for addr in addrs:
+                if addr.family not in (socket.AF_INET, socket.AF_INET6):
+                    continue
+                address = addr.address.split('%')[0]
+                try:
+                    ip = ipaddress.ip_address(address)
+                except ValueError:
+                    continue
+                if ip.is_loopback or ip.is_link_local:
+                    continue
+                if ip.version == 6 and (not ip.is_global or str(ip) in temporary_ipv6):
+                    continue
+                signature.add((interface, str(ip)))
+        return frozenset(signature)
+    except Exception:
+        return None
+
+def refresh_ip_cache():
+    """重新解析公网IPv4/IPv6并写入缓存
+    
+    查询服务全部失败时缓存本地备选地址，但只保留 PUBLIC_IP_RETRY_INTERVAL 秒后重试。
+    """
+    ipv4 = _race_ip_services(IPV4_SERVICES, _validate_ipv4)
+    ipv6 = _race_ip_services(IPV6_SERVICES, _validate_ipv6) or _get_local_global_ipv6()
+    
+    now = time.time()
+    if ipv4:
+        expires = now + PUBLIC_IP_CACHE_TTL
+    else:
+        ipv4 = _get_local_ipv4()
+        expires = now + PUBLIC_IP_RETRY_INTERVAL
+        log.warning(f"[IP] Public IPv4 lookup failed, using {ipv4} and retrying in {PUBLIC_IP_RETRY_INTERVAL}s")
+    
+    with _ip_cache_lock:
+        _ip_cache['ipv4'] = ipv4
+        _ip_cache['ipv6'] = ipv6
+        _ip_cache['timestamp'] = now
+        _ip_cache['expires'] = expires
+    log.info(f"[IP] Public IP cache refreshed: ipv4={ipv4} ipv6={ipv6}")
+
+def _check_ip_cache(last_signature, force=False):
+    """检查缓存是否需要刷新（强制、过期或网卡地址变化），返回最新的网卡指纹"""
+    signature = _get_interface_signature()
+    with _ip_cache_lock:
+        expired = time.time() >= _ip_cache['expires']
+    changed = signature is not None and last_signature is not None and signature != last_signature
+    if changed:
+        log.info("[IP] Local interface addresses changed, refreshing public IP early")
+    if force or expired or changed:
+        refresh_ip_cache()
+    return signature
+
+def _ip_resolver_loop():
+    """后台IP解析线程：TTL到期、网卡地址变化或收到刷新请求时刷新缓存"""
+    last_signature = None
+    force = False
+    
+    while True:
+        try:
+            last_signature = _check_ip_cache(last_signature, force=force)
+        except Exception as e:
+            log.warning(f"[IP] Resolver error: {e}")
+        force = _ip_refresh_event.wait(timeout=PUBLIC_IP_CHECK_INTERVAL)
+        _ip_refresh_event.clear()
+
+def request_ip_refresh():
+    """请求后台线程立即刷新公网IP（例如重连之后网络可能已变化）"""
+    _ip_refresh_event.set()
+
+def start_ip_resolver():
+    """启动后台公网IP解析线程（幂等）"""
+    global _ip_resolver_thread
+    if _ip_resolver_thread is not None and _ip_resolver_thread.is_alive():
+        return
+    _ip_resolver_thread = threading.Thread(target=_ip_resolver_loop, name='ip-resolver', daemon=True)
+    _ip_resolver_thread.start()
+
 def get_ip_addresses():
-    """获取IPv4和IPv6地址并格式化"""
-    ipv4 = get_public_ip()
-    ipv6 = get_public_ipv6()
+    """获取IPv4和IPv6地址并格式化 - 只读取后台解析的缓存"""
+    with _ip_cache_lock:
+        ipv4 = _ip_cache['ipv4']
+        ipv6 = _ip_cache['ipv6']
+    
+    # 缓存尚未就绪时使用本地地址，不阻塞上报
+    if ipv4 is None:
+        ipv4 = _get_local_ipv4()
     
     # 格式化IP地址显示
     ip_parts = []
@@ -1149,104 +2700,431 @@ def get_ip_addresses():
         'ipv6': ipv6                         # 原始IPv6地址（可能为None）
     }
 
-def python_tcping(host, port, timeout=8):
-    """Pure Python implementation of TCP ping to avoid CMD windows on Windows - 增强稳定性"""
-    import socket
-    import time
+def python_tcping(host, port, timeout=8, max_latency_ms=None):
+    """Pure Python TCP ping（兼容旧调用，等同于 tcp_probe）"""
+    return tcp_probe(host, port, timeout=timeout, max_latency_ms=max_latency_ms)
+
+# 非阻塞connect进行中的错误码（Windows为WSAEWOULDBLOCK）
+_CONNECT_IN_PROGRESS = {errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY, 10035}
+
+# 连接失败errno到结构化错误码的映射（含Windows的WSA错误码）
+_CONNECT_ERROR_CODES = {
+    errno.ECONNREFUSED: 'refused',
+    10061: 'refused',
+    errno.ENETUNREACH: 'unreachable',
+    errno.EHOSTUNREACH: 'unreachable',
+    10051: 'unreachable',
+    10065: 'unreachable',
+    errno.ETIMEDOUT: 'timeout',
+    10060: 'timeout',
+}
+
+def _classify_connect_error(code):
+    """将connect的errno转换为结构化错误码：refused / unreachable / timeout / error"""
+    return _CONNECT_ERROR_CODES.get(code, 'error')
+
+class ProbeContext:
+    """tcping探测上下文：探测方法只查找一次，目标地址解析结果按TTL缓存（LRU淘汰）"""
     
-    try:
-        # Create socket
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(timeout)
-        
-        # Record start time
-        start_time = time.time()
-        
-        # Attempt connection
-        result = sock.connect_ex((host, int(port)))
+    def __init__(self, dns_cache_size=None, dns_cache_ttl=None):
+        self.dns_cache_size = TCPING_DNS_CACHE_SIZE if dns_cache_size is None else dns_cache_size
+        self.dns_cache_ttl = TCPING_DNS_CACHE_TTL if dns_cache_ttl is None else dns_cache_ttl
+        self._lock = threading.Lock()
+        self._dns_cache = OrderedDict()  # host -> (expires, [(family, sockaddr), ...])，sockaddr中的端口在使用时填入
+        self._method = None
+        self.stats = {'dns_hits': 0, 'dns_misses': 0, 'dns_evictions': 0}
+    
+    @property
+    def method(self):
+        """外部tcping方法（兼容模式使用），首次访问时查找并缓存"""
+        if self._method is None:
+            self._method = find_tcping_executable()
+        return self._method
+    
+    def resolve(self, host, port):
+        """解析 host:port，返回 [(family, sockaddr), ...]（保持系统地址顺序），解析失败时抛出异常且不缓存
         
-        # Calculate latency
-        end_time = time.time()
-        latency = (end_time - start_time) * 1000  # Convert to milliseconds
+        缓存按主机名，同一主机的不同端口共用一次解析结果。
+        """
+        port = int(port)
+        key = host.lower()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._dns_cache.get(key)
+            if entry is not None and entry[0] > now:
+                self._dns_cache.move_to_end(key)
+                self.stats['dns_hits'] += 1
+                return self._with_port(entry[1], port)
+            self.stats['dns_misses'] += 1
         
-        sock.close()
+        infos = socket.getaddrinfo(host, None, socket.AF_UNSPEC, socket.SOCK_STREAM)
+        addresses = []
+        for family, _, _, _, sockaddr in infos:
+            if (family, sockaddr) not in addresses:
+                addresses.append((family, sockaddr))
         
-        if result == 0:
-            # 延迟高于500ms视为失败
-            if latency > 500:
-                print(f"[TCPing] ✗ High latency (>500ms): {host}:{port} - {latency:.2f}ms")
-                return {
-                    'host': host,
-                    'port': port,
-                    'latency': None,
-                    'success': False,
-                    'error': 'High latency'
-                }
-            print(f"[TCPing] ✓ Success: {host}:{port} - {latency:.2f}ms")
+        with self._lock:
+            self._dns_cache[key] = (time.monotonic() + self.dns_cache_ttl, addresses)
+            self._dns_cache.move_to_end(key)
+            while len(self._dns_cache) > self.dns_cache_size:
+                self._dns_cache.popitem(last=False)
+                self.stats['dns_evictions'] += 1
+        return self._with_port(addresses, port)
+    
+    @staticmethod
+    def _with_port(addresses, port):
+        """把端口填入缓存的地址（IPv6的 flowinfo/scope_id 保持不变）"""
+        return [(family, (sockaddr[0], port) + tuple(sockaddr[2:])) for family, sockaddr in addresses]
+    
+    def clear(self):
+        """清空DNS缓存"""
+        with self._lock:
+            self._dns_cache.clear()
+    
+    def get_stats(self):
+        """返回缓存统计信息"""
+        with self._lock:
+            lookups = self.stats['dns_hits'] + self.stats['dns_misses']
             return {
-                'host': host,
-                'port': port,
-                'latency': round(latency, 2),
-                'success': True
+                **self.stats,
+                'dns_entries': len(self._dns_cache),
+                'dns_hit_rate': round(self.stats['dns_hits'] / lookups * 100, 1) if lookups else 0.0,
+                'method': self._method or ('builtin' if not TCPING_USE_EXTERNAL else None)
             }
+
+_probe_context = None
+_probe_context_lock = threading.Lock()
+
+def get_probe_context():
+    """获取全局tcping探测上下文"""
+    global _probe_context
+    with _probe_context_lock:
+        if _probe_context is None:
+            _probe_context = ProbeContext()
+        return _probe_context
+
+def init_probe_context():
+    """启动时初始化探测上下文；兼容模式下预先查找外部tcping方法"""
+    context = get_probe_context()
+    if TCPING_USE_EXTERNAL:
+        log.info(f"[TCPing] External tcping method: {context.method}")
+    else:
+        log.info("[TCPing] Using built-in probe engine")
+    return context
+
+def get_probe_stats():
+    """tcping探测上下文的统计信息（DNS缓存命中/未命中等）"""
+    return get_probe_context().get_stats()
+
+def _resolve_tcp_endpoint(host, port):
+    """解析 host:port（经过DNS缓存），返回第一个可用的 (family, sockaddr)"""
+    return get_probe_context().resolve(host, port)[0]
+
+def tcping_batch(targets, timeout=None, max_latency_ms=None):
+    """并发探测多个目标：非阻塞socket + selector，一次等待所有连接完成
+    
+    targets 为 [(host, port), ...]，返回与输入顺序一致的 [{'host', 'port', 'latency', 'error', 'error_code'}]，
+    成功时 error/error_code 为None，latency 为毫秒。
+    """
+    timeout = TCPING_BATCH_TIMEOUT if timeout is None else timeout
+    max_latency_ms = TCPING_MAX_LATENCY_MS if max_latency_ms is None else max_latency_ms
+    results = [{'host': host, 'port': port, 'latency': None, 'error': None, 'error_code': None}
+               for host, port in targets]
+    if not targets:
+        return results
+    
+    # DNS解析并发进行，且不计入延迟
+    with ThreadPoolExecutor(max_workers=min(16, len(targets)), thread_name_prefix='tcping-dns') as executor:
+        def resolve(target):
+            try:
+                return _resolve_tcp_endpoint(*target)
+            except (socket.gaierror, OSError, ValueError) as e:
+                return e
+        endpoints = list(executor.map(resolve, targets))
+    
+    selector = selectors.DefaultSelector()
+    pending = 0
+    try:
+        for index, endpoint in enumerate(endpoints):
+            if isinstance(endpoint, Exception):
+                results[index]['error'] = f'DNS error: {endpoint}'
+                results[index]['error_code'] = 'dns_error'
+                continue
+            family, sockaddr = endpoint
+            try:
+                sock = socket.socket(family, socket.SOCK_STREAM)
+            except OSError as e:
+                results[index]['error'] = str(e)
+                results[index]['error_code'] = 'error'
+                continue
+            sock.setblocking(False)
+            start_ns = time.perf_counter_ns()
+            code = sock.connect_ex(sockaddr)
+            if code == 0:
+                results[index]['latency'] = (time.perf_counter_ns() - start_ns) / 1e6
+                sock.close()
+            elif code in _CONNECT_IN_PROGRESS:
+                selector.register(sock, selectors.EVENT_WRITE, (index, start_ns))
+                pending += 1
+            else:
+                results[index]['error'] = f'Connection error {code}'
+                results[index]['error_code'] = _classify_connect_error(code)
+                sock.close()
+        
+        deadline = time.monotonic() + timeout
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            for key, _ in selector.select(timeout=remaining):
+                end_ns = time.perf_counter_ns()
+                index, start_ns = key.data
+                sock = key.fileobj
+                code = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                if code == 0:
+                    results[index]['latency'] = (end_ns - start_ns) / 1e6
+                else:
+                    results[index]['error'] = f'Connection error {code}'
+                    results[index]['error_code'] = _classify_connect_error(code)
+                selector.unregister(sock)
+                sock.close()
+                pending -= 1
+        
+        # 超时仍未完成的连接
+        for key in list(selector.get_map().values()):
+            index, _ = key.data
+            results[index]['error'] = 'Timeout'
+            results[index]['error_code'] = 'timeout'
+            selector.unregister(key.fileobj)
+            key.fileobj.close()
+    finally:
+        selector.close()
+    
+    for result in results:
+        if result['latency'] is not None:
+            # 延迟高于上限视为失败（与单目标tcping一致）
+            if result['latency'] > max_latency_ms:
+                result['latency'] = None
+                result['error'] = 'High latency'
+                result['error_code'] = 'high_latency'
+            else:
+                result['latency'] = round(result['latency'], 2)
+    return results
+
+def handle_tcping_batch(data):
+    """执行 request_tcping_batch 请求，返回 tcping_batch_result 数据"""
+    request_id = data.get('request_id', 'unknown')
+    targets = []
+    for target in (data.get('targets') or [])[:TCPING_BATCH_MAX_TARGETS]:
+        try:
+            host, port = target.get('host'), int(target.get('port'))
+            if host and 0 < port <= 65535:
+                targets.append((host, port))
+        except (AttributeError, TypeError, ValueError):
+            continue
+    
+    try:
+        timeout = float(data['timeout_ms']) / 1000 if data.get('timeout_ms') else None
+    except (TypeError, ValueError):
+        timeout = None
+    
+    start_time = time.monotonic()
+    results = tcping_batch(targets, timeout=timeout, max_latency_ms=_parse_max_latency(data))
+    processing_time = (time.monotonic() - start_time) * 1000
+    
+    # 紧凑格式：成功时不带error字段
+    compact = []
+    for result in results:
+        item = {'host': result['host'], 'port': result['port'], 'latency': result['latency']}
+        if result['error']:
+            item['error'] = result['error']
+            item['error_code'] = result['error_code']
+        compact.append(item)
+    
+    succeeded = sum(1 for result in results if result['error'] is None)
+    log.debug(f"[TCPing] Batch {request_id}: {succeeded}/{len(results)} reachable (处理耗时: {processing_time:.1f}ms)")
+    return {
+        'request_id': request_id,
+        'node_name': NODE_NAME,
+        'results': compact,
+        'processing_time_ms': round(processing_time, 1),
+        'timestamp': int(time.time() * 1000)
+    }
+
+def _parse_max_latency(data):
+    """读取请求中的 max_latency_ms，缺省或无效时返回None（使用 TCPING_MAX_LATENCY_MS）"""
+    try:
+        value = float(data.get('max_latency_ms'))
+        return value if value > 0 else None
+    except (TypeError, ValueError):
+        return None
+
+def _connect_once(family, sockaddr, timeout):
+    """对已解析的地址进行一次非阻塞连接，返回 (延迟毫秒, 错误, 错误码)，成功时错误与错误码为None"""
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    selector = selectors.DefaultSelector()
+    try:
+        sock.setblocking(False)
+        start_ns = time.perf_counter_ns()
+        code = sock.connect_ex(sockaddr)
+        if code in _CONNECT_IN_PROGRESS:
+            selector.register(sock, selectors.EVENT_WRITE)
+            if not selector.select(timeout=timeout):
+                return None, 'Timeout', 'timeout'
+            code = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+        latency = (time.perf_counter_ns() - start_ns) / 1e6
+        if code != 0:
+            return None, f'Connection error {code}', _classify_connect_error(code)
+        return latency, None, None
+    finally:
+        selector.close()
+        sock.close()
+
+def tcp_probe(host, port, timeout=8, max_latency_ms=None):
+    """内置TCP探测引擎：解析全部地址（IPv4/IPv6双栈），按系统地址顺序依次尝试，直到有一个连接成功
+    
+    使用 perf_counter_ns 计时，timeout 为整个探测（所有地址）的总超时（秒）。
+    返回 {'host', 'port', 'latency', 'success', 'error', 'error_code', 'address', 'family'}，
+    error_code 为 dns_error / refused / unreachable / timeout / high_latency / error 之一，成功时为None。
+    """
+    max_latency_ms = TCPING_MAX_LATENCY_MS if max_latency_ms is None else max_latency_ms
+    result = {'host': host, 'port': port, 'latency': None, 'success': False,
+              'error': None, 'error_code': None, 'address': None, 'family': None}
+    deadline_at = time.monotonic() + timeout
+    
+    try:
+        endpoints = get_probe_context().resolve(host, port)
+    except (socket.gaierror, OSError, UnicodeError, ValueError) as e:
+        log.debug(f"[TCPing] ✗ DNS resolution failed: {host}:{port} - {e}")
+        result.update({'error': f'DNS error: {e}', 'error_code': 'dns_error'})
+        return result
+    
+    result.update({'error': 'No address', 'error_code': 'dns_error'})
+    latency = None
+    for family, sockaddr in endpoints:
+        remaining = deadline_at - time.monotonic()
+        if remaining <= 0:
+            result.update({'error': 'Timeout', 'error_code': 'timeout'})
+            break
+        try:
+            latency, error, error_code = _connect_once(family, sockaddr, remaining)
+        except OSError as e:
+            # 例如本机不支持IPv6，继续尝试下一个地址
+            latency, error, error_code = None, str(e), 'error'
+        result.update({'error': error, 'error_code': error_code, 'address': sockaddr[0],
+                       'family': 'ipv6' if family == socket.AF_INET6 else 'ipv4'})
+        if error is None:
+            break
+    
+    if result['error'] is not None:
+        log.debug(f"[TCPing] ✗ {result['error']}: {host}:{port} ({result['error_code']})")
+    elif latency > max_latency_ms:
+        # 延迟高于上限（默认500ms）视为失败
+        log.debug(f"[TCPing] ✗ High latency (>{max_latency_ms}ms): {host}:{port} - {latency:.2f}ms")
+        result.update({'error': 'High latency', 'error_code': 'high_latency'})
+    else:
+        log.debug(f"[TCPing] ✓ Success: {host}:{port} [{result['address']}] - {latency:.2f}ms")
+        result.update({'latency': round(latency, 2), 'success': True})
+    return result
+
+def _percentile(sorted_values, percent):
+    """最近秩百分位数"""
+    # 秩 = ceil(percent% * n)；整数运算避免浮点与银行家舍入误差（如 1..100 的 p95 应为 95）
+    rank = -(-percent * len(sorted_values) // 100)
+    index = max(0, min(len(sorted_values) - 1, int(rank) - 1))
+    return sorted_values[index]
+
+def tcping_statistics(latencies, sent):
+    """根据成功样本的延迟（毫秒，按采样顺序）计算统计信息"""
+    received = len(latencies)
+    stats = {
+        'sent': sent,
+        'received': received,
+        'loss': round((sent - received) / sent * 100, 1) if sent else 0.0
+    }
+    if not latencies:
+        stats.update({'min': None, 'avg': None, 'max': None, 'p50': None, 'p95': None, 'jitter': None})
+        return stats
+    ordered = sorted(latencies)
+    # 抖动：相邻样本延迟差的平均绝对值
+    diffs = [abs(b - a) for a, b in zip(latencies, latencies[1:])]
+    stats.update({
+        'min': round(ordered[0], 2),
+        'avg': round(sum(latencies) / received, 2),
+        'max': round(ordered[-1], 2),
+        'p50': round(_percentile(ordered, 50), 2),
+        'p95': round(_percentile(ordered, 95), 2),
+        'jitter': round(sum(diffs) / len(diffs), 2) if diffs else 0.0
+    })
+    return stats
+
+def tcping_multi(host, port, count, interval_ms=None, timeout=8, max_latency_ms=None, deadline=None):
+    """多次采样TCP连接延迟：只解析一次DNS，按间隔进行 count 次非阻塞连接并统计
+    
+    deadline 为总耗时上限（秒），到达后停止继续采样。平均延迟超过上限视为失败。
+    """
+    interval_ms = TCPING_SAMPLE_INTERVAL_MS if interval_ms is None else interval_ms
+    max_latency_ms = TCPING_MAX_LATENCY_MS if max_latency_ms is None else max_latency_ms
+    count = max(1, min(int(count), TCPING_MAX_SAMPLES))
+    deadline_at = time.monotonic() + deadline if deadline else None
+    
+    try:
+        family, sockaddr = _resolve_tcp_endpoint(host, port)
+    except (socket.gaierror, OSError, ValueError) as e:
+        log.debug(f"[TCPing] ✗ DNS resolution failed: {host}:{port} - {e}")
+        return {'host': host, 'port': port, 'latency': None, 'success': False,
+                'error': f'DNS error: {e}', 'error_code': 'dns_error', 'stats': tcping_statistics([], 0)}
+    
+    latencies = []
+    errors = []
+    sent = 0
+    for index in range(count):
+        sample_timeout = timeout
+        if deadline_at is not None:
+            sample_timeout = min(timeout, deadline_at - time.monotonic())
+            if sample_timeout <= 0:
+                break
+        sent += 1
+        latency, error, error_code = _connect_once(family, sockaddr, sample_timeout)
+        if error is None:
+            latencies.append(latency)
         else:
-            print(f"[TCPing] ✗ Connection failed: {host}:{port} - error {result}")
-            return {
-                'host': host,
-                'port': port,
-                'latency': None,
-                'success': False,
-                'error': f'Connection error {result}'
-            }
-            
-    except socket.timeout:
-        print(f"[TCPing] ✗ Timeout: {host}:{port}")
-        return {
-            'host': host,
-            'port': port,
-            'latency': None,
-            'success': False,
-            'error': 'Socket timeout'
-        }
-    except socket.gaierror as e:
-        print(f"[TCPing] ✗ DNS resolution failed: {host}:{port} - {e}")
-        return {
-            'host': host,
-            'port': port,
-            'latency': None,
-            'success': False,
-            'error': f'DNS error: {e}'
-        }
-    except Exception as e:
-        print(f"[TCPing] ✗ Exception in python_tcping: {e}")
-        return {
-            'host': host,
-            'port': port,
-            'latency': None,
-            'success': False,
-            'error': str(e)
-        }
+            errors.append((error, error_code))
+        if index < count - 1:
+            time.sleep(interval_ms / 1000)
+    
+    stats = tcping_statistics(latencies, sent)
+    result = {'host': host, 'port': port, 'latency': None, 'success': False, 'error_code': None, 'stats': stats}
+    if not latencies:
+        result['error'], result['error_code'] = errors[-1] if errors else ('Deadline exceeded', 'timeout')
+    elif stats['avg'] > max_latency_ms:
+        result['error'], result['error_code'] = 'High latency', 'high_latency'
+    else:
+        result['latency'] = stats['avg']
+        result['success'] = True
+    log.debug(f"[TCPing] {'✓' if result['success'] else '✗'} {host}:{port} - {sent} samples, avg={stats['avg']}ms loss={stats['loss']}%")
+    return result
 
 def find_tcping_executable():
     """查找tcping可执行文件的位置 - Windows优先使用Python包"""
     
     # Windows系统优先使用Python tcping模块，避免弹窗
     if platform.system() == 'Windows':
-        print(f"[TCPing] Windows detected - checking for Python tcping module first")
+        log.info("[TCPing] Windows detected - checking for Python tcping module first")
         try:
             # 尝试导入tcping Python包
             import tcping
-            print(f"[TCPing] Python tcping module found - using pure Python implementation")
+            log.info("[TCPing] Python tcping module found - using pure Python implementation")
             return 'python_module'
         except ImportError:
-            print(f"[TCPing] Python tcping module not found, falling back to built-in socket method")
+            log.info("[TCPing] Python tcping module not found, falling back to built-in socket method")
             return 'python_socket'
     
     # 对于Linux/Unix系统，仍然可以尝试系统的tcping
     # 首先尝试使用 shutil.which() 在PATH中查找
     tcping_path = shutil.which('tcping')
     if tcping_path:
-        print(f"[TCPing] Found tcping in PATH: {tcping_path}")
+        log.info(f"[TCPing] Found tcping in PATH: {tcping_path}")
         return tcping_path
     
     # 如果在PATH中找不到，尝试常见位置
@@ -1264,25 +3142,34 @@ def find_tcping_executable():
         # 测试每个可能的路径
         for path in possible_paths:
             if path and os.path.isfile(path) and os.access(path, os.X_OK):
-                print(f"[TCPing] Found tcping at: {path}")
+                log.info(f"[TCPing] Found tcping at: {path}")
                 return path
     
     # 如果都找不到，使用内置的Python socket方法
-    print(f"[TCPing] No external tcping found, using built-in Python socket method")
+    log.info("[TCPing] No external tcping found, using built-in Python socket method")
     return 'python_socket'
 
-def perform_tcping(host, port):
-    """执行tcping命令并返回结果 - 增强稳定性和错误处理"""
+def perform_tcping(host, port, timeout=None, max_latency_ms=None, count=1, interval_ms=None):
+    """执行tcping命令并返回结果 - 增强稳定性和错误处理
+    
+    timeout 为本次探测允许的最长耗时（秒），用于收紧默认的8秒/15秒超时；
+    max_latency_ms 为延迟上限；count > 1 时使用多次采样模式并附带统计信息。
+    默认使用内置探测引擎（tcp_probe），仅当 TCPING_USE_EXTERNAL 开启时才使用外部tcping程序或tcping模块。
+    """
+    max_latency_ms = TCPING_MAX_LATENCY_MS if max_latency_ms is None else max_latency_ms
+    socket_timeout = 8 if timeout is None else max(0.1, min(8, timeout))
+    command_timeout = 15 if timeout is None else max(0.1, min(15, timeout))
     try:
         # 验证输入参数
         if not host or not port:
-            print(f"[TCPing] ✗ 无效参数: host={host}, port={port}")
+            log.debug(f"[TCPing] ✗ 无效参数: host={host}, port={port}")
             return {
                 'host': host or 'unknown',
                 'port': port or 0,
                 'latency': None,
                 'success': False,
-                'error': 'Invalid parameters'
+                'error': 'Invalid parameters',
+                'error_code': 'invalid_params'
             }
         
         # 规范化port为整数
@@ -1291,37 +3178,47 @@ def perform_tcping(host, port):
             if port <= 0 or port > 65535:
                 raise ValueError(f"Port {port} out of range")
         except (ValueError, TypeError) as e:
-            print(f"[TCPing] ✗ 无效端口: {port}")
+            log.debug(f"[TCPing] ✗ 无效端口: {port}")
             return {
                 'host': host,
                 'port': port,
                 'latency': None,
                 'success': False,
-                'error': f'Invalid port: {port}'
+                'error': f'Invalid port: {port}',
+                'error_code': 'invalid_params'
             }
         
-        # 查找tcping方法
-        tcping_method = find_tcping_executable()
+        # 多次采样模式：内置非阻塞socket实现
+        if count and int(count) > 1:
+            return tcping_multi(host, port, count, interval_ms=interval_ms, timeout=socket_timeout,
+                                max_latency_ms=max_latency_ms, deadline=timeout)
+        
+        # 默认：内置探测引擎（不fork子进程、不解析输出）
+        if not TCPING_USE_EXTERNAL:
+            return tcp_probe(host, port, timeout=socket_timeout, max_latency_ms=max_latency_ms)
+        
+        # 兼容模式：外部tcping方法（启动时查找一次）
+        tcping_method = get_probe_context().method
         
-        # 使用Python socket方法 (避免弹窗，提高稳定性)
+        # 未找到外部tcping，使用内置探测引擎
         if tcping_method == 'python_socket':
-            print(f"[TCPing] Using built-in Python socket method for {host}:{port}")
-            return python_tcping(host, port, timeout=8)  # 增加超时到8秒
+            log.debug(f"[TCPing] Using built-in probe engine for {host}:{port}")
+            return tcp_probe(host, port, timeout=socket_timeout, max_latency_ms=max_latency_ms)
         
         # 使用Python tcping模块
         elif tcping_method == 'python_module':
-            print(f"[TCPing] Using Python tcping module for {host}:{port}")
+            log.debug(f"[TCPing] Using Python tcping module for {host}:{port}")
             try:
                 import tcping
-                result = tcping.Ping(host, int(port), timeout=8)  # 增加超时到8秒
+                result = tcping.Ping(host, int(port), timeout=socket_timeout)  # 增加超时到8秒
                 result.ping(1)  # Ping once
                 
                 if result.result and len(result.result) > 0:
                     avg_time = result.result[0].time if result.result[0].time else None
                     if avg_time is not None:
-                        # 延迟高于500ms视为失败
-                        if avg_time > 500:
-                            print(f"[TCPing] ✗ 高延迟(>500ms): {host}:{port} - {avg_time}ms")
+                        # 延迟高于上限（默认500ms）视为失败
+                        if avg_time > max_latency_ms:
+                            log.debug(f"[TCPing] ✗ 高延迟(>{max_latency_ms}ms): {host}:{port} - {avg_time}ms")
                             return {
                                 'host': host,
                                 'port': port,
@@ -1329,7 +3226,7 @@ def perform_tcping(host, port):
                                 'success': False,
                                 'error': 'High latency'
                             }
-                        print(f"[TCPing] ✓ Success: {host}:{port} - {avg_time}ms")
+                        log.debug(f"[TCPing] ✓ Success: {host}:{port} - {avg_time}ms")
                         return {
                             'host': host,
                             'port': port,
@@ -1337,7 +3234,7 @@ def perform_tcping(host, port):
                             'success': True
                         }
                     else:
-                        print(f"[TCPing] ✗ No latency data: {host}:{port}")
+                        log.debug(f"[TCPing] ✗ No latency data: {host}:{port}")
                         return {
                             'host': host,
                             'port': port,
@@ -1346,7 +3243,7 @@ def perform_tcping(host, port):
                             'error': 'No latency data'
                         }
                 else:
-                    print(f"[TCPing] ✗ No result: {host}:{port}")
+                    log.debug(f"[TCPing] ✗ No result: {host}:{port}")
                     return {
                         'host': host,
                         'port': port,
@@ -1355,21 +3252,21 @@ def perform_tcping(host, port):
                         'error': 'No result'
                     }
             except Exception as e:
-                print(f"[TCPing] Python tcping module failed: {e}, falling back to socket method")
-                return python_tcping(host, port, timeout=8)
+                log.warning(f"[TCPing] Python tcping module failed: {e}, falling back to built-in probe engine")
+                return tcp_probe(host, port, timeout=socket_timeout, max_latency_ms=max_latency_ms)
         
         # 使用外部tcping可执行文件 (仅限Linux/Unix)
         else:
             # 构建命令
             cmd = [tcping_method, str(host), '-p', str(port), '-c', '1', '--report']
             
-            print(f"[TCPing] Executing: {' '.join(cmd)}")
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=15)  # 增加超时到15秒
+            log.debug(f"[TCPing] Executing: {' '.join(cmd)}")
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=command_timeout)  # 增加超时到15秒
             
             # 处理外部tcping命令的结果
             if result.returncode == 0:
                 output = result.stdout.strip()
-                print(f"[TCPing] Output: {output}")
+                log.debug(f"[TCPing] Output: {output}")
                 
                 output_lower = output.lower()
                 
@@ -1398,9 +3295,9 @@ def perform_tcping(host, port):
                                 continue
                     
                     if latency is not None and latency > 0:
-                        # 延迟高于500ms视为失败
-                        if latency > 500:
-                            print(f"[TCPing] ✗ High latency (>500ms): {host}:{port} - {latency}ms")
+                        # 延迟高于上限（默认500ms）视为失败
+                        if latency > max_latency_ms:
+                            log.debug(f"[TCPing] ✗ High latency (>{max_latency_ms}ms): {host}:{port} - {latency}ms")
                             return {
                                 'host': host,
                                 'port': port,
@@ -1408,7 +3305,7 @@ def perform_tcping(host, port):
                                 'success': False,
                                 'error': 'High latency'
                             }
-                        print(f"[TCPing] ✓ Success: {host}:{port} - {latency}ms")
+                        log.debug(f"[TCPing] ✓ Success: {host}:{port} - {latency}ms")
                         return {
                             'host': host,
                             'port': port,
@@ -1418,7 +3315,7 @@ def perform_tcping(host, port):
                     else:
                         # 连接成功但无法解析延迟或延迟为0，检查是否真的失败了
                         if '0.00ms' in output and ('0     |   1' in output or 'failed' in output.lower()):
-                            print(f"[TCPing] ✗ Connected but actually failed (0ms latency): {host}:{port}")
+                            log.debug(f"[TCPing] ✗ Connected but actually failed (0ms latency): {host}:{port}")
                             return {
                                 'host': host,
                                 'port': port,
@@ -1428,7 +3325,7 @@ def perform_tcping(host, port):
                             }
                         else:
                             # 连接成功但无法解析延迟，给一个默认值
-                            print(f"[TCPing] ✓ Connected but couldn't parse latency: {host}:{port}")
+                            log.debug(f"[TCPing] ✓ Connected but couldn't parse latency: {host}:{port}")
                             return {
                                 'host': host,
                                 'port': port,
@@ -1439,7 +3336,7 @@ def perform_tcping(host, port):
                     # 没有找到"connected"，检查其他成功指示符
                     success_indicators = ['open', 'reachable', 'success']
                     if any(indicator in output_lower for indicator in success_indicators):
-                        print(f"[TCPing] ✓ Success detected but couldn't parse latency: {host}:{port}")
+                        log.debug(f"[TCPing] ✓ Success detected but couldn't parse latency: {host}:{port}")
                         return {
                             'host': host,
                             'port': port,
@@ -1448,8 +3345,8 @@ def perform_tcping(host, port):
                         }
                     else:
                         # 既没有成功指示符也没有失败指示符，视为失败
-                        print(f"[TCPing] ✗ No success indicators found, treating as failure: {host}:{port}")
-                        print(f"[TCPing Debug] Output lower: '{output_lower}'")
+                        log.debug(f"[TCPing] ✗ No success indicators found, treating as failure: {host}:{port}")
+                        log.debug(f"[TCPing] Output lower: '{output_lower}'")
                         return {
                             'host': host,
                             'port': port,
@@ -1459,7 +3356,7 @@ def perform_tcping(host, port):
                         }
             else:
                 error_msg = result.stderr.strip() if result.stderr else "Unknown error"
-                print(f"[TCPing] ✗ Failed: {host}:{port} - {error_msg}")
+                log.debug(f"[TCPing] ✗ Failed: {host}:{port} - {error_msg}")
                 return {
                     'host': host,
                     'port': port,
@@ -1469,7 +3366,7 @@ def perform_tcping(host, port):
                 }
     
     except subprocess.TimeoutExpired:
-        print(f"[TCPing] ✗ Timeout: {host}:{port}")
+        log.debug(f"[TCPing] ✗ Timeout: {host}:{port}")
         return {
             'host': host,
             'port': port,
@@ -1478,7 +3375,7 @@ def perform_tcping(host, port):
             'error': 'Timeout'
         }
     except Exception as e:
-        print(f"[TCPing] ✗ Exception: {host}:{port} - {str(e)}")
+        log.debug(f"[TCPing] ✗ Exception: {host}:{port} - {str(e)}")
         return {
             'host': host,
             'port': port,
@@ -1487,61 +3384,250 @@ def perform_tcping(host, port):
             'error': str(e)
         }
 
+class CollectorProfiler:
+    """采集器耗时统计：perf_counter_ns 计时，保留最近 PROFILE_WINDOW 次耗时，统计 p50/p95/max 及错误、回退次数"""
+    
+    def __init__(self, window=None):
+        self.window = PROFILE_WINDOW if window is None else window
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._counters = {}
+    
+    def _counter(self, name):
+        counter = self._counters.get(name)
+        if counter is None:
+            counter = self._counters[name] = {'count': 0, 'errors': 0, 'fallbacks': 0, 'last_ns': 0}
+        return counter
+    
+    def record(self, name, elapsed_ns, error=False):
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+            samples.append(elapsed_ns)
+            counter = self._counter(name)
+            counter['count'] += 1
+            counter['last_ns'] = elapsed_ns
+            if error:
+                counter['errors'] += 1
+    
+    def record_fallback(self, name):
+        """记录一次回退（主路径不可用，改用备用实现）"""
+        with self._lock:
+            self._counter(name)['fallbacks'] += 1
+    
+    def record_error(self, name):
+        """记录一次采集器内部捕获的错误（采集失败，返回了默认值）"""
+        with self._lock:
+            self._counter(name)['errors'] += 1
+    
+    @contextlib.contextmanager
+    def timed(self, name):
+        """计时上下文：with profiler.timed('disk'): ..."""
+        start = time.perf_counter_ns()
+        try:
+            yield
+        except Exception:
+            self.record(name, time.perf_counter_ns() - start, error=True)
+            raise
+        self.record(name, time.perf_counter_ns() - start)
+    
+    def summary(self):
+        """返回 {采集器: {'count', 'errors', 'fallbacks', 'last_ms', 'p50_ms', 'p95_ms', 'max_ms'}}"""
+        with self._lock:
+            result = {}
+            for name, counter in self._counters.items():
+                ordered = sorted(self._samples.get(name) or ())
+                entry = {
+                    'count': counter['count'],
+                    'errors': counter['errors'],
+                    'fallbacks': counter['fallbacks'],
+                    'last_ms': round(counter['last_ns'] / 1e6, 3)
+                }
+                if ordered:
+                    entry.update({
+                        'p50_ms': round(_percentile(ordered, 50) / 1e6, 3),
+                        'p95_ms': round(_percentile(ordered, 95) / 1e6, 3),
+                        'max_ms': round(ordered[-1] / 1e6, 3)
+                    })
+                result[name] = entry
+            return result
+
+_collector_profiler = CollectorProfiler()
+
+def build_client_stats(reconnect_controller=None):
+    """客户端自身运行统计：各采集器耗时、tcping探测缓存、重连、离线缓冲、磁盘采集"""
+    return {
+        'node_name': NODE_NAME,
+        'timestamp': int(time.time() * 1000),
+        'version': CLIENT_VERSION,
+        'collectors': _collector_profiler.summary(),
+        'probe': get_probe_stats(),
+        'connection': (reconnect_controller or _reconnect_controller).metrics(),
+        'buffer': dict(get_metrics_buffer().stats, pending=get_metrics_buffer().pending()),
+        'disk': dict(get_disk_collector().stats)
+    }
+
+def dump_client_stats(path=None):
+    """将客户端统计写入本地JSON文件（原子替换），返回文件路径"""
+    path = CLIENT_STATS_FILE if path is None else path
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(build_client_stats(), f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    log.info(f"[Stats] 📊 Client stats written to {path}")
+    return path
+
+_stats_dump_pipe = None  # (读端, 写端)，信号处理函数通过写端通知后台线程
+
+def _stats_dump_worker(read_fd):
+    """后台线程：每收到一次通知写出一次统计文件"""
+    while True:
+        try:
+            if not os.read(read_fd, 64):
+                return
+        except InterruptedError:
+            continue
+        try:
+            dump_client_stats()
+        except Exception as e:
+            log.error(f"[Stats] ❌ Failed to dump client stats: {e}")
+
+def install_stats_dump_handler():
+    """收到 SIGUSR1 时写出统计文件（kill -USR1 <pid>），仅POSIX系统
+    
+    信号处理函数运行在主线程上，而主线程可能正持有采集器、缓冲区等的锁，
+    因此处理函数只向管道写一个字节，统计由后台线程获取锁后写出。
+    """
+    global _stats_dump_pipe
+    if not hasattr(signal, 'SIGUSR1'):
+        return False
+    
+    if _stats_dump_pipe is None:
+        read_fd, write_fd = os.pipe()
+        os.set_blocking(write_fd, False)
+        _stats_dump_pipe = (read_fd, write_fd)
+        threading.Thread(target=_stats_dump_worker, args=(read_fd,), name='stats-dump', daemon=True).start()
+    write_fd = _stats_dump_pipe[1]
+    
+    def handler(signum, frame):
+        try:
+            os.write(write_fd, b'\0')
+        except OSError:
+            # 管道已满：已有未处理的写出请求
+            pass
+    
+    try:
+        signal.signal(signal.SIGUSR1, handler)
+        return True
+    except ValueError:
+        # 不在主线程中
+        return False
+
 def collect_info():
-    """采集真实系统信息 - 优化版本"""
+    """采集真实系统信息（显示格式，兼容模式上报使用）"""
+    return collect_sample()[0]
+
+def collect_sample():
+    """采集一次系统信息，返回 (显示格式数据, 原始数值指标)
+    
+    原始数值指标为整数字节/字节每秒等未格式化的值，供二进制上报使用。
+    """
+    with _collector_profiler.timed('total'):
+        return _collect_sample(_collector_profiler)
+
+def _collect_sample(profiler):
     try:
-        print("[Data] Starting data collection...")
+        log.debug("[Data] Starting data collection...")
+        
+        # 本次上报的所有 /proc 指标都来自同一个快照（非Linux返回None，回退psutil）
+        with profiler.timed('proc_snapshot'):
+            capture_proc_snapshot()
         
         # 基本信息
-        ip_info = get_ip_addresses()
+        with profiler.timed('ip'):
+            ip_info = get_ip_addresses()
         status = '运行中'
         
-        print(f"[Data] IP addresses: {ip_info['ip_display']}")
+        log.debug(f"[Data] IP addresses: {ip_info['ip_display']}")
         if ip_info['ipv6']:
-            print(f"[Data] IPv6 support detected: {ip_info['ipv6']}")
+            log.debug(f"[Data] IPv6 support detected: {ip_info['ipv6']}")
         else:
-            print(f"[Data] IPv6 not available")
+            log.debug("[Data] IPv6 not available")
         
         # 系统运行时间
-        uptime = get_uptime()
-        print(f"[Data] Uptime: {uptime} days")
+        with profiler.timed('uptime'):
+            uptime_seconds = get_uptime_seconds()
+        uptime = int(uptime_seconds / 86400)
+        log.debug(f"[Data] Uptime: {uptime} days")
         
         # 系统负载
-        load = get_load_average()
-        print(f"[Data] Load average: {load}")
+        with profiler.timed('load'):
+            load = get_load_average()
+        log.debug(f"[Data] Load average: {load}")
         
         # 网络速度
-        net_in, net_out = get_network_speed()
-        print(f"[Data] Network speed: ↓{net_in}/s ↑{net_out}/s")
+        with profiler.timed('network_rates'):
+            interface_rates = get_interface_rates()
+        if interface_rates is not None:
+            rate_in, rate_out = interface_rates['total']['rx_bps'], interface_rates['total']['tx_bps']
+        else:
+            rate_in = rate_out = 0.0
+        net_in, net_out = format_bytes(rate_in), format_bytes(rate_out)
+        log.debug(f"[Data] Network speed: ↓{net_in}/s ↑{net_out}/s")
         
         # 网络总流量
+        bytes_recv = bytes_sent = 0
         try:
-            net_io = psutil.net_io_counters()
-            traffic_in = format_bytes_total(net_io.bytes_recv)
-            traffic_out = format_bytes_total(net_io.bytes_sent)
-            print(f"[Data] Total traffic: ↓{traffic_in} ↑{traffic_out}")
+            with profiler.timed('network_totals'):
+                bytes_recv, bytes_sent = get_network_totals()
+            traffic_in = format_bytes_total(bytes_recv)
+            traffic_out = format_bytes_total(bytes_sent)
+            log.debug(f"[Data] Total traffic: ↓{traffic_in} ↑{traffic_out}")
         except Exception as e:
-            print(f"[Data] Error getting network stats: {e}")
+            log.debug(f"[Data] Error getting network stats: {e}")
             traffic_in = "0M"
             traffic_out = "0M"
         
         # CPU使用率（优化版本）
-        cpu = get_cpu_usage()
-        print(f"[Data] CPU usage: {cpu}%")
+        with profiler.timed('cpu'):
+            cpu = get_cpu_usage()
+        log.debug(f"[Data] CPU usage: {cpu}%")
         
         # 内存使用率（优化版本）
-        memory_info = get_memory_info()
+        with profiler.timed('memory'):
+            memory_info = get_memory_info()
         ram = memory_info['percent']
-        print(f"[Data] Memory usage: {ram}% ({memory_info['detail']})")
+        log.debug(f"[Data] Memory usage: {ram}% ({memory_info['detail']})")
         
         # 磁盘使用率（所有分区总和）
-        disk_info = get_all_disk_usage()
+        with profiler.timed('disk'):
+            disk_info = get_all_disk_usage()
         rom = int(disk_info['percent'])
-        print(f"[Data] Disk usage: {rom}% ({disk_info['detail']}) - {disk_info['partitions_count']} partitions")
+        log.debug(f"[Data] Disk usage: {rom}% ({disk_info['detail']}) - {disk_info['partitions_count']} partitions")
+        
+        # 块设备I/O
+        disk_io = None
+        if REPORT_DISK_IO:
+            with profiler.timed('disk_io'):
+                disk_io = get_disk_io_rates()
+            if disk_io is not None:
+                io_total = disk_io['total']
+                log.debug(f"[Data] Disk I/O: R {format_bytes(io_total['read_bps'])}/s W {format_bytes(io_total['write_bps'])}/s util {io_total['util']}%")
         
         # CPU信息
-        cpu_info = get_cpu_info()
-        print(f"[Data] CPU info: {cpu_info['info_string']}")
+        with profiler.timed('cpu_info'):
+            cpu_info = get_cpu_info()
+        log.debug(f"[Data] CPU info: {cpu_info['info_string']}")
+        
+        # 占用最高的进程
+        processes = None
+        if REPORT_PROCESSES:
+            with profiler.timed('processes'):
+                processes = get_top_processes()
+        
+        with profiler.timed('system_type'):
+            system_type = detect_system_type()
         
         # 详细信息
         detail = {
@@ -1557,7 +3643,7 @@ def collect_info():
             'ipv4': ip_info['ipv4'],      # 原始IPv4地址
             'ipv6': ip_info['ipv6'],      # 原始IPv6地址
             'status': status,
-            'type': detect_system_type(),
+            'type': system_type,
             'location': NODE_LOCATION,
             'uptime': uptime,
             'load': load,
@@ -1571,16 +3657,59 @@ def collect_info():
             'detail': detail
         }
         
-        print(f"[Data] Collection completed successfully")
-        return data
+        # 可选：每核CPU使用率
+        if REPORT_PER_CORE_CPU:
+            _, per_core = get_sampled_cpu()
+            data['cpu_per_core'] = [round(value, 1) for value in per_core]
+        
+        # 每个分区的使用情况，stale 表示该挂载点本次statvfs超时、数值为上次成功的结果
+        if REPORT_PARTITIONS:
+            data['partitions'] = disk_info['partitions']
+        if disk_io is not None:
+            data['disk_io'] = disk_io
+        if REPORT_PER_INTERFACE and interface_rates is not None:
+            data['interfaces'] = interface_rates['interfaces']
+        if processes is not None:
+            data['processes'] = processes
+        
+        # 高频采样统计：本上报周期内CPU(%)与网络速率(B/s)的 min/max/avg/last
+        if REPORT_SAMPLE_STATS:
+            sample_stats = drain_sample_stats()
+            if sample_stats:
+                data['stats'] = sample_stats
+        
+        metrics = {
+            'timestamp_ms': int(time.time() * 1000),
+            'cpu': cpu,
+            'ram': ram,
+            'rom': rom,
+            'load': load,
+            'uptime_s': uptime_seconds,
+            'net_in_bps': int(rate_in),
+            'net_out_bps': int(rate_out),
+            'traffic_in_bytes': int(bytes_recv),
+            'traffic_out_bytes': int(bytes_sent),
+            'mem_total': int(memory_info['total']),
+            'mem_used': int(memory_info['used']),
+            'swap_total': int(memory_info['swap_total']),
+            'swap_used': int(memory_info['swap_used']),
+            'disk_total': int(disk_info['total_size']),
+            'disk_used': int(disk_info['total_used']),
+            'partitions_count': disk_info['partitions_count']
+        }
+        
+        log.debug("[Data] Collection completed successfully")
+        return data, metrics
         
     except Exception as e:
-        print(f"[ERR] Failed to collect system info: {e}")
-        import traceback
-        traceback.print_exc()
+        log.error(f"[Data] ❌ Failed to collect system info: {e}", exc_info=True)
         
         # 返回默认值，确保程序不会崩溃
-        return {
+        return _default_report_data(), {**dict.fromkeys(BINARY_REPORT_FIELDS, 0), 'timestamp_ms': int(time.time() * 1000)}
+
+def _default_report_data():
+    """采集失败时上报的默认数据"""
+    return {
             'ip': 'ipv4:127.0.0.1',
             'ipv4': '127.0.0.1',
             'ipv6': None,
@@ -1605,366 +3734,1517 @@ def collect_info():
             }
         }
 
+def _dict_delta(old, new, prefix=''):
+    """比较两个上报字典，返回 (changed, removed)：changed 只包含变化的字段（嵌套字典递归比较），
+    removed 为被删除字段的路径列表（嵌套字段以 '.' 连接）"""
+    changed = {}
+    removed = []
+    for key, value in new.items():
+        if key not in old:
+            changed[key] = value
+        elif isinstance(value, dict) and isinstance(old[key], dict):
+            sub_changed, sub_removed = _dict_delta(old[key], value, f"{prefix}{key}.")
+            if sub_changed:
+                changed[key] = sub_changed
+            removed.extend(sub_removed)
+        elif value != old[key]:
+            changed[key] = value
+    removed.extend(f"{prefix}{key}" for key in old if key not in new)
+    return changed, removed
+
+# 二进制上报包（struct格式）：小端，1字节版本号 + 以下字段（顺序固定）
+BINARY_REPORT_VERSION = 1
+BINARY_REPORT_LAYOUT = (
+    ('timestamp_ms', 'Q'),
+    ('cpu', 'f'),
+    ('ram', 'f'),
+    ('rom', 'f'),
+    ('load', 'f'),
+    ('uptime_s', 'Q'),
+    ('net_in_bps', 'Q'),
+    ('net_out_bps', 'Q'),
+    ('traffic_in_bytes', 'Q'),
+    ('traffic_out_bytes', 'Q'),
+    ('mem_total', 'Q'),
+    ('mem_used', 'Q'),
+    ('swap_total', 'Q'),
+    ('swap_used', 'Q'),
+    ('disk_total', 'Q'),
+    ('disk_used', 'Q'),
+    ('partitions_count', 'H'),
+)
+BINARY_REPORT_FIELDS = tuple(name for name, _ in BINARY_REPORT_LAYOUT)
+_BINARY_REPORT_STRUCT = struct.Struct('<B' + ''.join(fmt for _, fmt in BINARY_REPORT_LAYOUT))
+_STRUCT_INT_MAX = {'Q': 2 ** 64 - 1, 'H': 2 ** 16 - 1}
+
+# 很少变化的显示字段：二进制模式下只在变化时通过 report_meta 发送
+REPORT_META_FIELDS = ('ip', 'ipv4', 'ipv6', 'status', 'type', 'location')
+
+def pack_report_struct(metrics):
+    """按 BINARY_REPORT_LAYOUT 打包原始指标"""
+    values = []
+    for name, fmt in BINARY_REPORT_LAYOUT:
+        value = metrics.get(name) or 0
+        if fmt == 'f':
+            values.append(float(value))
+        else:
+            values.append(max(0, min(int(value), _STRUCT_INT_MAX[fmt])))
+    return _BINARY_REPORT_STRUCT.pack(BINARY_REPORT_VERSION, *values)
+
+def unpack_report_struct(packet):
+    """解包 pack_report_struct 生成的数据（服务端实现参考），返回指标字典"""
+    version, *values = _BINARY_REPORT_STRUCT.unpack(packet)
+    if version != BINARY_REPORT_VERSION:
+        raise ValueError(f"Unsupported binary report version: {version}")
+    return dict(zip(BINARY_REPORT_FIELDS, values))
+
+def _load_msgpack():
+    """msgpack为可选依赖（pip install msgpack），未安装时返回None"""
+    try:
+        import msgpack
+        return msgpack
+    except ImportError:
+        return None
+
+def pack_report_msgpack(metrics):
+    """使用msgpack打包原始指标（带版本号 v）"""
+    msgpack = _load_msgpack()
+    payload = {'v': BINARY_REPORT_VERSION}
+    payload.update((name, metrics.get(name)) for name in BINARY_REPORT_FIELDS)
+    return msgpack.packb(payload, use_bin_type=True)
+
+def supported_wire_formats():
+    """本客户端支持的二进制上报格式，按优先级排列"""
+    formats = ['struct']
+    if _load_msgpack() is not None:
+        formats.insert(0, 'msgpack')
+    return formats
+
+def _negotiated_wire_format(data):
+    """根据注册确认中服务端选择的 wire_format 确定上报编码，未协商成功时使用json"""
+    if REPORT_WIRE_FORMAT != 'binary':
+        return 'json'
+    chosen = data.get('wire_format') if isinstance(data, dict) else None
+    if chosen in supported_wire_formats():
+        log.info(f"[Client] 📦 Using binary report format: {chosen}")
+        return chosen
+    log.warning("[Client] ⚠️  Server did not accept binary reports, sending JSON reports")
+    return 'json'
+
+class ReportEncoder:
+    """上报数据编码器：full 模式原样发送；delta 模式先发完整快照（report_data，带 seq 和 full=True），
+    之后只发送变化字段（report_data_delta，带 seq 和 base_seq）。
+    
+    重新注册、发送失败或服务端请求（request_full_report）时重新发送完整快照。
+    wire_format 为 msgpack/struct 时改为发送二进制原始指标（report_data_bin），
+    显示字段只在变化时通过 report_meta 发送。
+    """
+    
+    def __init__(self, full_every=None):
+        self.full_every = REPORT_FULL_RESYNC_EVERY if full_every is None else full_every
+        self.delta_enabled = False
+        self.wire_format = 'json'
+        self._last_meta = None
+        self._seq = 0
+        self._last = None
+        self._since_full = 0
+    
+    def reset(self, delta_enabled=None, wire_format=None):
+        """下一次上报发送完整快照；delta_enabled / wire_format 不为None时同时切换模式"""
+        if delta_enabled is not None:
+            self.delta_enabled = delta_enabled
+        if wire_format is not None:
+            self.wire_format = wire_format
+        self._last = None
+        self._last_meta = None
+    
+    def encode_sample(self, data, metrics):
+        """返回本次上报需要发送的 [(事件名, 数据), ...]"""
+        if self.wire_format == 'json':
+            return [self.encode(data)]
+        
+        frames = []
+        meta = {key: data.get(key) for key in REPORT_META_FIELDS}
+        meta['cpu_info'] = (data.get('detail') or {}).get('cpu_info')
+        if meta != self._last_meta:
+            frames.append(('report_meta', meta))
+            self._last_meta = meta
+        if self.wire_format == 'msgpack':
+            frames.append(('report_data_bin', pack_report_msgpack(metrics)))
+        else:
+            frames.append(('report_data_bin', pack_report_struct(metrics)))
+        return frames
+    
+    def encode(self, data):
+        """返回 (事件名, 数据)"""
+        if not self.delta_enabled:
+            return 'report_data', data
+        
+        self._seq += 1
+        if self._last is None or (self.full_every and self._since_full >= self.full_every):
+            payload = {**data, 'seq': self._seq, 'full': True}
+            event = 'report_data'
+            self._since_full = 0
+        else:
+            changed, removed = _dict_delta(self._last, data)
+            payload = {'seq': self._seq, 'base_seq': self._seq - 1, 'changed': changed}
+            if removed:
+                payload['removed'] = removed
+            event = 'report_data_delta'
+        self._since_full += 1
+        self._last = copy.deepcopy(data)
+        return event, payload
+
+_report_encoder = ReportEncoder()
+
+def _report_mode_accepted(data):
+    """注册确认中服务端是否同意delta上报"""
+    if REPORT_MODE != 'delta':
+        return False
+    accepted = isinstance(data, dict) and data.get('report_mode') == 'delta'
+    if not accepted:
+        log.warning("[Client] ⚠️  Server did not accept delta reports, sending full reports")
+    return accepted
+
+class MetricsRingBuffer:
+    """离线指标环形缓冲：每个样本按 BINARY_REPORT_LAYOUT 打包为定长记录，存放在预分配的 bytearray 中
+    
+    缓冲满时最旧的记录追加到磁盘spool文件（有大小上限）。补发时先读spool再读内存，保持时间顺序；
+    peek() 取出待发记录，发送成功后再 commit() 删除，发送失败不会丢数据。
+    """
+    
+    def __init__(self, capacity=None, spool_path=None, spool_max_bytes=None):
+        self.capacity = METRICS_BUFFER_SIZE if capacity is None else capacity
+        self.spool_path = METRICS_SPOOL_FILE if spool_path is None else spool_path
+        self.spool_max_bytes = METRICS_SPOOL_MAX_BYTES if spool_max_bytes is None else spool_max_bytes
+        self.record_size = _BINARY_REPORT_STRUCT.size
+        self._buffer = bytearray(self.capacity * self.record_size)
+        self._head = 0  # 最旧记录的槽位
+        self._count = 0
+        self._spool_offset = 0  # spool文件中已补发的字节数
+        self._lock = threading.Lock()
+        self.stats = {'buffered': 0, 'spooled': 0, 'dropped': 0, 'backfilled': 0}
+    
+    def _spool_size(self):
+        """spool文件中完整记录的字节数（忽略写了一半的尾部记录）"""
+        try:
+            size = os.path.getsize(self.spool_path)
+        except OSError:
+            return 0
+        return size - size % self.record_size
+    
+    def _spill(self, record):
+        if not self.spool_path:
+            self.stats['dropped'] += 1
+            return
+        try:
+            if self._spool_size() + self.record_size > self.spool_max_bytes:
+                self.stats['dropped'] += 1
+                return
+            with open(self.spool_path, 'ab') as f:
+                f.write(record)
+            self.stats['spooled'] += 1
+        except OSError as e:
+            log.warning(f"[Buffer] ⚠️  Failed to write spool file: {e}")
+            self.stats['dropped'] += 1
+    
+    def append(self, metrics):
+        """缓存一个样本（原始指标字典）"""
+        record = pack_report_struct(metrics)
+        size = self.record_size
+        with self._lock:
+            if self.capacity <= 0:
+                self._spill(record)
+                return
+            if self._count == self.capacity:
+                start = self._head * size
+                self._spill(bytes(self._buffer[start:start + size]))
+                self._head = (self._head + 1) % self.capacity
+                self._count -= 1
+            slot = (self._head + self._count) % self.capacity
+            self._buffer[slot * size:(slot + 1) * size] = record
+            self._count += 1
+            self.stats['buffered'] += 1
+    
+    def pending(self):
+        """待补发的样本数"""
+        with self._lock:
+            return (self._spool_size() - self._spool_offset) // self.record_size + self._count
+    
+    def peek(self, limit):
+        """按时间顺序返回最多 limit 条待补发记录（bytes），不删除"""
+        size = self.record_size
+        records = []
+        with self._lock:
+            spool_size = self._spool_size()
+            if spool_size > self._spool_offset:
+                try:
+                    with open(self.spool_path, 'rb') as f:
+                        f.seek(self._spool_offset)
+                        data = f.read(min(spool_size - self._spool_offset, limit * size))
+                    records.extend(data[i:i + size] for i in range(0, len(data) - size + 1, size))
+                except OSError as e:
+                    log.warning(f"[Buffer] ⚠️  Failed to read spool file: {e}")
+            for index in range(min(self._count, limit - len(records))):
+                start = ((self._head + index) % self.capacity) * size
+                records.append(bytes(self._buffer[start:start + size]))
+        return records
+    
+    def commit(self, count):
+        """删除最旧的 count 条记录（已成功补发）"""
+        size = self.record_size
+        with self._lock:
+            self.stats['backfilled'] += count
+            spool_records = (self._spool_size() - self._spool_offset) // size
+            from_spool = min(count, spool_records)
+            self._spool_offset += from_spool * size
+            if from_spool and from_spool == spool_records:
+                # spool已全部补发，删除文件
+                try:
+                    os.remove(self.spool_path)
+                except OSError:
+                    pass
+                self._spool_offset = 0
+            from_ring = min(count - from_spool, self._count)
+            if from_ring and self.capacity:
+                self._head = (self._head + from_ring) % self.capacity
+                self._count -= from_ring
+
+_metrics_buffer = None
+_metrics_buffer_lock = threading.Lock()
+
+def get_metrics_buffer():
+    """获取全局离线指标缓冲（上次运行遗留的spool也会被补发）"""
+    global _metrics_buffer
+    with _metrics_buffer_lock:
+        if _metrics_buffer is None:
+            _metrics_buffer = MetricsRingBuffer()
+        return _metrics_buffer
+
+def buffer_offline_sample(metrics=None):
+    """未连接/未注册或发送失败时缓存样本，重连后补发"""
+    try:
+        if metrics is None:
+            _, metrics = collect_sample()
+        get_metrics_buffer().append(metrics)
+    except Exception as e:
+        log.error(f"[Buffer] ❌ Failed to buffer sample: {e}")
+
+def build_backfill_batch(buffer, wire_format='json', limit=None):
+    """从缓冲中取出一批记录，返回 (记录数, report_data_batch数据)；没有待补发数据时返回 (0, None)
+    
+    struct 格式下直接发送拼接的二进制记录，否则发送解包后的指标字典列表。
+    """
+    records = buffer.peek(BACKFILL_BATCH_SIZE if limit is None else limit)
+    if not records:
+        return 0, None
+    payload = {'node_name': NODE_NAME, 'version': BINARY_REPORT_VERSION}
+    if wire_format == 'struct':
+        payload['format'] = 'struct'
+        payload['records'] = b''.join(records)
+    else:
+        samples = []
+        for record in records:
+            try:
+                samples.append(unpack_report_struct(record))
+            except (struct.error, ValueError):
+                continue  # 版本不兼容或损坏的记录直接丢弃
+        payload['format'] = 'json'
+        payload['samples'] = samples
+    payload['remaining'] = buffer.pending() - len(records)
+    return len(records), payload
+
+def send_backfill_batch():
+    """补发一批离线样本（同步模式），返回是否发送了数据"""
+    buffer = get_metrics_buffer()
+    count, payload = build_backfill_batch(buffer, _report_encoder.wire_format)
+    if not count:
+        return False
+    try:
+        sio.emit('report_data_batch', payload)
+    except Exception as e:
+        log.error(f"[Buffer] ❌ Failed to send backfill batch: {e}")
+        return False
+    buffer.commit(count)
+    log.info(f"[Buffer] 📤 Backfilled {count} samples ({payload['remaining']} remaining)")
+    return True
+
 # Socket.IO 事件处理器
 @sio.event
 def connect():
     global _connection_stable, _registration_confirmed
-    print(f"[Socket] ✅ Connected to server: {SERVER_URL}")
+    log.info(f"[Socket] ✅ Connected to server: {SERVER_URL}")
     _connection_stable = True
     _registration_confirmed = False  # 重置注册状态，等待注册确认
     # 🔧 连接成功后立即注册，避免延迟
-    print(f"[Socket] 📝 Sending registration request for node: {NODE_NAME}")
+    log.info(f"[Socket] 📝 Sending registration request for node: {NODE_NAME}")
     try:
-        sio.emit('register', {'node_name': NODE_NAME})
-        print(f"[Socket] 📤 Registration request sent")
+        sio.emit('register', build_registration_payload())
+        log.info("[Socket] 📤 Registration request sent")
     except Exception as reg_error:
-        print(f"[Socket] ❌ Failed to send registration: {reg_error}")
+        log.error(f"[Socket] ❌ Failed to send registration: {reg_error}")
 
 @sio.event
 def disconnect():
     global _connection_stable, _registration_confirmed
-    print(f"[Socket] ❌ Disconnected from server - will attempt reconnection")
+    log.error("[Socket] ❌ Disconnected from server - will attempt reconnection")
     _connection_stable = False
     _registration_confirmed = False
 
 @sio.event
 def connect_error(data):
     global _connection_stable, _registration_confirmed
-    print(f"[Socket] ❌ Connection error: {data}")
+    log.error(f"[Socket] ❌ Connection error: {data}")
     _connection_stable = False
     _registration_confirmed = False
 
 @sio.event
 def reconnect():
     global _connection_stable, _registration_confirmed
-    print(f"[Socket] 🔄 Reconnected to server successfully")
+    log.info("[Socket] 🔄 Reconnected to server successfully")
     _connection_stable = True
     _registration_confirmed = False  # 重置注册状态
     # 重连后重新注册
-    print(f"[Socket] 📝 Sending re-registration request for node: {NODE_NAME}")
+    log.info(f"[Socket] 📝 Sending re-registration request for node: {NODE_NAME}")
     try:
-        sio.emit('register', {'node_name': NODE_NAME})
-        print(f"[Socket] 📤 Re-registration request sent")
+        sio.emit('register', build_registration_payload())
+        log.info("[Socket] 📤 Re-registration request sent")
     except Exception as reg_error:
-        print(f"[Socket] ❌ Failed to send re-registration: {reg_error}")
+        log.error(f"[Socket] ❌ Failed to send re-registration: {reg_error}")
 
 @sio.event  
 def reconnect_error(data):
     global _connection_stable, _registration_confirmed
-    print(f"[Socket] ❌ Reconnection error: {data}")
+    log.error(f"[Socket] ❌ Reconnection error: {data}")
     _connection_stable = False
     _registration_confirmed = False
 
 @sio.event
 def connection_replaced(data):
-    print(f"[Socket] ⚠️  Connection replaced by new instance: {data.get('message', 'Unknown reason')}")
-    print(f"[Socket] New socket ID: {data.get('new_socket_id', 'Unknown')}") 
-    print(f"[Socket] This connection will be closed, allowing new connection to take over")
+    log.warning(f"[Socket] ⚠️  Connection replaced by new instance: {data.get('message', 'Unknown reason')}")
+    log.info(f"[Socket] New socket ID: {data.get('new_socket_id', 'Unknown')}") 
+    log.info("[Socket] This connection will be closed, allowing new connection to take over")
     # 不需要做任何特殊处理，让Socket.IO自然断开并重连
 
 @sio.event
 def registration_success(data):
     global _registration_confirmed
     socket_id = data.get('socket_id', 'Unknown')
-    print(f"[Socket] ✅ Node '{NODE_NAME}' registered successfully (socket: {socket_id})")
+    log.info(f"[Socket] ✅ Node '{NODE_NAME}' registered successfully (socket: {socket_id})")
     _registration_confirmed = True  # 🔧 确认注册成功
-    print(f"[Socket] 🎉 Registration confirmed, client is now fully operational")
+    # 每次（重新）注册后先发送完整快照
+    _report_encoder.reset(delta_enabled=_report_mode_accepted(data), wire_format=_negotiated_wire_format(data))
+    _report_scheduler.reset()
+    log.info("[Socket] 🎉 Registration confirmed, client is now fully operational")
+
+@sio.event
+def set_report_interval(data):
+    _report_scheduler.set_server_interval(data)
+
+@sio.event
+def backpressure(data):
+    _report_scheduler.set_server_interval(data)
+
+@sio.event
+def request_client_stats(data=None):
+    send_client_stats()
+
+@sio.event
+def request_full_report(data=None):
+    log.info("[Socket] 🔄 Server requested full report resync")
+    _report_encoder.reset()
 
 @sio.event
 def registration_failed(data):
     global _registration_confirmed
     error_msg = data.get('error', 'Unknown error')
-    print(f"[Socket] ❌ Registration failed: {error_msg}")
+    log.error(f"[Socket] ❌ Registration failed: {error_msg}")
     _registration_confirmed = False
-    print(f"[Socket] 🔄 Will retry registration...")
+    log.info("[Socket] 🔄 Will retry registration...")
 
 @sio.event
 def error(data):
-    print(f"[Socket] ❌ Socket error: {data}")
+    log.error(f"[Socket] ❌ Socket error: {data}")
+
+def build_registration_payload():
+    """构建注册请求数据（同步与asyncio运行时共用）"""
+    payload = {'node_name': NODE_NAME}
+    if REPORT_MODE == 'delta':
+        payload['report_mode'] = 'delta'
+    if REPORT_WIRE_FORMAT == 'binary':
+        payload['wire_formats'] = supported_wire_formats()
+    return payload
+
+def _tcping_error_result(host, port, error, request_id, error_code='error'):
+    """构建失败的tcping结果"""
+    return {
+        'host': host,
+        'port': port,
+        'latency': None,
+        'success': False,
+        'error': error,
+        'error_code': error_code,
+        'request_id': request_id,
+        'node_name': NODE_NAME,
+        'timestamp': int(time.time() * 1000)
+    }
+
+class TcpingWorkerPool:
+    """tcping请求工作池：限制并发、限制排队深度、按请求截止时间执行，并合并相同 host:port 的进行中请求
+    
+    结果通过提交时传入的 emit(result) 回调发送，同步和asyncio运行时各自提供回调。
+    """
+    
+    def __init__(self, max_workers=None, max_queue=None, default_deadline=None):
+        self.max_workers = TCPING_MAX_CONCURRENCY if max_workers is None else max_workers
+        self.max_queue = TCPING_MAX_QUEUE if max_queue is None else max_queue
+        self.default_deadline = TCPING_REQUEST_DEADLINE if default_deadline is None else default_deadline
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='tcping')
+        self._lock = threading.Lock()
+        self._inflight = {}  # 'host:port' -> [(request_id, 接收时间, emit), ...]
+        self._pending = 0
+        self.stats = {'submitted': 0, 'coalesced': 0, 'rejected': 0, 'expired': 0}
+    
+    def submit(self, data, emit):
+        """提交一个 request_tcping 请求，返回 'queued' / 'coalesced' / 'rejected' / 'invalid'"""
+        host = data.get('host')
+        port = data.get('port')
+        request_id = data.get('request_id', 'unknown')
+        
+        if not host or not port:
+            log.error(f"[TCPing] ❌ 收到无效请求: host={host}, port={port}")
+            return 'invalid'
+        
+        try:
+            deadline = float(data['deadline_ms']) / 1000 if data.get('deadline_ms') else self.default_deadline
+        except (TypeError, ValueError):
+            deadline = self.default_deadline
+        try:
+            count = max(1, int(data.get('count') or 1))
+            interval_ms = float(data['interval_ms']) if data.get('interval_ms') is not None else None
+        except (TypeError, ValueError):
+            count, interval_ms = 1, None
+        max_latency_ms = _parse_max_latency(data)
+        probe_options = {'count': count, 'interval_ms': interval_ms, 'max_latency_ms': max_latency_ms}
+        
+        received_at = time.monotonic()
+        # 只有探测参数完全相同的请求才合并
+        key = f"{str(host).lower()}:{port}"
+        if count > 1 or interval_ms is not None or max_latency_ms is not None:
+            key = f"{key}|{count}|{interval_ms}|{max_latency_ms}"
+        waiter = (request_id, received_at, emit)
+        
+        with self._lock:
+            self.stats['submitted'] += 1
+            if key in self._inflight:
+                # 相同目标的探测正在进行，共享其结果
+                self._inflight[key].append(waiter)
+                self.stats['coalesced'] += 1
+                log.debug(f"[TCPing] Coalesced request {request_id} into in-flight probe {key}")
+                return 'coalesced'
+            if self._pending >= self.max_workers + self.max_queue:
+                self.stats['rejected'] += 1
+                rejected = True
+            else:
+                rejected = False
+                self._inflight[key] = [waiter]
+                self._pending += 1
+        
+        if rejected:
+            log.error(f"[TCPing] ❌ Queue full, rejecting request {request_id} ({host}:{port})")
+            emit(_tcping_error_result(host, port, 'Queue full', request_id, 'queue_full'))
+            return 'rejected'
+        
+        log.debug(f"[TCPing] Server requested ping to {host}:{port} (request_id: {request_id})")
+        self._executor.submit(self._run, key, host, port, received_at + deadline, probe_options)
+        return 'queued'
+    
+    def _run(self, key, host, port, deadline_at, probe_options=None):
+        try:
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                # 在队列中等待超过截止时间，不再探测
+                result = None
+                error, error_code = 'Deadline exceeded', 'deadline_exceeded'
+                with self._lock:
+                    self.stats['expired'] += 1
+            else:
+                try:
+                    result = perform_tcping(host, port, timeout=remaining, **(probe_options or {}))
+                    error, error_code = None, None
+                except Exception as e:
+                    log.warning(f"[TCPing] 处理请求异常: {e}")
+                    result = None
+                    error, error_code = str(e), 'error'
+        finally:
+            with self._lock:
+                waiters = self._inflight.pop(key, [])
+                self._pending -= 1
+        
+        for request_id, received_at, emit in waiters:
+            if result is None:
+                enhanced_result = _tcping_error_result(host, port, error, request_id, error_code)
+            else:
+                processing_time = (time.monotonic() - received_at) * 1000  # 转换为毫秒
+                enhanced_result = {
+                    **result,
+                    'request_id': request_id,
+                    'node_name': NODE_NAME,
+                    'processing_time_ms': round(processing_time, 1),
+                    'timestamp': int(time.time() * 1000)
+                }
+                log.debug(f"[TCPing] 发送结果: {host}:{port} -> {result['success']} {result.get('latency', 'N/A')}ms (处理耗时: {processing_time:.1f}ms)")
+            try:
+                emit(enhanced_result)
+            except Exception as emit_error:
+                log.debug(f"[TCPing] 发送结果失败: {emit_error}")
+    
+    def submit_batch(self, data, emit):
+        """提交一个 request_tcping_batch 请求（占用一个工作线程），返回 'queued' / 'rejected'"""
+        request_id = data.get('request_id', 'unknown')
+        with self._lock:
+            self.stats['submitted'] += 1
+            if self._pending >= self.max_workers + self.max_queue:
+                self.stats['rejected'] += 1
+                rejected = True
+            else:
+                rejected = False
+                self._pending += 1
+        
+        if rejected:
+            log.error(f"[TCPing] ❌ Queue full, rejecting batch {request_id}")
+            emit({
+                'request_id': request_id,
+                'node_name': NODE_NAME,
+                'results': [],
+                'error': 'Queue full',
+                'timestamp': int(time.time() * 1000)
+            })
+            return 'rejected'
+        
+        self._executor.submit(self._run_batch, data, emit)
+        return 'queued'
+    
+    def _run_batch(self, data, emit):
+        try:
+            result = handle_tcping_batch(data)
+        except Exception as e:
+            log.warning(f"[TCPing] 处理批量请求异常: {e}")
+            result = {
+                'request_id': data.get('request_id', 'unknown'),
+                'node_name': NODE_NAME,
+                'results': [],
+                'error': str(e),
+                'timestamp': int(time.time() * 1000)
+            }
+        finally:
+            with self._lock:
+                self._pending -= 1
+        try:
+            emit(result)
+        except Exception as emit_error:
+            log.warning(f"[TCPing] 发送批量结果失败: {emit_error}")
+    
+    def shutdown(self, wait=False):
+        self._executor.shutdown(wait=wait)
+
+def get_tcping_pool():
+    """获取全局tcping工作池"""
+    global _tcping_pool
+    if _tcping_pool is None:
+        _tcping_pool = TcpingWorkerPool()
+    return _tcping_pool
+
+def _emit_tcping_sync(event, result):
+    """同步客户端发送tcping结果，带重试"""
+    # 🔧 增强发送错误处理，包含连接状态检查
+    max_retries = 3
+    for retry_count in range(1, max_retries + 1):
+        try:
+            if not sio.connected:
+                log.error("[TCPing] ❌ Socket disconnected during send, aborting")
+                break
+                
+            sio.emit(event, result)
+            break  # 发送成功
+        except Exception as emit_error:
+            log.debug(f"[TCPing] 发送结果失败 (尝试 {retry_count}/{max_retries}): {emit_error}")
+            if retry_count < max_retries:
+                time.sleep(0.1)  # 短暂等待后重试
+            else:
+                log.debug(f"[TCPing] 发送结果最终失败: {event} {result.get('request_id')}")
+
+def _emit_tcping_result_sync(result):
+    _emit_tcping_sync('tcping_result', result)
+
+def _emit_tcping_batch_result_sync(result):
+    _emit_tcping_sync('tcping_batch_result', result)
 
 # 🔧 增强TCPing请求处理，添加连接状态检查
 @sio.event
 def request_tcping(data):
-    """响应服务器的tcping请求 - 增强错误处理和数据完整性"""
+    """响应服务器的tcping请求 - 交给工作池执行，不阻塞Socket.IO事件处理"""
     if not sio.connected:
-        print(f"[TCPing] ❌ Socket not connected, ignoring request")
+        log.error("[TCPing] ❌ Socket not connected, ignoring request")
         return
-        
-    host = data.get('host')
-    port = data.get('port')
-    request_id = data.get('request_id', 'unknown')
     
-    if not host or not port:
-        print(f"[TCPing] ❌ 收到无效请求: host={host}, port={port}")
+    get_tcping_pool().submit(data, _emit_tcping_result_sync)
+
+@sio.event
+def request_tcping_batch(data):
+    """响应服务器的批量tcping请求，所有目标的结果合并为一个 tcping_batch_result 返回"""
+    if not sio.connected:
+        log.error("[TCPing] ❌ Socket not connected, ignoring batch request")
         return
     
-    print(f"[TCPing] Server requested ping to {host}:{port} (request_id: {request_id})")
+    get_tcping_pool().submit_batch(data or {}, _emit_tcping_batch_result_sync)
+
+class ReconnectController:
+    """重连控制：指数退避 + 全抖动（full jitter），避免服务端重启后所有节点同时重连
     
-    start_time = time.time()
+    第 n 次连续失败后等待 uniform(0, min(上限, 基础间隔 * 2^(n-1))) 秒；曾经连接成功的节点断线后，
+    第一次重连只等待 uniform(0, RECONNECT_FAST_DELAY) 秒（快速通道）。
+    MAX_RECONNECT_ATTEMPTS 为0时不限重连次数。
+    """
     
-    try:
-        # 执行tcping并返回结果
-        result = perform_tcping(host, port)
-        
-        processing_time = (time.time() - start_time) * 1000  # 转换为毫秒
-        
-        # 增强结果数据
-        enhanced_result = {
-            **result,
-            'request_id': request_id,
-            'node_name': NODE_NAME,
-            'processing_time_ms': round(processing_time, 1),
-            'timestamp': int(time.time() * 1000)
-        }
-        
-        print(f"[TCPing] 发送结果: {host}:{port} -> {result['success']} {result.get('latency', 'N/A')}ms (处理耗时: {processing_time:.1f}ms)")
-        
-        # 🔧 增强发送错误处理，包含连接状态检查
-        max_retries = 3
-        for retry_count in range(1, max_retries + 1):
-            try:
-                if not sio.connected:
-                    print(f"[TCPing] ❌ Socket disconnected during send, aborting")
-                    break
-                    
-                sio.emit('tcping_result', enhanced_result)
-                break  # 发送成功
-            except Exception as emit_error:
-                print(f"[TCPing] 发送结果失败 (尝试 {retry_count}/{max_retries}): {emit_error}")
-                if retry_count < max_retries:
-                    time.sleep(0.1)  # 短暂等待后重试
-                else:
-                    print(f"[TCPing] 发送结果最终失败: {host}:{port}")
-        
-    except Exception as e:
-        print(f"[TCPing] 处理请求异常: {e}")
-        # 发送错误结果
-        error_result = {
-            'host': host,
-            'port': port,
-            'success': False,
-            'error': str(e),
-            'request_id': request_id,
-            'node_name': NODE_NAME,
-            'timestamp': int(time.time() * 1000)
-        }
-        try:
-            if sio.connected:
-                sio.emit('tcping_result', error_result)
-        except:
-            print(f"[TCPing] 无法发送错误结果")
+    def __init__(self, base_interval=None, max_interval=None, max_attempts=None, fast_delay=None, rng=None):
+        self.base_interval = RECONNECT_INTERVAL if base_interval is None else base_interval
+        self.max_interval = RECONNECT_MAX_INTERVAL if max_interval is None else max_interval
+        self.max_attempts = MAX_RECONNECT_ATTEMPTS if max_attempts is None else max_attempts
+        self.fast_delay = RECONNECT_FAST_DELAY if fast_delay is None else fast_delay
+        self._random = rng or random.Random()
+        self._lock = threading.Lock()
+        self.failures = 0  # 当前断线期间的连续失败次数
+        self.total_attempts = 0
+        self.reconnects = 0
+        self.connected_once = False
+        self.last_error = None
+        self.next_attempt_at = None
+        self._disconnected_since = None
+        self._total_disconnected = 0.0
+    
+    def delay_before_attempt(self):
+        """下一次连接尝试前应等待的秒数"""
+        with self._lock:
+            if self.failures == 0:
+                if not self.connected_once:
+                    return 0.0  # 启动时立即连接
+                return self._random.uniform(0, self.fast_delay)
+            ceiling = min(self.max_interval, self.base_interval * 2 ** min(self.failures - 1, 30))
+            return self._random.uniform(0, ceiling)
+    
+    def on_disconnected(self, now=None):
+        """记录断线开始时间（幂等）"""
+        with self._lock:
+            if self._disconnected_since is None:
+                self._disconnected_since = time.monotonic() if now is None else now
+    
+    def ready(self, now=None):
+        """同步主循环使用：是否到了下一次连接尝试的时间"""
+        now = time.monotonic() if now is None else now
+        if self.next_attempt_at is None:
+            self.next_attempt_at = now + self.delay_before_attempt()
+        return now >= self.next_attempt_at
+    
+    def exhausted(self):
+        """是否已达到最大连续重连次数"""
+        return self.max_attempts > 0 and self.failures >= self.max_attempts
+    
+    def record_success(self, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self.total_attempts += 1
+            if self.connected_once:
+                self.reconnects += 1
+            self.connected_once = True
+            self.failures = 0
+            self.next_attempt_at = None
+            if self._disconnected_since is not None:
+                self._total_disconnected += max(0.0, now - self._disconnected_since)
+                self._disconnected_since = None
+    
+    def record_failure(self, error=None, now=None):
+        """记录一次失败的连接尝试，返回距下一次尝试的等待秒数"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self.total_attempts += 1
+            self.failures += 1
+            if error is not None:
+                self.last_error = str(error)
+            if self._disconnected_since is None:
+                self._disconnected_since = now
+        delay = self.delay_before_attempt()
+        self.next_attempt_at = now + delay
+        return delay
+    
+    def metrics(self, now=None):
+        """重连统计：尝试次数、断线时长、最后一次错误"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            current = now - self._disconnected_since if self._disconnected_since is not None else 0.0
+            return {
+                'attempts': self.total_attempts,
+                'consecutive_failures': self.failures,
+                'reconnects': self.reconnects,
+                'disconnected_seconds': round(current, 1),
+                'total_disconnected_seconds': round(self._total_disconnected + current, 1),
+                'last_error': self.last_error
+            }
+
+_reconnect_controller = ReconnectController()
+_last_connect_error = None
+
+def get_reconnect_metrics():
+    """同步运行模式的重连统计"""
+    return _reconnect_controller.metrics()
 
 def try_connect():
     """尝试连接到服务器 - 简化版本"""
+    global _last_connect_error
     try:
         # 🔧 简化：直接检查连接状态
         if sio.connected:
-            print(f"[Socket] Already connected, skipping connection attempt")
+            log.debug("[Socket] Already connected, skipping connection attempt")
             return True
             
-        print(f"[Socket] 🔄 Attempting to connect to {SERVER_URL}...")
+        log.info(f"[Socket] 🔄 Attempting to connect to {SERVER_URL}...")
         
         # 🔧 简化：直接连接，不做复杂的清理
         sio.connect(SERVER_URL, wait_timeout=10)  # 10秒超时
         
         # 连接成功
         if sio.connected:
-            print(f"[Socket] ✅ Connection established successfully")
+            log.info("[Socket] ✅ Connection established successfully")
+            _last_connect_error = None
             return True
         else:
-            print(f"[Socket] ❌ Connection failed - socket not connected after connect()")
+            log.error("[Socket] ❌ Connection failed - socket not connected after connect()")
+            _last_connect_error = 'socket not connected after connect()'
             return False
             
     except Exception as e:
-        print(f"[Socket] ❌ Connection failed: {e}")
+        log.error(f"[Socket] ❌ Connection failed: {e}")
+        _last_connect_error = str(e)
+        return False
+
+def build_heartbeat_payload(reconnect_controller=None):
+    """构建心跳包数据（同步与asyncio运行时共用）"""
+    return {
+        'node_name': NODE_NAME,
+        'timestamp': int(time.time() * 1000),
+        'version': CLIENT_VERSION,
+        'probe_stats': get_probe_stats(),
+        'connection_stats': (reconnect_controller or _reconnect_controller).metrics()
+    }
+
+def send_client_stats():
+    """发送 client_stats 事件（同步模式）"""
+    if not sio.connected:
+        return False
+    try:
+        sio.emit('client_stats', build_client_stats())
+        return True
+    except Exception as e:
+        log.error(f"[Stats] ❌ Failed to send client stats: {e}")
         return False
 
 def send_heartbeat():
     """发送心跳包 - 增强连接检测"""
     if sio.connected:
         try:
-            sio.emit('heartbeat', {
-                'node_name': NODE_NAME,
-                'timestamp': int(time.time() * 1000),
-                'version': CLIENT_VERSION
-            })
+            sio.emit('heartbeat', build_heartbeat_payload())
             # 只在调试模式下显示心跳日志
-            # print(f"[Socket] ❤️ Heartbeat sent")
+            # log.debug("[Socket] ❤️ Heartbeat sent")
         except Exception as e:
-            print(f"[Socket] ❌ Heartbeat failed: {e}")
+            log.error(f"[Socket] ❌ Heartbeat failed: {e}")
             return False
     return True
 
+def _significant_change(previous, current):
+    """比较两次上报的原始指标，判断是否超过自适应上报的阈值"""
+    if abs(current.get('cpu', 0) - previous.get('cpu', 0)) >= ADAPTIVE_CPU_DELTA:
+        return True
+    if abs(current.get('ram', 0) - previous.get('ram', 0)) >= ADAPTIVE_RAM_DELTA:
+        return True
+    if current.get('rom', 0) >= ADAPTIVE_DISK_ALERT and current.get('rom', 0) > previous.get('rom', 0):
+        return True
+    for key in ('net_in_bps', 'net_out_bps'):
+        if abs(current.get(key, 0) - previous.get(key, 0)) >= ADAPTIVE_NET_BURST:
+            return True
+    return False
+
+class AdaptiveReportScheduler:
+    """上报调度：决定何时调用下一次上报
+    
+    自适应模式下指标平稳时间隔按 ADAPTIVE_BACKOFF_FACTOR 逐步拉长（不超过 ADAPTIVE_MAX_INTERVAL），
+    出现显著变化（CPU突增、磁盘将满、网络突发）时回到基础间隔；高频采样值超过阈值时提前上报。
+    服务端可通过 set_report_interval 设置最小上报间隔（背压），可选 ttl 到期后自动恢复。
+    """
+    
+    def __init__(self, base_interval=None, max_interval=None, adaptive=None):
+        self.base_interval = DATA_SEND_INTERVAL if base_interval is None else base_interval
+        self.max_interval = ADAPTIVE_MAX_INTERVAL if max_interval is None else max_interval
+        self.adaptive = ADAPTIVE_REPORTING if adaptive is None else adaptive
+        self.interval = self.base_interval
+        self._server_interval = None
+        self._server_interval_expires = None
+        self._last_report_at = None
+        self._last_metrics = None
+        self._lock = threading.Lock()
+    
+    def _server_floor(self, now):
+        if self._server_interval is None:
+            return None
+        if self._server_interval_expires is not None and now >= self._server_interval_expires:
+            log.info("[Client] ⏱️  Server report interval expired, back to normal")
+            self._server_interval = self._server_interval_expires = None
+            return None
+        return self._server_interval
+    
+    def current_interval(self, now=None):
+        """当前生效的上报间隔（秒）"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            return max(self.interval, self._server_floor(now) or 0)
+    
+    def reset(self):
+        """（重新）注册后立即上报并回到基础间隔"""
+        with self._lock:
+            self.interval = self.base_interval
+            self._last_report_at = None
+            self._last_metrics = None
+    
+    def _urgent(self, now, elapsed):
+        """间隔被拉长时，检查高频采样的最新值是否已超过阈值"""
+        if not self.adaptive or self._last_metrics is None or self.interval <= self.base_interval:
+            return False
+        # 服务端背压优先：提前上报也不能短于服务端要求的间隔
+        if elapsed < max(self.base_interval, self._server_floor(now) or 0):
+            return False
+        latest = get_sampled_latest()
+        if not latest:
+            return False
+        current = dict(self._last_metrics)
+        current.update({'cpu': latest.get('cpu', current.get('cpu', 0)),
+                        'net_in_bps': latest.get('net_in', current.get('net_in_bps', 0)),
+                        'net_out_bps': latest.get('net_out', current.get('net_out_bps', 0))})
+        return _significant_change(self._last_metrics, current)
+    
+    def due(self, now=None):
+        """是否应该进行下一次上报"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self._last_report_at is None:
+                return True
+            elapsed = now - self._last_report_at
+            if elapsed >= max(self.interval, self._server_floor(now) or 0):
+                return True
+            return self._urgent(now, elapsed)
+    
+    def poll_delay(self, now=None):
+        """距离下一次检查 due() 的等待时间（秒）"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self._last_report_at is None:
+                return 0
+            remaining = max(self.interval, self._server_floor(now) or 0) - (now - self._last_report_at)
+            if self.adaptive and self.interval > self.base_interval:
+                remaining = min(remaining, CPU_SAMPLE_INTERVAL)
+            return max(0.05, remaining)
+    
+    def record(self, metrics, now=None):
+        """记录一次成功的上报，并据此调整下一次的间隔"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            previous = self._last_metrics
+            self._last_report_at = now
+            self._last_metrics = dict(metrics) if metrics else None
+            if not self.adaptive or previous is None or not metrics or _significant_change(previous, metrics):
+                self.interval = self.base_interval
+            else:
+                self.interval = min(self.max_interval, self.interval * ADAPTIVE_BACKOFF_FACTOR)
+    
+    def set_server_interval(self, data):
+        """处理服务端的 set_report_interval / backpressure 事件
+        
+        data: {'interval': 秒} 或 {'interval_ms': 毫秒}，可选 'ttl'（秒）；interval 为0或缺省时取消限制。
+        """
+        data = data if isinstance(data, dict) else {}
+        try:
+            if data.get('interval_ms') is not None:
+                interval = float(data['interval_ms']) / 1000
+            else:
+                interval = float(data.get('interval') or 0)
+            ttl = float(data['ttl']) if data.get('ttl') else None
+        except (TypeError, ValueError):
+            log.warning(f"[Client] ⚠️  Invalid report interval request: {data}")
+            return None
+        with self._lock:
+            if interval <= 0:
+                self._server_interval = self._server_interval_expires = None
+                log.info("[Client] ⏱️  Server report interval cleared")
+                return None
+            self._server_interval = max(1.0, min(interval, 3600.0))
+            self._server_interval_expires = time.monotonic() + ttl if ttl else None
+            log.info(f"[Client] ⏱️  Server requested report interval {self._server_interval:.1f}s"
+                  + (f" for {ttl:.0f}s" if ttl else ""))
+            return self._server_interval
+
+_report_scheduler = AdaptiveReportScheduler()
+
 def send_data():
     """发送监控数据 - 增强错误处理和连接检查"""
     global _last_successful_data_send, _connection_stable
     
     if not sio.connected:
-        print(f"[Client] ⚠️  Socket not connected, skipping data send")
+        log.warning("[Client] ⚠️  Socket not connected, skipping data send")
         _connection_stable = False
         return False
         
     if not _registration_confirmed:
-        print(f"[Client] ⚠️  Node not registered yet, skipping data send")
+        log.warning("[Client] ⚠️  Node not registered yet, skipping data send")
         return False
         
     try:
         # 收集系统信息
-        data = collect_info()
+        data, metrics = collect_sample()
+        frames = _report_encoder.encode_sample(data, metrics)
         
         # 发送数据，包含重试机制
         max_retries = 3
         for attempt in range(1, max_retries + 1):
             try:
                 if not sio.connected:
-                    print(f"[Client] ❌ Socket disconnected during send attempt {attempt}")
+                    log.error(f"[Client] ❌ Socket disconnected during send attempt {attempt}")
                     _connection_stable = False
+                    _report_encoder.reset()
+                    buffer_offline_sample(metrics)
                     return False
                     
-                sio.emit('report_data', data)
+                for event, payload in frames:
+                    sio.emit(event, payload)
                 # 只在第一次尝试或重试成功时显示详细日志
                 if attempt == 1:
-                    print(f"[Client] ✅ Data sent: CPU={data['cpu']}% RAM={data['ram']}% ROM={data['rom']}%")
+                    log.debug(f"[Client] ✅ Data sent: CPU={data['cpu']}% RAM={data['ram']}% ROM={data['rom']}%")
                 elif attempt > 1:
-                    print(f"[Client] ✅ Data sent successfully (attempt {attempt})")
+                    log.info(f"[Client] ✅ Data sent successfully (attempt {attempt})")
                 
                 # 🔧 记录成功发送时间
                 _last_successful_data_send = time.time()
+                _report_scheduler.record(metrics)
                 _connection_stable = True
                 return True
                 
             except Exception as send_error:
-                print(f"[Client] ❌ Failed to send data (attempt {attempt}/{max_retries}): {send_error}")
+                log.error(f"[Client] ❌ Failed to send data (attempt {attempt}/{max_retries}): {send_error}")
                 _connection_stable = False
                 if attempt < max_retries:
                     time.sleep(0.5)  # 等待0.5秒后重试
                 else:
+                    # 服务端可能没有收到这一帧，下次发送完整快照；样本留待补发
+                    _report_encoder.reset()
+                    buffer_offline_sample(metrics)
                     return False
                     
     except Exception as e:
-        print(f"[Client] ❌ Failed to collect or send data: {e}")
+        log.error(f"[Client] ❌ Failed to collect or send data: {e}")
         _connection_stable = False
         return False
 
 def test_connection_stability():
     """测试连接稳定性 - 可选的诊断功能"""
-    print(f"[Test] 🔧 Testing connection stability...")
+    log.info("[Test] 🔧 Testing connection stability...")
     
     # 测试基本连接
     if try_connect():
-        print(f"[Test] ✅ Basic connection test passed")
+        log.info("[Test] ✅ Basic connection test passed")
         
         # 测试数据发送
         if send_data():
-            print(f"[Test] ✅ Data transmission test passed")
+            log.info("[Test] ✅ Data transmission test passed")
         else:
-            print(f"[Test] ❌ Data transmission test failed")
+            log.error("[Test] ❌ Data transmission test failed")
         
         # 测试心跳
         if send_heartbeat():
-            print(f"[Test] ✅ Heartbeat test passed")
+            log.info("[Test] ✅ Heartbeat test passed")
         else:
-            print(f"[Test] ❌ Heartbeat test failed")
+            log.error("[Test] ❌ Heartbeat test failed")
         
         # 断开连接进行重连测试
-        print(f"[Test] 🔄 Testing reconnection mechanism...")
+        log.info("[Test] 🔄 Testing reconnection mechanism...")
         try:
             sio.disconnect()
             time.sleep(2)  # 等待2秒
             
             if try_connect():
-                print(f"[Test] ✅ Reconnection test passed")
+                log.info("[Test] ✅ Reconnection test passed")
             else:
-                print(f"[Test] ❌ Reconnection test failed")
+                log.error("[Test] ❌ Reconnection test failed")
         except Exception as e:
-            print(f"[Test] ❌ Reconnection test error: {e}")
+            log.error(f"[Test] ❌ Reconnection test error: {e}")
     else:
-        print(f"[Test] ❌ Basic connection test failed")
+        log.error("[Test] ❌ Basic connection test failed")
     
-    print(f"[Test] 🏁 Connection stability test completed")
+    log.info("[Test] 🏁 Connection stability test completed")
+
+class AsyncClientRuntime:
+    """asyncio运行时：基于 socketio.AsyncClient，上报、心跳、重连、注册检查各自作为独立任务运行
+    
+    阻塞的采集器和tcping在线程池中执行，任务之间通过事件驱动而不是轮询休眠。
+    """
+    
+    def __init__(self, server_url=None, collector_workers=4):
+        self.server_url = server_url or SERVER_URL
+        self.sio = socketio.AsyncClient(
+            reconnection=False,             # 重连由 _connection_task 负责
+            logger=False,
+            engineio_logger=False,
+            request_timeout=10,
+            ssl_verify=True
+        )
+        self._executor = ThreadPoolExecutor(max_workers=collector_workers, thread_name_prefix='collector')
+        self._encoder = ReportEncoder()
+        self._scheduler = AdaptiveReportScheduler()
+        self._reconnect = ReconnectController()
+        self._stop = None
+        self._connected = None
+        self._disconnected = None
+        self._registered = None
+        self._unregistered = None
+        self._register_handlers()
+    
+    def _register_handlers(self):
+        self.sio.on('connect', self._on_connect)
+        self.sio.on('disconnect', self._on_disconnect)
+        self.sio.on('connection_replaced', self._on_connection_replaced)
+        self.sio.on('registration_success', self._on_registration_success)
+        self.sio.on('registration_failed', self._on_registration_failed)
+        self.sio.on('request_full_report', self._on_request_full_report)
+        self.sio.on('set_report_interval', self._on_set_report_interval)
+        self.sio.on('request_client_stats', self._on_request_client_stats)
+        self.sio.on('backpressure', self._on_set_report_interval)
+        self.sio.on('request_tcping', self._on_request_tcping)
+        self.sio.on('request_tcping_batch', self._on_request_tcping_batch)
+    
+    # ---- 状态 ----
+    
+    def _set_connected(self, connected):
+        global _connection_stable
+        _connection_stable = connected
+        if connected:
+            self._disconnected.clear()
+            self._connected.set()
+        else:
+            self._connected.clear()
+            self._disconnected.set()
+            self._set_registered(False)
+    
+    def _set_registered(self, registered):
+        global _registration_confirmed
+        _registration_confirmed = registered
+        if registered:
+            self._unregistered.clear()
+            self._registered.set()
+        else:
+            self._registered.clear()
+            self._unregistered.set()
+    
+    async def _wait_or_stop(self, timeout):
+        """等待指定秒数，期间收到停止信号则返回True"""
+        try:
+            await asyncio.wait_for(self._stop.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+    
+    async def _wait_event_or_stop(self, event):
+        """等待事件被设置，收到停止信号则返回False"""
+        if event.is_set():
+            return True
+        waiters = [asyncio.ensure_future(event.wait()), asyncio.ensure_future(self._stop.wait())]
+        try:
+            await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+        return not self._stop.is_set()
+    
+    async def _run_blocking(self, func, *args):
+        """在线程池中执行阻塞函数"""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+    
+    # ---- Socket.IO 事件 ----
+    
+    async def _on_connect(self):
+        log.info(f"[Socket] ✅ Connected to server: {self.server_url}")
+        self._set_connected(True)
+        self._set_registered(False)
+        log.info(f"[Socket] 📝 Sending registration request for node: {NODE_NAME}")
+        try:
+            await self.sio.emit('register', build_registration_payload())
+        except Exception as reg_error:
+            log.error(f"[Socket] ❌ Failed to send registration: {reg_error}")
+    
+    async def _on_disconnect(self, *args):
+        log.error("[Socket] ❌ Disconnected from server - will attempt reconnection")
+        self._set_connected(False)
+    
+    async def _on_connection_replaced(self, data):
+        log.warning(f"[Socket] ⚠️  Connection replaced by new instance: {data.get('message', 'Unknown reason')}")
+    
+    async def _on_registration_success(self, data):
+        socket_id = data.get('socket_id', 'Unknown')
+        log.info(f"[Socket] ✅ Node '{NODE_NAME}' registered successfully (socket: {socket_id})")
+        self._encoder.reset(delta_enabled=_report_mode_accepted(data), wire_format=_negotiated_wire_format(data))
+        self._scheduler.reset()
+        self._set_registered(True)
+    
+    async def _on_registration_failed(self, data):
+        log.error(f"[Socket] ❌ Registration failed: {data.get('error', 'Unknown error')}")
+        self._set_registered(False)
+    
+    async def _on_request_client_stats(self, data=None):
+        await self._emit_client_stats()
+    
+    async def _emit_client_stats(self):
+        try:
+            await self.sio.emit('client_stats', build_client_stats(self._reconnect))
+        except Exception as e:
+            log.error(f"[Stats] ❌ Failed to send client stats: {e}")
+    
+    async def _on_set_report_interval(self, data):
+        self._scheduler.set_server_interval(data)
+    
+    async def _on_request_full_report(self, data=None):
+        log.info("[Socket] 🔄 Server requested full report resync")
+        self._encoder.reset()
+    
+    def _threadsafe_emitter(self, event):
+        """返回可在工作池线程中调用的发送函数，结果切回事件循环发送"""
+        loop = asyncio.get_event_loop()
+        
+        def emit(result):
+            asyncio.run_coroutine_threadsafe(self._emit_tcping_result(event, result), loop)
+        
+        return emit
+    
+    async def _on_request_tcping(self, data):
+        get_tcping_pool().submit(data, self._threadsafe_emitter('tcping_result'))
+    
+    async def _on_request_tcping_batch(self, data):
+        get_tcping_pool().submit_batch(data or {}, self._threadsafe_emitter('tcping_batch_result'))
+    
+    async def _emit_tcping_result(self, event, result):
+        if not self.sio.connected:
+            log.error("[TCPing] ❌ Socket disconnected during send, aborting")
+            return
+        try:
+            await self.sio.emit(event, result)
+        except Exception as emit_error:
+            log.debug(f"[TCPing] 发送结果失败: {emit_error}")
+    
+    # ---- 任务 ----
+    
+    async def _connection_task(self):
+        """断线时按退避策略重连，连接期间等待断线事件"""
+        reconnect = self._reconnect
+        while not self._stop.is_set():
+            if self.sio.connected:
+                await self._wait_event_or_stop(self._disconnected)
+                continue
+            
+            reconnect.on_disconnected()
+            if reconnect.exhausted():
+                log.error(f"[Client] 😴 Maximum reconnection attempts ({reconnect.max_attempts}) reached")
+                self.stop()
+                break
+            delay = reconnect.delay_before_attempt()
+            if delay > 0:
+                log.info(f"[Socket] ⏳ Reconnecting in {delay:.1f}s...")
+                if await self._wait_or_stop(delay):
+                    break
+            
+            log.info(f"[Socket] 🔄 Attempting to connect to {self.server_url} (attempt #{reconnect.failures + 1})...")
+            try:
+                await self.sio.connect(self.server_url, wait_timeout=10)
+                if self.sio.connected:
+                    reconnect.record_success()
+                    continue
+                reconnect.record_failure('socket not connected after connect()')
+            except Exception as e:
+                log.error(f"[Socket] ❌ Connection failed: {e}")
+                reconnect.record_failure(e)
+    
+    async def _registration_task(self):
+        """连接后等待注册确认，超时则重新注册"""
+        while not self._stop.is_set():
+            if not await self._wait_event_or_stop(self._connected):
+                break
+            if self._registered.is_set():
+                await self._wait_event_or_stop(self._unregistered)
+                continue
+            try:
+                await asyncio.wait_for(self._registered.wait(), REGISTRATION_TIMEOUT)
+                continue
+            except asyncio.TimeoutError:
+                pass
+            if self.sio.connected and not self._registered.is_set():
+                log.warning("[Client] ⚠️  Registration timeout, retrying...")
+                try:
+                    await self.sio.emit('register', build_registration_payload())
+                except Exception as reg_error:
+                    log.error(f"[Client] ❌ Registration retry failed: {reg_error}")
+    
+    async def _report_task(self):
+        """按间隔采集数据（在线程池中执行），已注册时按上报调度上报，否则缓存到离线缓冲"""
+        global _last_successful_data_send
+        loop = asyncio.get_event_loop()
+        while not self._stop.is_set():
+            online = self.sio.connected and self._registered.is_set()
+            if online and not self._scheduler.due():
+                if await self._wait_or_stop(self._scheduler.poll_delay()):
+                    break
+                continue
+            started = loop.time()
+            metrics = None
+            try:
+                data, metrics = await self._run_blocking(collect_sample)
+                if self.sio.connected and self._registered.is_set():
+                    for event, payload in self._encoder.encode_sample(data, metrics):
+                        await self.sio.emit(event, payload)
+                    _last_successful_data_send = time.time()
+                    self._scheduler.record(metrics)
+                    log.debug(f"[Client] ✅ Data sent: CPU={data['cpu']}% RAM={data['ram']}% ROM={data['rom']}%")
+                else:
+                    get_metrics_buffer().append(metrics)
+            except Exception as e:
+                log.error(f"[Client] ❌ Failed to collect or send data: {e}")
+                self._encoder.reset()
+                if online:
+                    self._scheduler.record(None)  # 按基础间隔再试
+                if metrics is not None:
+                    buffer_offline_sample(metrics)
+            if online:
+                continue  # 下一次上报时间由调度决定
+            if await self._wait_or_stop(max(0, DATA_SEND_INTERVAL - (loop.time() - started))):
+                break
+    
+    async def _backfill_task(self):
+        """注册成功后限速补发离线缓冲中的样本"""
+        buffer = get_metrics_buffer()
+        while not self._stop.is_set():
+            if not await self._wait_event_or_stop(self._registered):
+                break
+            count, payload = build_backfill_batch(buffer, self._encoder.wire_format)
+            if count:
+                try:
+                    await self.sio.emit('report_data_batch', payload)
+                    buffer.commit(count)
+                    log.info(f"[Buffer] 📤 Backfilled {count} samples ({payload['remaining']} remaining)")
+                except Exception as e:
+                    log.error(f"[Buffer] ❌ Failed to send backfill batch: {e}")
+                wait = BACKFILL_INTERVAL
+            else:
+                wait = DATA_SEND_INTERVAL
+            if await self._wait_or_stop(wait):
+                break
+    
+    async def _client_stats_task(self):
+        """可选：注册期间按 CLIENT_STATS_INTERVAL 定期发送客户端统计"""
+        while CLIENT_STATS_INTERVAL and not self._stop.is_set():
+            if await self._wait_or_stop(CLIENT_STATS_INTERVAL):
+                break
+            if self.sio.connected and self._registered.is_set():
+                await self._emit_client_stats()
+    
+    async def _heartbeat_task(self):
+        """连接期间按间隔发送心跳"""
+        while not self._stop.is_set():
+            if not await self._wait_event_or_stop(self._connected):
+                break
+            try:
+                await self.sio.emit('heartbeat', build_heartbeat_payload(self._reconnect))
+            except Exception as e:
+                log.error(f"[Socket] ❌ Heartbeat failed: {e}")
+            if await self._wait_or_stop(HEARTBEAT_INTERVAL):
+                break
+    
+    def stop(self):
+        """请求停止运行时"""
+        if self._stop is not None:
+            self._stop.set()
+    
+    async def run(self):
+        """运行所有任务直到 stop() 被调用"""
+        # 事件必须在运行中的事件循环内创建
+        self._stop = asyncio.Event()
+        self._connected = asyncio.Event()
+        self._disconnected = asyncio.Event()
+        self._registered = asyncio.Event()
+        self._unregistered = asyncio.Event()
+        self._disconnected.set()
+        self._unregistered.set()
+        
+        tasks = [asyncio.ensure_future(coro) for coro in (
+            self._connection_task(),
+            self._registration_task(),
+            self._report_task(),
+            self._backfill_task(),
+            self._client_stats_task(),
+            self._heartbeat_task()
+        )]
+        try:
+            await self._stop.wait()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            log.info("[Client] 🧹 Cleaning up...")
+            try:
+                if self.sio.connected:
+                    log.info("[Client] 📡 Disconnecting from server...")
+                    await self.sio.disconnect()
+            except Exception as cleanup_error:
+                log.warning(f"[Client] ⚠️  Cleanup error: {cleanup_error}")
+            self._executor.shutdown(wait=False)
+
+def _async_runtime_available():
+    """检查asyncio运行时的依赖（socketio.AsyncClient需要aiohttp）"""
+    try:
+        import aiohttp  # noqa: F401
+        return True
+    except ImportError:
+        log.warning("[Client] ⚠️  RUNTIME_MODE='async' requires aiohttp (pip install aiohttp), falling back to sync mode")
+        return False
+
+def run_async_runtime():
+    """以asyncio模式运行客户端"""
+    log.info("[Client] 🔁 Starting asyncio runtime...")
+    runtime = AsyncClientRuntime()
+    try:
+        asyncio.run(runtime.run())
+    except KeyboardInterrupt:
+        log.info("[Client] 🛑 Keyboard interrupt received")
+    log.info("[Client] 👋 Client stopped")
 
 def main():
     """主函数 - 简化重连机制，确保Socket隧道稳定性"""
-    print(f"[Client] 🚀 B-Server Monitor Client v{CLIENT_VERSION} starting...")
-    print(f"[Client] Node Name: {NODE_NAME}")
-    print(f"[Client] Server URL: {SERVER_URL}")
-    print(f"[Client] Location: {NODE_LOCATION}")
+    setup_logging()
+    log.info(f"[Client] 🚀 B-Server Monitor Client v{CLIENT_VERSION} starting...")
+    log.info(f"[Client] Node Name: {NODE_NAME}")
+    log.info(f"[Client] Server URL: {SERVER_URL}")
+    log.info(f"[Client] Location: {NODE_LOCATION}")
+    
+    # 后台解析公网IP，上报路径只读缓存
+    start_ip_resolver()
+    
+    # 后台CPU采样，上报路径不再阻塞等待
+    start_cpu_sampler()
+    
+    # 加载硬件/系统指纹缓存，重启后无需重新检测
+    warm_start_fingerprint()
+    
+    # tcping探测方法只查找一次
+    init_probe_context()
+    
+    # kill -USR1 <pid> 写出采集耗时等统计
+    install_stats_dump_handler()
+    
+    # asyncio运行模式（可选），同步模式保持不变
+    if RUNTIME_MODE == 'async' and _async_runtime_available():
+        run_async_runtime()
+        return
     
     # 🔧 简化参数配置 - 用户建议的简单方案
-    data_send_interval = 5          # 5秒发送数据间隔
-    heartbeat_interval = 30         # 30秒心跳间隔
-    reconnect_interval = 2          # 🔧 简化：2秒重连间隔
-    max_reconnect_attempts = 1000   # 🔧 简化：最多1000次重连尝试
-    registration_timeout = 10       # 🔧 修复：注册超时时间
+    data_send_interval = DATA_SEND_INTERVAL          # 5秒发送数据间隔
+    heartbeat_interval = HEARTBEAT_INTERVAL          # 30秒心跳间隔
+    registration_timeout = REGISTRATION_TIMEOUT      # 🔧 修复：注册超时时间
     
     # 简化状态跟踪变量
     last_data_send = 0
     last_heartbeat = 0
+    last_backfill = 0
+    last_client_stats = time.time()
     last_registration_attempt = 0
-    reconnect_count = 0             # 🔧 简化：重连计数器
+    reconnect = _reconnect_controller  # 🔧 指数退避 + 抖动的重连控制
     
     # 🔧 第一次连接尝试
-    print(f"[Client] 🔄 Initial connection attempt...")
+    log.info("[Client] 🔄 Initial connection attempt...")
     if try_connect():
-        reconnect_count = 0
+        reconnect.record_success()
         last_registration_attempt = time.time()  # 记录注册时间
-        print(f"[Client] ✅ Initial connection successful")
+        log.info("[Client] ✅ Initial connection successful")
     else:
-        reconnect_count = 1
-        print(f"[Client] ❌ Initial connection failed, will start reconnection attempts")
+        reconnect.record_failure(_last_connect_error)
+        log.error("[Client] ❌ Initial connection failed, will start reconnection attempts")
     
-    print(f"[Client] 🔁 Entering main monitoring loop...")
-    print(f"[Client] 📋 Reconnect policy: {reconnect_interval}s interval, max {max_reconnect_attempts} attempts")
+    log.info("[Client] 🔁 Entering main monitoring loop...")
+    log.info(f"[Client] 📋 Reconnect policy: exponential backoff from {reconnect.base_interval}s up to {reconnect.max_interval}s with jitter, "
+          + (f"max {reconnect.max_attempts} attempts" if reconnect.max_attempts else "unlimited attempts"))
     
     try:
         while True:
             current_time = time.time()
             
+            # 未连接或未注册期间继续采样，缓存到离线缓冲，重连后补发
+            if not (sio.connected and _registration_confirmed) and current_time - last_data_send >= data_send_interval:
+                last_data_send = current_time
+                buffer_offline_sample()
+            
             # 🔧 简化连接检查 - 直接检查Socket状态
             if not sio.connected:
-                # Socket断开，立即尝试重连
-                if reconnect_count < max_reconnect_attempts:
-                    reconnect_count += 1
-                    print(f"[Client] 🔄 Reconnection attempt #{reconnect_count}/{max_reconnect_attempts}...")
+                # Socket断开，按退避时间重连（等待期间主循环继续采样缓存）
+                reconnect.on_disconnected()
+                if reconnect.exhausted():
+                    # 达到最大重连次数，停止尝试
+                    log.error(f"[Client] 😴 Maximum reconnection attempts ({reconnect.max_attempts}) reached")
+                    log.error("[Client] 🛑 Stopping client - please check server connectivity")
+                    break
+                if reconnect.ready():
+                    log.info(f"[Client] 🔄 Reconnection attempt #{reconnect.failures + 1}...")
                     
                     if try_connect():
-                        reconnect_count = 0  # 重连成功，重置计数器
+                        reconnect.record_success()  # 重连成功，重置退避
                         last_registration_attempt = current_time  # 记录注册时间
-                        print(f"[Client] ✅ Reconnection successful, waiting for registration...")
+                        log.info("[Client] ✅ Reconnection successful, waiting for registration...")
+                        # 断线期间网络可能发生变化，重新解析公网IP
+                        request_ip_refresh()
                         # 重连成功后稍微延迟再发送数据
                         last_data_send = current_time + 2  # 2秒后可以发送数据
                         last_heartbeat = current_time + 3  # 3秒后发送心跳
                     else:
-                        print(f"[Client] ❌ Reconnection failed, waiting {reconnect_interval}s...")
-                        time.sleep(reconnect_interval)
-                        continue
-                else:
-                    # 达到最大重连次数，停止尝试
-                    print(f"[Client] 😴 Maximum reconnection attempts ({max_reconnect_attempts}) reached")
-                    print(f"[Client] 🛑 Stopping client - please check server connectivity")
-                    break
+                        delay = reconnect.record_failure(_last_connect_error)
+                        log.error(f"[Client] ❌ Reconnection failed, next attempt in {delay:.1f}s...")
             
             # 🔧 修复：检查注册状态，如果连接但未注册且超时，重新尝试注册
             elif not _registration_confirmed:
                 if current_time - last_registration_attempt > registration_timeout:
-                    print(f"[Client] ⚠️  Registration timeout, retrying...")
+                    log.warning("[Client] ⚠️  Registration timeout, retrying...")
                     try:
-                        sio.emit('register', {'node_name': NODE_NAME})
+                        sio.emit('register', build_registration_payload())
                         last_registration_attempt = current_time
                     except Exception as reg_error:
-                        print(f"[Client] ❌ Registration retry failed: {reg_error}")
+                        log.error(f"[Client] ❌ Registration retry failed: {reg_error}")
                         # 注册失败可能是连接问题，下次循环会检测到并重连
             
-            # 🔧 发送监控数据 (仅在连接且已注册时)
-            if sio.connected and _registration_confirmed and current_time - last_data_send >= data_send_interval:
+            # 🔧 发送监控数据 (仅在连接且已注册时，间隔由上报调度决定)
+            if sio.connected and _registration_confirmed and current_time >= last_data_send and _report_scheduler.due():
                 last_data_send = current_time
                 
                 if send_data():
                     # 数据发送成功，连接稳定
                     pass  # _connection_stable在send_data中已设置
                 else:
-                    # 数据发送失败，可能是连接问题
-                    print(f"[Client] ⚠️  Data send failed, connection may be unstable")
+                    # 数据发送失败，可能是连接问题；按基础间隔再试
+                    log.warning("[Client] ⚠️  Data send failed, connection may be unstable")
+                    _report_scheduler.record(None)
+            
+            # 注册成功后限速补发离线期间的样本
+            if sio.connected and _registration_confirmed and current_time - last_backfill >= BACKFILL_INTERVAL:
+                last_backfill = current_time
+                send_backfill_batch()
             
             # 🔧 发送心跳包 (仅在连接时)
             if sio.connected and current_time - last_heartbeat >= heartbeat_interval:
@@ -1972,7 +5252,12 @@ def main():
                 
                 if not send_heartbeat():
                     # 心跳失败，可能是连接问题
-                    print(f"[Client] ⚠️  Heartbeat failed, connection may be unstable")
+                    log.warning("[Client] ⚠️  Heartbeat failed, connection may be unstable")
+            
+            # 可选：定期发送客户端自身统计
+            if CLIENT_STATS_INTERVAL and sio.connected and _registration_confirmed and current_time - last_client_stats >= CLIENT_STATS_INTERVAL:
+                last_client_stats = current_time
+                send_client_stats()
             
             # 🔧 简化休眠逻辑
             if sio.connected and _registration_confirmed:
@@ -1984,23 +5269,21 @@ def main():
                 
             time.sleep(sleep_time)
     except KeyboardInterrupt:
-        print(f"\n[Client] 🛑 Keyboard interrupt received")
+        log.info("[Client] 🛑 Keyboard interrupt received")
     except Exception as e:
-        print(f"[Client] ❌ Unexpected error in main loop: {e}")
-        import traceback
-        traceback.print_exc()
+        log.error(f"[Client] ❌ Unexpected error in main loop: {e}", exc_info=True)
     finally:
         # 清理工作
-        print(f"[Client] 🧹 Cleaning up...")
+        log.info("[Client] 🧹 Cleaning up...")
         try:
             if sio.connected:
-                print(f"[Client] 📡 Disconnecting from server...")
+                log.info("[Client] 📡 Disconnecting from server...")
                 sio.disconnect()
                 time.sleep(1)  # 给断开连接一些时间
         except Exception as cleanup_error:
-            print(f"[Client] ⚠️  Cleanup error: {cleanup_error}")
+            log.warning(f"[Client] ⚠️  Cleanup error: {cleanup_error}")
         
-        print(f"[Client] 👋 Client stopped")
+        log.info("[Client] 👋 Client stopped")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
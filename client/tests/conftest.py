@@ -0,0 +1,26 @@
+import os
+import sys
+
+# client.py 是单文件脚本，测试时直接从上级目录导入
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _fresh_probe_context():
+    # tcping的DNS缓存是进程级全局状态，每个测试使用新的探测上下文
+    import client
+    client._probe_context = None
+    yield
+    client._probe_context = None
+
+
+@pytest.fixture(autouse=True)
+def _fresh_metrics_buffer(tmp_path, monkeypatch):
+    # 离线指标缓冲同样是全局状态，spool文件放到临时目录
+    import client
+    monkeypatch.setattr(client, 'METRICS_SPOOL_FILE', str(tmp_path / 'spool.bin'))
+    client._metrics_buffer = None
+    yield
+    client._metrics_buffer = None
@@ -0,0 +1,106 @@
+import asyncio
+import socket
+
+import pytest
+
+import client
+
+aiohttp = pytest.importorskip('aiohttp')
+from aiohttp import web  # noqa: E402
+import socketio  # noqa: E402
+
+
+async def _start_server(handlers):
+    """在127.0.0.1随机端口启动 socketio.AsyncServer"""
+    sio = socketio.AsyncServer(async_mode='aiohttp')
+    app = web.Application()
+    sio.attach(app)
+    for event, handler in handlers(sio).items():
+        sio.on(event, handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f'http://127.0.0.1:{port}'
+
+
+@pytest.fixture
+def fast_intervals(monkeypatch):
+    monkeypatch.setattr(client, 'DATA_SEND_INTERVAL', 0.1)
+    monkeypatch.setattr(client, 'HEARTBEAT_INTERVAL', 0.1)
+    monkeypatch.setattr(client, 'RECONNECT_INTERVAL', 0.1)
+    monkeypatch.setattr(client, 'collect_sample', lambda: ({'cpu': 1, 'ram': 2, 'rom': 3}, {}))
+
+
+def test_registers_reports_and_heartbeats(fast_intervals):
+    received = {'register': 0, 'report_data': [], 'heartbeat': 0}
+
+    def handlers(sio):
+        async def register(sid, data):
+            received['register'] += 1
+            await sio.emit('registration_success', {'socket_id': sid}, to=sid)
+
+        async def report_data(sid, data):
+            received['report_data'].append(data)
+
+        async def heartbeat(sid, data):
+            received['heartbeat'] += 1
+
+        return {'register': register, 'report_data': report_data, 'heartbeat': heartbeat}
+
+    async def scenario():
+        runner, url = await _start_server(handlers)
+        runtime = client.AsyncClientRuntime(server_url=url)
+        task = asyncio.ensure_future(runtime.run())
+        try:
+            for _ in range(100):
+                if len(received['report_data']) >= 2 and received['heartbeat'] >= 1:
+                    break
+                await asyncio.sleep(0.05)
+        finally:
+            runtime.stop()
+            await asyncio.wait_for(task, 5)
+            await runner.cleanup()
+
+    asyncio.run(scenario())
+    assert received['register'] == 1
+    assert received['report_data'][0] == {'cpu': 1, 'ram': 2, 'rom': 3}
+    assert received['heartbeat'] >= 1
+
+
+def test_tcping_request_runs_in_executor(fast_intervals, monkeypatch):
+    listener = socket.socket()
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(8)
+    port = listener.getsockname()[1]
+    results = []
+
+    def handlers(sio):
+        async def register(sid, data):
+            await sio.emit('registration_success', {'socket_id': sid}, to=sid)
+            await sio.emit('request_tcping', {'host': '127.0.0.1', 'port': port, 'request_id': 'r1'}, to=sid)
+
+        async def tcping_result(sid, data):
+            results.append(data)
+
+        return {'register': register, 'tcping_result': tcping_result}
+
+    async def scenario():
+        runner, url = await _start_server(handlers)
+        runtime = client.AsyncClientRuntime(server_url=url)
+        task = asyncio.ensure_future(runtime.run())
+        try:
+            for _ in range(100):
+                if results:
+                    break
+                await asyncio.sleep(0.05)
+        finally:
+            runtime.stop()
+            await asyncio.wait_for(task, 5)
+            await runner.cleanup()
+            listener.close()
+
+    asyncio.run(scenario())
+    assert results and results[0]['request_id'] == 'r1'
+    assert results[0]['success'] is True
@@ -0,0 +1,78 @@
+import pytest
+
+import client
+
+
+def _metrics(**overrides):
+    metrics = {name: 0 for name in client.BINARY_REPORT_FIELDS}
+    metrics.update({
+        'timestamp_ms': 1700000000000, 'cpu': 12, 'ram': 34, 'rom': 56, 'load': 0.75,
+        'uptime_s': 86400 * 3, 'net_in_bps': 123456, 'net_out_bps': 654321,
+        'traffic_in_bytes': 5 * 1024 ** 4, 'traffic_out_bytes': 1024,
+        'mem_total': 8 * 1024 ** 3, 'mem_used': 3 * 1024 ** 3, 'disk_total': 10 ** 12,
+        'disk_used': 4 * 10 ** 11, 'partitions_count': 3
+    })
+    metrics.update(overrides)
+    return metrics
+
+
+def _display(ip='ipv4:1.2.3.4'):
+    return {'ip': ip, 'ipv4': '1.2.3.4', 'ipv6': None, 'status': '运行中', 'type': 'VPS',
+            'location': 'Local', 'net_in': '120.6K', 'detail': {'cpu_info': 'Test CPU'}}
+
+
+def test_struct_round_trip_keeps_raw_integers():
+    packet = client.pack_report_struct(_metrics())
+    assert len(packet) == client._BINARY_REPORT_STRUCT.size
+    decoded = client.unpack_report_struct(packet)
+    assert decoded['traffic_in_bytes'] == 5 * 1024 ** 4
+    assert decoded['net_out_bps'] == 654321
+    assert decoded['load'] == pytest.approx(0.75)
+    assert decoded['partitions_count'] == 3
+
+
+def test_struct_clamps_out_of_range_values():
+    decoded = client.unpack_report_struct(client.pack_report_struct(_metrics(net_in_bps=-5, partitions_count=10 ** 6)))
+    assert decoded['net_in_bps'] == 0
+    assert decoded['partitions_count'] == 65535
+
+
+def test_binary_mode_sends_meta_only_on_change():
+    encoder = client.ReportEncoder()
+    encoder.reset(wire_format='struct')
+    frames = encoder.encode_sample(_display(), _metrics())
+    assert [event for event, _ in frames] == ['report_meta', 'report_data_bin']
+    assert frames[0][1]['cpu_info'] == 'Test CPU' and 'net_in' not in frames[0][1]
+    assert isinstance(frames[1][1], bytes)
+
+    frames = encoder.encode_sample(_display(), _metrics(cpu=13))
+    assert [event for event, _ in frames] == ['report_data_bin']
+
+    frames = encoder.encode_sample(_display(ip='ipv4:5.6.7.8'), _metrics())
+    assert [event for event, _ in frames] == ['report_meta', 'report_data_bin']
+
+
+def test_json_mode_is_unchanged():
+    encoder = client.ReportEncoder()
+    data = _display()
+    assert encoder.encode_sample(data, _metrics()) == [('report_data', data)]
+
+
+def test_negotiation(monkeypatch):
+    monkeypatch.setattr(client, 'REPORT_WIRE_FORMAT', 'json')
+    assert 'wire_formats' not in client.build_registration_payload()
+    assert client._negotiated_wire_format({'wire_format': 'struct'}) == 'json'
+
+    monkeypatch.setattr(client, 'REPORT_WIRE_FORMAT', 'binary')
+    assert 'struct' in client.build_registration_payload()['wire_formats']
+    assert client._negotiated_wire_format({'wire_format': 'struct'}) == 'struct'
+    assert client._negotiated_wire_format({}) == 'json'
+    monkeypatch.setattr(client, '_load_msgpack', lambda: None)
+    assert client._negotiated_wire_format({'wire_format': 'msgpack'}) == 'json'
+
+
+def test_msgpack_packet():
+    msgpack = pytest.importorskip('msgpack')
+    decoded = msgpack.unpackb(client.pack_report_msgpack(_metrics()), raw=False)
+    assert decoded['v'] == client.BINARY_REPORT_VERSION
+    assert decoded['traffic_in_bytes'] == 5 * 1024 ** 4
@@ -0,0 +1,100 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import client
+
+
+def _make_handler(status=200, body=b'i-123', delay=0.0):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            self.send_response(status)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+@pytest.fixture
+def stand_in():
+    """在127.0.0.1上启动本地元数据替身服务器，返回其URL"""
+    servers = []
+
+    def start(**kwargs):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), _make_handler(**kwargs))
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f'http://127.0.0.1:{server.server_port}/'
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_first_match_in_list_order(stand_in):
+    slow_hit = stand_in(delay=0.2)
+    fast_hit = stand_in()
+    miss = stand_in(status=404)
+    endpoints = [
+        ('Miss', miss, None, None),
+        ('Primary', slow_hit, None, None),
+        ('Secondary', fast_hit, None, None),
+    ]
+    for _ in range(3):
+        assert client.probe_cloud_metadata(endpoints, timeout=2, deadline=3) == 'Primary'
+
+
+def test_returns_without_waiting_for_lower_priority(stand_in):
+    fast_hit = stand_in()
+    slow = stand_in(delay=2)
+    endpoints = [('Primary', fast_hit, None, None), ('Slow', slow, None, None)]
+    start = time.monotonic()
+    assert client.probe_cloud_metadata(endpoints, timeout=3, deadline=3) == 'Primary'
+    assert time.monotonic() - start < 1
+
+
+def test_all_fail_returns_none(stand_in):
+    endpoints = [
+        ('A', stand_in(status=404), None, None),
+        ('B', stand_in(status=500), None, None),
+        ('C', 'http://127.0.0.1:1/', None, None),  # 连接被拒绝
+    ]
+    assert client.probe_cloud_metadata(endpoints, timeout=1, deadline=2) is None
+
+
+def test_deadline_expiry_returns_none(stand_in):
+    endpoints = [('Slow', stand_in(delay=2), None, None)]
+    start = time.monotonic()
+    assert client.probe_cloud_metadata(endpoints, timeout=5, deadline=0.3) is None
+    assert time.monotonic() - start < 1
+
+
+def test_deadline_expiry_returns_best_ranked_hit(stand_in):
+    endpoints = [
+        ('Primary', stand_in(delay=2), None, None),
+        ('Secondary', stand_in(delay=0.05), None, None),
+        ('Tertiary', stand_in(), None, None),
+    ]
+    assert client.probe_cloud_metadata(endpoints, timeout=5, deadline=0.5) == 'Secondary'
+
+
+def test_validator_rejects_generic_openstack(stand_in):
+    generic = stand_in(body=json.dumps({'availability_zone': 'nova', 'name': 'vm'}).encode())
+    endpoints = [('华为云ECS', generic, None, client._is_huawei_metadata)]
+    assert client.probe_cloud_metadata(endpoints, timeout=1, deadline=2) is None
+
+
+def test_validator_accepts_huawei(stand_in):
+    huawei = stand_in(body=json.dumps({'availability_zone': 'cn-north-4a', 'project': 'huaweicloud'}).encode())
+    endpoints = [('华为云ECS', huawei, None, client._is_huawei_metadata)]
+    assert client.probe_cloud_metadata(endpoints, timeout=1, deadline=2) == '华为云ECS'
@@ -0,0 +1,101 @@
+import json
+import os
+import signal
+import time
+
+import pytest
+
+import client
+
+
+def test_summary_percentiles_and_counters():
+    profiler = client.CollectorProfiler(window=100)
+    for ms in range(1, 101):
+        profiler.record('disk', ms * 1_000_000)
+    profiler.record_fallback('disk')
+    summary = profiler.summary()['disk']
+    assert summary['count'] == 100 and summary['fallbacks'] == 1 and summary['errors'] == 0
+    assert summary['p50_ms'] == 50 and summary['p95_ms'] == 95 and summary['max_ms'] == 100
+    assert summary['last_ms'] == 100
+
+
+def test_window_keeps_recent_samples_only():
+    profiler = client.CollectorProfiler(window=3)
+    for ms in (100, 1, 2, 3):
+        profiler.record('ip', ms * 1_000_000)
+    summary = profiler.summary()['ip']
+    assert summary['count'] == 4 and summary['max_ms'] == 3
+
+
+def test_timed_counts_errors_and_reraises():
+    profiler = client.CollectorProfiler()
+    with profiler.timed('cpu_info'):
+        pass
+    with pytest.raises(RuntimeError):
+        with profiler.timed('cpu_info'):
+            raise RuntimeError('boom')
+    summary = profiler.summary()['cpu_info']
+    assert summary['count'] == 2 and summary['errors'] == 1
+
+
+def test_swallowed_collector_errors_are_counted(monkeypatch):
+    profiler = client.CollectorProfiler()
+    monkeypatch.setattr(client, '_collector_profiler', profiler)
+
+    def broken(*args, **kwargs):
+        raise OSError('boom')
+    monkeypatch.setattr(client, '_current_proc_snapshot', broken)
+    monkeypatch.setattr(client, 'get_disk_collector', broken)
+    monkeypatch.setattr(client.psutil, 'disk_usage', broken)
+    assert client.get_memory_info()['percent'] == 0
+    assert client.get_uptime_seconds() == 0
+    assert client.get_load_average() == 0.0
+    assert client.get_all_disk_usage()['total_size'] == 0
+    summary = profiler.summary()
+    assert {name: summary[name]['errors'] for name in ('memory', 'uptime', 'load', 'disk')} == \
+        {'memory': 1, 'uptime': 1, 'load': 1, 'disk': 1}
+    assert summary['disk']['fallbacks'] == 1
+
+
+def test_collect_sample_times_each_collector(monkeypatch):
+    profiler = client.CollectorProfiler()
+    monkeypatch.setattr(client, '_collector_profiler', profiler)
+    monkeypatch.setattr(client, 'detect_system_type', lambda: 'VPS')
+    monkeypatch.setattr(client, 'get_ip_addresses',
+                        lambda: {'ip_display': 'ipv4:1.2.3.4', 'ipv4': '1.2.3.4', 'ipv6': None})
+    monkeypatch.setattr(client, 'get_cpu_info', lambda: {'info_string': 'Test CPU'})
+    data, _ = client.collect_sample()
+    assert data['type'] == 'VPS'
+    names = set(profiler.summary())
+    assert {'total', 'ip', 'disk', 'cpu_info', 'system_type', 'memory', 'network_rates'} <= names
+
+
+def test_dump_client_stats(tmp_path, monkeypatch):
+    profiler = client.CollectorProfiler()
+    profiler.record('disk', 5_000_000)
+    monkeypatch.setattr(client, '_collector_profiler', profiler)
+    path = client.dump_client_stats(str(tmp_path / 'stats.json'))
+    with open(path) as f:
+        stats = json.load(f)
+    assert stats['collectors']['disk']['p95_ms'] == 5
+    assert 'connection' in stats and 'probe' in stats and 'buffer' in stats
+
+
+@pytest.mark.skipif(not hasattr(signal, 'SIGUSR1'), reason='SIGUSR1 is POSIX only')
+def test_sigusr1_dump_does_not_deadlock_on_held_locks(tmp_path, monkeypatch):
+    path = tmp_path / 'stats.json'
+    monkeypatch.setattr(client, 'CLIENT_STATS_FILE', str(path))
+    previous = signal.getsignal(signal.SIGUSR1)
+    try:
+        assert client.install_stats_dump_handler()
+        # 主线程正持有采集器的锁时收到信号：处理函数立即返回，释放锁后由后台线程写出
+        with client._collector_profiler._lock:
+            os.kill(os.getpid(), signal.SIGUSR1)
+            time.sleep(0.2)
+            assert not path.exists()
+        deadline = time.monotonic() + 5
+        while not path.exists() and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert 'collectors' in json.loads(path.read_text())
+    finally:
+        signal.signal(signal.SIGUSR1, previous)
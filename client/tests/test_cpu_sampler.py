@@ -0,0 +1,48 @@
+import pytest
+
+import client
+
+
+def _write_stat(path, idle0, idle1):
+    """两个核心，每核总节拍1000 + 各自的空闲节拍"""
+    with open(path, 'w') as f:
+        f.write(f"cpu  {2000 - idle0 - idle1} 0 0 {idle0 + idle1} 0 0 0 0 0 0\n"
+                f"cpu0 {1000 - idle0} 0 0 {idle0} 0 0 0 0 0 0\n"
+                f"cpu1 {1000 - idle1} 0 0 {idle1} 0 0 0 0 0 0\n")
+
+
+@pytest.fixture
+def sampler(tmp_path, monkeypatch):
+    monkeypatch.setattr(client.platform, 'system', lambda: 'Linux')
+    _write_stat(str(tmp_path / 'stat'), 0, 0)
+    sampler = client.CpuSampler(interval=0.01, proc_root=str(tmp_path))
+    yield sampler
+    sampler.stop()
+
+
+def test_no_value_before_second_sample(sampler):
+    sampler.sample_once()
+    assert sampler.latest() == (None, [])
+
+
+def test_per_core_and_aggregate_from_deltas(tmp_path, sampler):
+    sampler.sample_once()
+    # 下一个周期：cpu0 空闲 100/200 节拍，cpu1 空闲 200/200 节拍
+    with open(tmp_path / 'stat', 'w') as f:
+        f.write("cpu  2100 0 0 300 0 0 0 0 0 0\n"
+                "cpu0 1100 0 0 100 0 0 0 0 0 0\n"
+                "cpu1 1000 0 0 200 0 0 0 0 0 0\n")
+    sampler.sample_once()
+    aggregate, per_core = sampler.latest()
+    assert aggregate == pytest.approx(25.0)
+    assert per_core == [pytest.approx(50.0), pytest.approx(0.0)]
+
+
+def test_get_cpu_usage_reads_sampler_without_blocking(monkeypatch):
+    class FakeSampler:
+        def latest(self):
+            return 42.4, [40.0, 44.8]
+
+    monkeypatch.setattr(client, '_cpu_sampler', FakeSampler())
+    monkeypatch.setattr(client.psutil, 'cpu_percent', lambda *a, **k: pytest.fail('must not call psutil'))
+    assert client.get_cpu_usage() == 42
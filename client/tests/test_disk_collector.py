@@ -0,0 +1,151 @@
+import threading
+import time
+from collections import namedtuple
+
+import client
+
+Partition = namedtuple('Partition', ['device', 'mountpoint', 'fstype', 'opts'])
+Usage = namedtuple('Usage', ['total', 'used', 'free', 'percent'])
+
+PARTITIONS = [
+    Partition('/dev/sda1', '/', 'ext4', 'rw'),
+    Partition('tmpfs', '/dev/shm', 'tmpfs', 'rw'),
+    Partition('server:/export', '/mnt/nfs', 'nfs4', 'rw'),
+    Partition('sysfs', '/sys', 'sysfs', 'rw'),
+]
+
+
+class FakeDisks:
+    def __init__(self):
+        self.partition_calls = 0
+        self.usage_calls = []
+        self.block = {}  # mountpoint -> threading.Event，未set前statvfs阻塞
+        self.usage = {'/': Usage(100, 40, 60, 40.0), '/mnt/nfs': Usage(1000, 500, 500, 50.0)}
+
+    def partitions(self):
+        self.partition_calls += 1
+        return list(PARTITIONS)
+
+    def disk_usage(self, mountpoint):
+        self.usage_calls.append(mountpoint)
+        event = self.block.get(mountpoint)
+        if event is not None:
+            event.wait(5)
+        if mountpoint not in self.usage:
+            raise PermissionError(mountpoint)
+        return self.usage[mountpoint]
+
+
+def _collector(fake, **kwargs):
+    return client.DiskCollector(timeout=0.2, mountinfo_path=None, partitions_fn=fake.partitions,
+                                usage_fn=fake.disk_usage, **kwargs)
+
+
+def test_filters_pseudo_filesystems_and_reports_partitions():
+    fake = FakeDisks()
+    collector = _collector(fake)
+    result = collector.collect()
+    assert [p['mountpoint'] for p in result['partitions']] == ['/', '/mnt/nfs']
+    assert result['total_size'] == 1100 and result['total_used'] == 540
+    assert result['partitions_count'] == 2 and result['stale_count'] == 0
+    assert result['partitions'][0] == {'device': '/dev/sda1', 'mountpoint': '/', 'fstype': 'ext4',
+                                       'total': 100, 'used': 40, 'free': 60, 'percent': 40.0, 'stale': False}
+    collector.close()
+
+
+def test_mount_table_cached_until_refresh_interval():
+    fake = FakeDisks()
+    collector = _collector(fake, refresh_interval=3600)
+    for _ in range(3):
+        collector.collect()
+    assert fake.partition_calls == 1
+    collector._mounts_refreshed_at -= 3600
+    collector.collect()
+    assert fake.partition_calls == 2
+    collector.close()
+
+
+def test_hung_mount_reports_last_good_value_and_is_not_resubmitted():
+    fake = FakeDisks()
+    collector = _collector(fake)
+    collector.collect()
+
+    release = threading.Event()
+    fake.block['/mnt/nfs'] = release
+    fake.usage['/mnt/nfs'] = Usage(1000, 900, 100, 90.0)
+    result = collector.collect()
+    nfs = result['partitions'][1]
+    assert nfs['stale'] and nfs['used'] == 500
+    assert result['stale_count'] == 1 and result['total_used'] == 540
+
+    # 卡住的查询不会重复提交
+    collector.collect()
+    assert fake.usage_calls.count('/mnt/nfs') == 2
+    assert collector.stats['timeouts'] == 2
+
+    release.set()
+    collector._pending['/mnt/nfs'][1].result(timeout=5)
+    result = collector.collect()
+    nfs = result['partitions'][1]
+    assert not nfs['stale'] and nfs['used'] == 900
+    collector.close()
+
+
+def test_hung_mount_without_previous_value_reports_zero():
+    fake = FakeDisks()
+    release = threading.Event()
+    fake.block['/mnt/nfs'] = release
+    collector = _collector(fake)
+    result = collector.collect()
+    nfs = result['partitions'][1]
+    assert nfs['stale'] and nfs['total'] == 0
+    assert result['total_size'] == 100
+    release.set()
+    collector.close()
+
+
+def test_many_hung_network_mounts_do_not_starve_local_disk():
+    fake = FakeDisks()
+    release = threading.Event()
+    hung = [f'/mnt/nfs{i}' for i in range(6)]
+    fake.partitions = lambda: [Partition('/dev/sda1', '/', 'ext4', 'rw')] + [
+        Partition(f'server:/export{i}', mountpoint, 'nfs4', 'rw') for i, mountpoint in enumerate(hung)]
+    for mountpoint in hung:
+        fake.block[mountpoint] = release
+    collector = _collector(fake)
+    try:
+        for _ in range(3):
+            started = time.monotonic()
+            result = collector.collect()
+            # 各挂载点的截止时间并行计算，卡住的挂载点不会累加等待时间
+            assert time.monotonic() - started < 1
+            root = result['partitions'][0]
+            assert root['mountpoint'] == '/' and not root['stale'] and root['total'] == 100
+            assert result['total_size'] == 100 and result['stale_count'] == len(hung)
+        # 卡住的查询每个挂载点只有一个
+        assert all(fake.usage_calls.count(mountpoint) == 1 for mountpoint in hung)
+        assert fake.usage_calls.count('/') == 3
+    finally:
+        release.set()
+        collector.close()
+
+
+def test_inaccessible_mount_is_skipped():
+    fake = FakeDisks()
+    del fake.usage['/mnt/nfs']
+    collector = _collector(fake)
+    result = collector.collect()
+    assert [p['mountpoint'] for p in result['partitions']] == ['/']
+    assert collector.stats['errors'] == 1
+    collector.close()
+
+
+def test_mountinfo_poll_detects_no_change_on_linux():
+    fake = FakeDisks()
+    collector = client.DiskCollector(timeout=0.2, partitions_fn=fake.partitions, usage_fn=fake.disk_usage)
+    collector.collect()
+    if collector._poller is not None:
+        # 挂载表没有变化时不会重新读取
+        collector.collect()
+        assert fake.partition_calls == 1
+    collector.close()
@@ -0,0 +1,97 @@
+import client
+
+SECOND = 10 ** 9
+
+DISKSTATS = b"""   7       0 loop0 10 0 80 1 0 0 0 0 0 1 1 0 0 0 0
+   8       0 sda 1000 10 20000 500 2000 20 40000 1500 2 1800 2000 0 0 0 0
+   8       1 sda1 900 10 18000 450 1900 20 38000 1400 0 1700 1850 0 0 0 0
+ 253       0 dm-0 950 0 19000 480 1950 0 39000 1450 0 1750 1930
+"""
+
+
+def _stat(reads=0, read_sectors=0, read_ms=0, writes=0, write_sectors=0, write_ms=0,
+          in_flight=0, io_ms=0, weighted_ms=0):
+    return client.DiskStat(reads, read_sectors, read_ms, writes, write_sectors, write_ms,
+                           in_flight, io_ms, weighted_ms)
+
+
+def _sys_block(tmp_path):
+    # sda 为物理盘，dm-0 叠加在 sda1 上；分区不在 /sys/block 下
+    (tmp_path / 'sda' / 'slaves').mkdir(parents=True)
+    (tmp_path / 'dm-0' / 'slaves' / 'sda1').mkdir(parents=True)
+    (tmp_path / 'loop0' / 'slaves').mkdir(parents=True)
+    return str(tmp_path)
+
+
+def test_parse_proc_diskstats_handles_short_and_extended_lines():
+    devices = client._parse_proc_diskstats(DISKSTATS)
+    assert set(devices) == {'loop0', 'sda', 'sda1', 'dm-0'}
+    assert devices['sda'] == _stat(1000, 20000, 500, 2000, 40000, 1500, 2, 1800, 2000)
+
+
+def test_classify_block_devices(tmp_path):
+    sys_block = _sys_block(tmp_path)
+    assert client._classify_block_device('sda', sys_block) == 'physical'
+    assert client._classify_block_device('dm-0', sys_block) == 'virtual'
+    assert client._classify_block_device('sda1', sys_block) is None
+    assert client._classify_block_device('loop0', sys_block) is None
+    # 没有 /sys/block 时按名字识别分区
+    assert client._classify_block_device('nvme0n1p2', None) is None
+    assert client._classify_block_device('nvme0n1', None) == 'physical'
+    assert client._classify_block_device('ram0', None) is None
+
+
+def test_rates_per_device_and_physical_total(tmp_path):
+    collector = client.DiskIOCollector(sys_block=_sys_block(tmp_path))
+    assert collector.update({'sda': _stat(), 'dm-0': _stat(), 'sda1': _stat()}, 10 * SECOND) is None
+
+    result = collector.update({
+        'sda': _stat(reads=200, read_sectors=4000, read_ms=400, writes=100, write_sectors=2000, write_ms=600,
+                     in_flight=3, io_ms=1000, weighted_ms=3000),
+        'dm-0': _stat(reads=200, read_sectors=4000, read_ms=400, io_ms=500),
+        'sda1': _stat(reads=200),
+    }, 12 * SECOND)
+    assert set(result['devices']) == {'sda', 'dm-0'}
+    sda = result['devices']['sda']
+    assert sda['read_bps'] == 4000 * 512 // 2 and sda['write_bps'] == 2000 * 512 // 2
+    assert sda['read_iops'] == 100.0 and sda['write_iops'] == 50.0
+    assert sda['util'] == 50.0 and sda['queue_depth'] == 1.5
+    assert sda['read_await_ms'] == 2.0 and sda['write_await_ms'] == 6.0 and sda['in_flight'] == 3
+
+    # dm-0 叠加在 sda 上，不计入汇总
+    total = result['total']
+    assert total['read_bps'] == sda['read_bps'] and total['read_iops'] == 100.0
+    assert total['util'] == 50.0 and total['await_ms'] == round(1000 / 300, 2)
+
+
+def test_counter_wrap_and_reset(tmp_path):
+    assert client._counter_delta(2 ** 32 - 10, 5) == 15
+    assert client._counter_delta(1000, 5) is None
+
+    collector = client.DiskIOCollector(sys_block=_sys_block(tmp_path))
+    collector.update({'sda': _stat(reads=1000, io_ms=2 ** 32 - 100)}, 0)
+    result = collector.update({'sda': _stat(reads=1100, io_ms=400)}, SECOND)
+    assert result['devices']['sda']['util'] == 50.0
+
+    # 设备重置（计数器回到较小值）的那一次不输出
+    result = collector.update({'sda': _stat(reads=3, io_ms=400)}, 2 * SECOND)
+    assert result['devices'] == {} and result['total']['read_iops'] == 0
+    result = collector.update({'sda': _stat(reads=13, io_ms=500)}, 3 * SECOND)
+    assert result['devices']['sda']['read_iops'] == 10.0
+
+
+def test_snapshot_engine_includes_diskstats_when_available(tmp_path):
+    for name, content in {'stat': b'cpu 1 0 1 10 0 0 0 0\nbtime 1\n', 'meminfo': b'MemTotal: 1 kB\n',
+                          'loadavg': b'0.1 0.2 0.3 1/1 1\n', 'uptime': b'10.0 5.0\n',
+                          'diskstats': DISKSTATS}.items():
+        (tmp_path / name).write_bytes(content)
+    (tmp_path / 'net').mkdir()
+    (tmp_path / 'net' / 'dev').write_bytes(b'h1\nh2\n')
+    engine = client.ProcSnapshotEngine(proc_root=str(tmp_path))
+    assert 'sda' in engine.capture()['diskstats']
+    engine.close()
+
+    (tmp_path / 'diskstats').unlink()
+    engine = client.ProcSnapshotEngine(proc_root=str(tmp_path))
+    assert 'diskstats' not in engine.capture()
+    engine.close()
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+import client
+
+CPU_INFO = {
+    'model': 'Test CPU @ 2.00GHz',
+    'cores': 4,
+    'threads': 8,
+    'is_virtual': False,
+    'socket_count': 1,
+    'threads_per_core': 2,
+    'frequency': '@ 2.00GHz',
+    'info_string': 'Test CPU @ 2.00GHz 4 Physical Core',
+}
+
+
+@pytest.fixture
+def key(monkeypatch):
+    current = {'boot_id': 'boot-1', 'machine_id': 'machine-1', 'logical_cpus': 8,
+               'product_uuid': None, 'client_version': client.CLIENT_VERSION}
+    monkeypatch.setattr(client, 'get_fingerprint_key', lambda: dict(current))
+    monkeypatch.setattr(client, '_cached_system_type', None)
+    monkeypatch.setattr(client, '_cached_cpu_info', None)
+    monkeypatch.setattr(client, '_fingerprint_ready', False)
+    return current
+
+
+def test_roundtrip_populates_caches(tmp_path, key):
+    path = str(tmp_path / 'fp.json')
+    assert client.save_fingerprint('KVM', CPU_INFO, path=path)
+    assert client.load_fingerprint(path=path)
+    assert client._cached_system_type == 'KVM'
+    assert client._cached_cpu_info == CPU_INFO
+    cpu_info = client.get_cpu_info()
+    cpu_info.pop('current_mhz', None)  # Linux上实时频率会附加在静态信息之后
+    assert cpu_info == CPU_INFO
+
+
+@pytest.mark.parametrize('field', ['boot_id', 'machine_id', 'logical_cpus'])
+def test_key_change_invalidates(tmp_path, key, field):
+    path = str(tmp_path / 'fp.json')
+    client.save_fingerprint('KVM', CPU_INFO, path=path)
+    key[field] = 'changed'
+    assert not client.load_fingerprint(path=path)
+    assert client._cached_system_type is None
+
+
+def test_missing_or_corrupt_file(tmp_path, key):
+    path = tmp_path / 'fp.json'
+    assert not client.load_fingerprint(path=str(path))
+    path.write_text('{not json')
+    assert not client.load_fingerprint(path=str(path))
+    path.write_text(json.dumps({'version': client.FINGERPRINT_VERSION, 'key': key}))
+    assert not client.load_fingerprint(path=str(path))
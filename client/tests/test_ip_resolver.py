@@ -0,0 +1,130 @@
+import socket
+import time
+from collections import namedtuple
+
+import pytest
+
+import client
+
+snicaddr = namedtuple('snicaddr', ['family', 'address', 'netmask', 'broadcast', 'ptp'])
+
+
+@pytest.fixture
+def ip_cache(monkeypatch):
+    """每个测试使用独立的IP缓存"""
+    cache = {'ipv4': None, 'ipv6': None, 'timestamp': 0, 'expires': 0}
+    monkeypatch.setattr(client, '_ip_cache', cache)
+    monkeypatch.setattr(client, '_get_temporary_ipv6_addresses', lambda: set())
+    return cache
+
+
+@pytest.fixture
+def refresh_calls(monkeypatch):
+    calls = []
+    monkeypatch.setattr(client, 'refresh_ip_cache', lambda: calls.append(time.time()))
+    return calls
+
+
+def _set_addrs(monkeypatch, addrs):
+    monkeypatch.setattr(client.psutil, 'net_if_addrs', lambda: addrs)
+
+
+def test_get_ip_addresses_reads_cache_without_lookups(monkeypatch, ip_cache):
+    def fail(*args, **kwargs):
+        raise AssertionError('report path must not perform lookups')
+
+    monkeypatch.setattr(client, 'get_public_ip', fail)
+    monkeypatch.setattr(client, 'get_public_ipv6', fail)
+    monkeypatch.setattr(client, '_race_ip_services', fail)
+    ip_cache.update({'ipv4': '203.0.113.7', 'ipv6': '2001:db8::7', 'expires': time.time() + 600})
+
+    start = time.perf_counter()
+    info = client.get_ip_addresses()
+    assert time.perf_counter() - start < 0.5
+    assert info == {
+        'ip_display': 'ipv4:203.0.113.7 | ipv6:2001:db8::7',
+        'ipv4': '203.0.113.7',
+        'ipv6': '2001:db8::7',
+    }
+
+
+def test_get_ip_addresses_before_first_refresh_uses_local_fallback(monkeypatch, ip_cache):
+    monkeypatch.setattr(client, '_race_ip_services', lambda *a, **k: pytest.fail('no lookups'))
+    monkeypatch.setattr(client, '_get_local_ipv4', lambda: '10.0.0.5')
+    info = client.get_ip_addresses()
+    assert info['ipv4'] == '10.0.0.5'
+    assert info['ipv6'] is None
+
+
+def test_expired_ttl_triggers_refresh(monkeypatch, ip_cache, refresh_calls):
+    addrs = {'eth0': [snicaddr(socket.AF_INET, '192.0.2.10', None, None, None)]}
+    _set_addrs(monkeypatch, addrs)
+
+    ip_cache['expires'] = time.time() + 600
+    signature = client._check_ip_cache(None)
+    assert refresh_calls == []
+
+    ip_cache['expires'] = time.time() - 1
+    client._check_ip_cache(signature)
+    assert len(refresh_calls) == 1
+
+
+def test_changed_signature_triggers_refresh(monkeypatch, ip_cache, refresh_calls):
+    ip_cache['expires'] = time.time() + 600
+    _set_addrs(monkeypatch, {'eth0': [snicaddr(socket.AF_INET, '192.0.2.10', None, None, None)]})
+    signature = client._check_ip_cache(None)
+    signature = client._check_ip_cache(signature)
+    assert refresh_calls == []
+
+    _set_addrs(monkeypatch, {'eth0': [snicaddr(socket.AF_INET, '192.0.2.11', None, None, None)]})
+    client._check_ip_cache(signature)
+    assert len(refresh_calls) == 1
+
+
+def test_link_local_and_temporary_ipv6_changes_are_ignored(monkeypatch, ip_cache, refresh_calls):
+    ip_cache['expires'] = time.time() + 600
+    base = [snicaddr(socket.AF_INET, '192.0.2.10', None, None, None)]
+    _set_addrs(monkeypatch, {'eth0': base + [
+        snicaddr(socket.AF_INET6, 'fe80::1%eth0', None, None, None),
+        snicaddr(socket.AF_INET6, '2606:4700::1111', None, None, None),
+    ]})
+    monkeypatch.setattr(client, '_get_temporary_ipv6_addresses', lambda: {'2606:4700::1111'})
+    signature = client._check_ip_cache(None)
+
+    _set_addrs(monkeypatch, {'eth0': base + [
+        snicaddr(socket.AF_INET6, 'fe80::2%eth0', None, None, None),
+        snicaddr(socket.AF_INET6, '2606:4700::2222', None, None, None),
+    ]})
+    monkeypatch.setattr(client, '_get_temporary_ipv6_addresses', lambda: {'2606:4700::2222'})
+    client._check_ip_cache(signature)
+    assert refresh_calls == []
+
+
+def test_failed_lookup_is_retried_sooner_than_ttl(monkeypatch, ip_cache):
+    monkeypatch.setattr(client, '_race_ip_services', lambda *a, **k: None)
+    monkeypatch.setattr(client, '_get_local_global_ipv6', lambda: None)
+    monkeypatch.setattr(client, '_get_local_ipv4', lambda: '10.0.0.5')
+
+    before = time.time()
+    client.refresh_ip_cache()
+    assert ip_cache['ipv4'] == '10.0.0.5'
+    assert ip_cache['expires'] <= before + client.PUBLIC_IP_RETRY_INTERVAL + 1
+    assert ip_cache['expires'] < before + client.PUBLIC_IP_CACHE_TTL
+
+
+def test_successful_lookup_is_cached_for_ttl(monkeypatch, ip_cache):
+    results = {id(client.IPV4_SERVICES): '203.0.113.7', id(client.IPV6_SERVICES): None}
+    monkeypatch.setattr(client, '_race_ip_services', lambda services, validator: results[id(services)])
+    monkeypatch.setattr(client, '_get_local_global_ipv6', lambda: None)
+
+    before = time.time()
+    client.refresh_ip_cache()
+    assert ip_cache['ipv4'] == '203.0.113.7'
+    assert ip_cache['expires'] >= before + client.PUBLIC_IP_CACHE_TTL
+
+
+def test_request_ip_refresh_sets_event(monkeypatch):
+    event = client.threading.Event()
+    monkeypatch.setattr(client, '_ip_refresh_event', event)
+    client.request_ip_refresh()
+    assert event.is_set()
@@ -0,0 +1,71 @@
+import os
+
+import client
+
+CPUINFO_BLOCK = """processor\t: {n}
+vendor_id\t: GenuineIntel
+model name\t: Intel(R) Xeon(R) Gold 6130 CPU @ 2.10GHz
+physical id\t: {pkg}
+core id\t\t: {core}
+flags\t\t: fpu vme sse2 ht
+"""
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+def _fake_tree(root, packages=2, cores=2, threads=2, topology=True):
+    """构造假的 /proc 与 /sys 目录：packages × cores × threads 个逻辑CPU"""
+    blocks = []
+    n = 0
+    for pkg in range(packages):
+        for core in range(cores):
+            for _ in range(threads):
+                blocks.append(CPUINFO_BLOCK.format(n=n, pkg=pkg, core=core))
+                cpu_dir = os.path.join(root, 'sys', 'devices', 'system', 'cpu', f'cpu{n}')
+                if topology:
+                    _write(os.path.join(cpu_dir, 'topology', 'physical_package_id'), f'{pkg}\n')
+                    _write(os.path.join(cpu_dir, 'topology', 'core_id'), f'{core}\n')
+                _write(os.path.join(cpu_dir, 'cpufreq', 'scaling_cur_freq'), f'{2000000 + n * 100000}\n')
+                n += 1
+    _write(os.path.join(root, 'proc', 'cpuinfo'), '\n'.join(blocks))
+    return os.path.join(root, 'proc'), os.path.join(root, 'sys')
+
+
+def test_sysfs_topology(tmp_path):
+    proc_root, sys_root = _fake_tree(str(tmp_path))
+    info = client._parse_linux_cpu_static(proc_root, sys_root)
+    assert info == {
+        'model': 'Intel(R) Xeon(R) Gold 6130 CPU @ 2.10GHz',
+        'is_virtual': False,
+        'socket_count': 2,
+        'cores': 4,
+        'threads': 8,
+        'threads_per_core': 2,
+    }
+
+
+def test_cpuinfo_fallback_without_sysfs_topology(tmp_path):
+    proc_root, sys_root = _fake_tree(str(tmp_path), packages=1, cores=4, threads=1, topology=False)
+    info = client._parse_linux_cpu_static(proc_root, sys_root)
+    assert (info['socket_count'], info['cores'], info['threads'], info['threads_per_core']) == (1, 4, 4, 1)
+
+
+def test_hypervisor_flag_marks_virtual(tmp_path):
+    proc_root, sys_root = _fake_tree(str(tmp_path), packages=1, cores=1, threads=1)
+    cpuinfo = os.path.join(proc_root, 'cpuinfo')
+    with open(cpuinfo) as f:
+        text = f.read().replace('flags\t\t: fpu', 'flags\t\t: fpu hypervisor')
+    _write(cpuinfo, text)
+    assert client._parse_linux_cpu_static(proc_root, sys_root)['is_virtual'] is True
+
+
+def test_cpufreq_average(tmp_path):
+    _, sys_root = _fake_tree(str(tmp_path), packages=1, cores=2, threads=1)
+    paths = client._find_cpufreq_paths(sys_root)
+    assert len(paths) == 2
+    assert client._average_cpufreq(paths) == 2050
+    assert client._average_cpufreq([]) is None
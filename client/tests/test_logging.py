@@ -0,0 +1,69 @@
+import logging
+
+import pytest
+
+import client
+
+
+def _record(msg, level=logging.INFO, args=None):
+    return logging.LogRecord('bserver_client', level, __file__, 1, msg, args, None)
+
+
+def test_rate_limit_suppresses_repeats_and_reports_count(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(client.time, 'monotonic', lambda: now[0])
+    limiter = client.RateLimitFilter(window=60)
+
+    assert limiter.filter(_record('[Socket] 🔄 Attempting to connect'))
+    for _ in range(5):
+        assert not limiter.filter(_record('[Socket] 🔄 Attempting to connect'))
+    # 级别不同视为不同的日志
+    assert limiter.filter(_record('[Socket] 🔄 Attempting to connect', logging.WARNING))
+
+    now[0] += 61
+    record = _record('[Socket] %s to connect', args=('🔄 Attempting',))
+    assert limiter.filter(record)
+    assert record.getMessage() == '[Socket] 🔄 Attempting to connect (suppressed 5 repeats)'
+
+    # 汇总后计数清零
+    now[0] += 61
+    record = _record('[Socket] 🔄 Attempting to connect')
+    assert limiter.filter(record)
+    assert record.getMessage() == '[Socket] 🔄 Attempting to connect'
+
+
+def test_rate_limit_window_zero_disables_filter():
+    limiter = client.RateLimitFilter(window=0)
+    assert all(limiter.filter(_record('same')) for _ in range(3))
+
+
+def test_rate_limit_bounds_tracked_keys():
+    limiter = client.RateLimitFilter(window=60, max_keys=4)
+    for i in range(10):
+        limiter.filter(_record(f'message {i}'))
+    assert len(limiter._seen) == 4
+
+
+@pytest.fixture
+def configured_logging():
+    client.shutdown_logging()
+    yield
+    client.shutdown_logging()
+
+
+def test_setup_logging_writes_rotating_file_and_filters_level(tmp_path, monkeypatch, configured_logging):
+    monkeypatch.setattr(client, 'LOG_RATE_LIMIT_WINDOW', 0)
+    log_file = tmp_path / 'client.log'
+    client.setup_logging(level='INFO', log_file=str(log_file))
+    # 重复调用不会再添加处理器
+    client.setup_logging(level='DEBUG', log_file=str(log_file))
+
+    client.log.debug('[Data] per-tick detail')
+    client.log.info('[Client] 🚀 starting')
+    client.log.error('[Client] ❌ failed')
+    client.shutdown_logging()
+
+    lines = log_file.read_text(encoding='utf-8').splitlines()
+    assert len(lines) == 2
+    assert lines[0].endswith('INFO [Client] 🚀 starting')
+    assert lines[1].endswith('ERROR [Client] ❌ failed')
@@ -0,0 +1,99 @@
+import client
+
+
+def _metrics(index):
+    return {'timestamp_ms': 1000 + index, 'cpu': index, 'net_in_bps': index * 100}
+
+
+def _timestamps(records):
+    return [client.unpack_report_struct(record)['timestamp_ms'] for record in records]
+
+
+def test_ring_keeps_order_and_commit_removes_oldest(tmp_path):
+    buffer = client.MetricsRingBuffer(capacity=4, spool_path=str(tmp_path / 'spool.bin'))
+    for index in range(3):
+        buffer.append(_metrics(index))
+    assert buffer.pending() == 3
+    assert _timestamps(buffer.peek(2)) == [1000, 1001]
+    buffer.commit(2)
+    assert _timestamps(buffer.peek(10)) == [1002]
+    assert len(buffer._buffer) == 4 * buffer.record_size
+
+
+def test_overflow_spills_to_disk_in_order(tmp_path):
+    spool = tmp_path / 'spool.bin'
+    buffer = client.MetricsRingBuffer(capacity=3, spool_path=str(spool))
+    for index in range(7):
+        buffer.append(_metrics(index))
+    assert spool.stat().st_size == 4 * buffer.record_size
+    assert buffer.pending() == 7
+    assert _timestamps(buffer.peek(5)) == [1000, 1001, 1002, 1003, 1004]
+
+    buffer.commit(5)
+    assert not spool.exists()
+    assert _timestamps(buffer.peek(10)) == [1005, 1006]
+    assert buffer.stats['spooled'] == 4 and buffer.stats['backfilled'] == 5
+
+
+def test_spool_size_is_bounded(tmp_path):
+    buffer = client.MetricsRingBuffer(capacity=1, spool_path=str(tmp_path / 'spool.bin'), spool_max_bytes=0)
+    buffer.spool_max_bytes = 2 * buffer.record_size
+    for index in range(5):
+        buffer.append(_metrics(index))
+    assert buffer.stats['spooled'] == 2 and buffer.stats['dropped'] == 2
+    assert _timestamps(buffer.peek(10)) == [1000, 1001, 1004]
+
+
+def test_spool_survives_restart(tmp_path):
+    spool = str(tmp_path / 'spool.bin')
+    first = client.MetricsRingBuffer(capacity=1, spool_path=spool)
+    for index in range(3):
+        first.append(_metrics(index))
+    second = client.MetricsRingBuffer(capacity=1, spool_path=spool)
+    assert second.pending() == 2
+    assert _timestamps(second.peek(10)) == [1000, 1001]
+
+
+def test_backfill_batches_are_limited(tmp_path):
+    buffer = client.MetricsRingBuffer(capacity=10, spool_path=str(tmp_path / 'spool.bin'))
+    for index in range(5):
+        buffer.append(_metrics(index))
+    count, payload = client.build_backfill_batch(buffer, 'json', limit=2)
+    assert count == 2 and payload['remaining'] == 3
+    assert [sample['cpu'] for sample in payload['samples']] == [0, 1]
+
+    count, payload = client.build_backfill_batch(buffer, 'struct', limit=10)
+    assert count == 5 and len(payload['records']) == 5 * buffer.record_size
+    assert client.build_backfill_batch(client.MetricsRingBuffer(capacity=1, spool_path=None), 'json') == (0, None)
+
+
+class _FakeSio:
+    connected = True
+
+    def __init__(self):
+        self.sent = []
+        self.fail = False
+
+    def emit(self, event, data):
+        if self.fail:
+            raise OSError('broken pipe')
+        self.sent.append((event, data))
+
+
+def test_send_backfill_batch_commits_only_after_emit(monkeypatch):
+    fake = _FakeSio()
+    monkeypatch.setattr(client, 'sio', fake)
+    monkeypatch.setattr(client, 'BACKFILL_BATCH_SIZE', 2)
+    buffer = client.get_metrics_buffer()
+    for index in range(3):
+        buffer.append(_metrics(index))
+
+    fake.fail = True
+    assert client.send_backfill_batch() is False
+    assert buffer.pending() == 3
+
+    fake.fail = False
+    assert client.send_backfill_batch() is True
+    assert client.send_backfill_batch() is True
+    assert client.send_backfill_batch() is False
+    assert [len(data['samples']) for _, data in fake.sent] == [2, 1]
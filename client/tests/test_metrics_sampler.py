@@ -0,0 +1,64 @@
+import pytest
+
+import client
+
+NET_DEV_HEADER = (
+    "Inter-|   Receive                                                |  Transmit\n"
+    " face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed\n"
+)
+
+
+def _write_proc(root, busy, rx, tx):
+    (root / 'net').mkdir(exist_ok=True)
+    with open(root / 'stat', 'w') as f:
+        f.write(f"cpu  {busy} 0 0 {1000 - busy} 0 0 0 0 0 0\n"
+                f"cpu0 {busy} 0 0 {1000 - busy} 0 0 0 0 0 0\n")
+    with open(root / 'net' / 'dev', 'w') as f:
+        f.write(NET_DEV_HEADER)
+        f.write(f"  eth0: {rx} 10 0 0 0 0 0 0 {tx} 10 0 0 0 0 0 0\n")
+
+
+def test_window_summary_and_wrap():
+    window = client.MetricWindow(3)
+    assert window.summary() is None
+    for value in (5, 1, 9):
+        window.add(value)
+    assert window.summary() == {'min': 1, 'max': 9, 'avg': 5, 'last': 9, 'count': 3}
+    window.add(3)  # 覆盖最旧的 5
+    assert window.summary() == {'min': 1, 'max': 9, 'avg': pytest.approx(4.33), 'last': 3, 'count': 3}
+    window.clear()
+    window.add(7)
+    assert window.summary()['count'] == 1 and window.summary()['last'] == 7
+
+
+def test_sampler_collects_cpu_and_network(tmp_path, monkeypatch):
+    monkeypatch.setattr(client.platform, 'system', lambda: 'Linux')
+    clock = [100 * 10 ** 9]
+    monkeypatch.setattr(client.time, 'monotonic_ns', lambda: clock[0])
+    _write_proc(tmp_path, 0, 0, 0)
+    sampler = client.MetricsSampler(interval=0.01, proc_root=str(tmp_path), window_size=10)
+    try:
+        sampler.sample_once()
+        for step, (busy, rx, tx) in enumerate([(100, 1000, 500), (300, 4000, 500)], start=1):
+            # 每步推进0.5秒：CPU节拍与网卡计数随之增长
+            clock[0] += 5 * 10 ** 8
+            (tmp_path / 'stat').write_text(
+                f"cpu  {busy} 0 0 {1000 * step + 1000 - busy} 0 0 0 0 0 0\n"
+                f"cpu0 {busy} 0 0 {1000 * step + 1000 - busy} 0 0 0 0 0 0\n")
+            with open(tmp_path / 'net' / 'dev', 'w') as f:
+                f.write(NET_DEV_HEADER)
+                f.write(f"  eth0: {rx} 10 0 0 0 0 0 0 {tx} 10 0 0 0 0 0 0\n")
+            sampler.sample_once()
+
+        stats = sampler.drain_stats()
+        assert stats['cpu']['count'] == 2
+        assert stats['net_in'] == {'min': 2000.0, 'max': 6000.0, 'avg': 4000.0, 'last': 6000.0, 'count': 2}
+        assert stats['net_out']['min'] == 0.0 and stats['net_out']['max'] == 1000.0
+        assert sampler.drain_stats() == {}
+    finally:
+        sampler.stop()
+
+
+def test_drain_without_sampler(monkeypatch):
+    monkeypatch.setattr(client, '_cpu_sampler', None)
+    assert client.drain_sample_stats() == {}
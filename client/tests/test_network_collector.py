@@ -0,0 +1,52 @@
+import client
+
+SECOND = 10 ** 9
+
+
+def _nic(rx_bytes=0, rx_packets=0, rx_errs=0, rx_drop=0, tx_bytes=0, tx_packets=0, tx_errs=0, tx_drop=0):
+    return (rx_bytes, rx_packets, rx_errs, rx_drop, tx_bytes, tx_packets, tx_errs, tx_drop)
+
+
+def test_interface_selection_patterns(monkeypatch):
+    for name in ('lo', 'docker0', 'veth1a2b', 'br-0f3c', 'cali123'):
+        assert not client._interface_selected(name)
+    assert client._interface_selected('eth0') and client._interface_selected('ens5')
+
+    monkeypatch.setattr(client, 'NET_INTERFACE_INCLUDE', ['eth*', 'bond*'])
+    assert client._interface_selected('eth1') and client._interface_selected('bond0')
+    assert not client._interface_selected('wlan0')
+    # 排除优先于包含
+    assert not client._interface_selected('docker0', include=['*'])
+
+
+def test_rates_deduplicate_container_traffic():
+    collector = client.NetworkCollector()
+    assert collector.update({'eth0': _nic(), 'docker0': _nic(), 'veth9': _nic(), 'lo': _nic()}, SECOND) is None
+
+    # 容器流量在veth、docker0、eth0上各出现一次，只按物理网卡计
+    result = collector.update({
+        'eth0': _nic(rx_bytes=4000, rx_packets=40, rx_errs=1, tx_bytes=2000, tx_packets=20, tx_drop=2),
+        'docker0': _nic(rx_bytes=4000, tx_bytes=2000),
+        'veth9': _nic(rx_bytes=4000, tx_bytes=2000),
+        'lo': _nic(rx_bytes=10 ** 6, tx_bytes=10 ** 6),
+    }, 3 * SECOND)
+    assert set(result['interfaces']) == {'eth0'}
+    assert result['interfaces']['eth0'] == {'rx_bps': 2000, 'tx_bps': 1000, 'rx_pps': 20.0, 'tx_pps': 10.0,
+                                           'rx_errs': 1, 'tx_errs': 0, 'rx_drop': 0, 'tx_drop': 2}
+    assert result['total'] == {'rx_bps': 2000.0, 'tx_bps': 1000.0}
+
+
+def test_new_and_reset_interfaces_skip_one_tick():
+    collector = client.NetworkCollector()
+    collector.update({'eth0': _nic(rx_bytes=5000)}, 0)
+    result = collector.update({'eth0': _nic(rx_bytes=100), 'eth1': _nic(rx_bytes=7000)}, SECOND)
+    assert result['interfaces'] == {} and result['total']['rx_bps'] == 0
+    result = collector.update({'eth0': _nic(rx_bytes=600), 'eth1': _nic(rx_bytes=7100)}, 2 * SECOND)
+    assert result['total']['rx_bps'] == 600.0
+
+
+def test_counter_wrap_is_not_a_spike():
+    collector = client.NetworkCollector()
+    collector.update({'eth0': _nic(rx_bytes=2 ** 32 - 1000)}, 0)
+    result = collector.update({'eth0': _nic(rx_bytes=1000)}, SECOND)
+    assert result['interfaces']['eth0']['rx_bps'] == 2000
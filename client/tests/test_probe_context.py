@@ -0,0 +1,89 @@
+import socket
+
+import client
+
+
+def _fake_getaddrinfo(calls):
+    def getaddrinfo(host, port, *args, **kwargs):
+        calls.append(host)
+        return [
+            (socket.AF_INET6, socket.SOCK_STREAM, 6, '', ('::1', port, 0, 0)),
+            (socket.AF_INET, socket.SOCK_STREAM, 6, '', ('127.0.0.1', port)),
+            (socket.AF_INET, socket.SOCK_STREAM, 6, '', ('127.0.0.1', port)),
+        ]
+    return getaddrinfo
+
+
+def test_resolve_is_cached_and_counted(monkeypatch):
+    calls = []
+    monkeypatch.setattr(client.socket, 'getaddrinfo', _fake_getaddrinfo(calls))
+    context = client.ProbeContext(dns_cache_size=8, dns_cache_ttl=60)
+    first = context.resolve('Example.com', 443)
+    second = context.resolve('example.com', 443)
+    assert first == second == [(socket.AF_INET6, ('::1', 443, 0, 0)), (socket.AF_INET, ('127.0.0.1', 443))]
+    assert calls == ['Example.com']
+    stats = context.get_stats()
+    assert stats['dns_hits'] == 1 and stats['dns_misses'] == 1 and stats['dns_entries'] == 1
+
+
+def test_resolve_expires_after_ttl(monkeypatch):
+    calls = []
+    now = [1000.0]
+    monkeypatch.setattr(client.socket, 'getaddrinfo', _fake_getaddrinfo(calls))
+    monkeypatch.setattr(client.time, 'monotonic', lambda: now[0])
+    context = client.ProbeContext(dns_cache_size=8, dns_cache_ttl=30)
+    context.resolve('a.example', 80)
+    now[0] += 29
+    context.resolve('a.example', 80)
+    now[0] += 2
+    context.resolve('a.example', 80)
+    assert calls == ['a.example', 'a.example']
+
+
+def test_lru_eviction(monkeypatch):
+    calls = []
+    monkeypatch.setattr(client.socket, 'getaddrinfo', _fake_getaddrinfo(calls))
+    context = client.ProbeContext(dns_cache_size=2, dns_cache_ttl=60)
+    context.resolve('a.example', 80)
+    context.resolve('b.example', 80)
+    context.resolve('a.example', 80)  # a 变为最近使用
+    context.resolve('c.example', 80)  # 淘汰 b
+    context.resolve('a.example', 80)
+    context.resolve('b.example', 80)
+    assert calls == ['a.example', 'b.example', 'c.example', 'b.example']
+    assert context.get_stats()['dns_evictions'] == 2
+
+
+def test_failed_resolution_is_not_cached(monkeypatch):
+    calls = []
+
+    def getaddrinfo(host, *args, **kwargs):
+        calls.append(host)
+        raise socket.gaierror('no such host')
+
+    monkeypatch.setattr(client.socket, 'getaddrinfo', getaddrinfo)
+    for _ in range(2):
+        result = client.tcp_probe('missing.example', 80, timeout=1)
+        assert result['error_code'] == 'dns_error'
+    assert calls == ['missing.example', 'missing.example']
+
+
+def test_method_lookup_runs_once(monkeypatch):
+    lookups = []
+    monkeypatch.setattr(client, 'find_tcping_executable', lambda: lookups.append(1) or 'python_socket')
+    context = client.ProbeContext()
+    assert context.method == 'python_socket'
+    assert context.method == 'python_socket'
+    assert lookups == [1]
+
+
+def test_cache_is_shared_across_ports(monkeypatch):
+    calls = []
+    monkeypatch.setattr(client.socket, 'getaddrinfo', _fake_getaddrinfo(calls))
+    context = client.ProbeContext(dns_cache_size=1, dns_cache_ttl=60)
+    assert context.resolve('a.example', 80)[1] == (socket.AF_INET, ('127.0.0.1', 80))
+    assert context.resolve('a.example', 443) == [(socket.AF_INET6, ('::1', 443, 0, 0)),
+                                                 (socket.AF_INET, ('127.0.0.1', 443))]
+    assert calls == ['a.example']
+    stats = context.get_stats()
+    assert stats['dns_entries'] == 1 and stats['dns_evictions'] == 0
@@ -0,0 +1,84 @@
+import os
+
+import pytest
+
+import client
+
+STAT = """cpu  100 0 50 800 50 0 0 0 0 0
+cpu0 50 0 25 400 25 0 0 0 0 0
+cpu1 50 0 25 400 25 0 0 0 0 0
+intr 0
+btime 1700000000
+"""
+
+MEMINFO = """MemTotal:       8000000 kB
+MemFree:        1000000 kB
+MemAvailable:   6000000 kB
+Buffers:         100000 kB
+Cached:         2000000 kB
+SwapTotal:      2000000 kB
+SwapFree:       1500000 kB
+"""
+
+NET_DEV = """Inter-|   Receive                                                |  Transmit
+ face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed
+    lo:    1000      10    0    0    0     0          0         0     1000      10    0    0    0     0       0          0
+  eth0:  500000     400    1    2    0     0          0         0   250000     300    3    4    0     0       0          0
+"""
+
+
+def _write_proc(root, stat=STAT):
+    files = {'stat': stat, 'meminfo': MEMINFO, 'net/dev': NET_DEV,
+             'loadavg': '0.50 0.40 0.30 1/100 1234\n', 'uptime': '172800.50 100.00\n'}
+    for name, text in files.items():
+        path = os.path.join(root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(text)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    _write_proc(str(tmp_path))
+    engine = client.ProcSnapshotEngine(proc_root=str(tmp_path), buffer_size=64)
+    yield engine
+    engine.close()
+
+
+def test_capture_parses_all_files(engine):
+    snapshot = engine.capture()
+    assert (snapshot['cpu_total'], snapshot['cpu_idle']) == (1000, 850)
+    assert snapshot['per_cpu'] == [(500, 425), (500, 425)]
+    assert snapshot['boot_time'] == 1700000000
+    assert snapshot['meminfo']['MemTotal'] == 8000000 * 1024
+    assert snapshot['net']['eth0'] == (500000, 400, 1, 2, 250000, 300, 3, 4)
+    assert snapshot['loadavg'] == (0.5, 0.4, 0.3)
+    assert snapshot['uptime'] == 172800.5
+    assert engine.current is snapshot
+
+
+def test_small_buffer_grows(engine):
+    # 64字节的初始缓冲区不足以容纳这些文件，读取时应自动扩容
+    assert engine.capture()['meminfo']['SwapFree'] == 1500000 * 1024
+
+
+def test_capture_rereads_with_same_descriptors(tmp_path, engine):
+    engine.capture()
+    fds = {name: reader._fd for name, reader in engine._readers.items()}
+    _write_proc(str(tmp_path), stat=STAT.replace('cpu  100 0 50 800', 'cpu  300 0 50 900'))
+    assert engine.capture()['cpu_total'] == 1300
+    assert {name: reader._fd for name, reader in engine._readers.items()} == fds
+
+
+def test_memory_info_from_meminfo(engine):
+    info = client._memory_info_from_meminfo(engine.capture()['meminfo'])
+    assert info['percent'] == 25
+    assert info['available'] == 6000000 * 1024
+    assert info['used'] == 2000000 * 1024
+    assert info['swap_used'] == 500000 * 1024
+    assert info['swap_percent'] == 25.0
+
+
+def test_net_totals_skip_loopback(engine):
+    totals = client._net_totals_from_snapshot(engine.capture())
+    assert (totals.bytes_recv, totals.bytes_sent) == (500000, 250000)
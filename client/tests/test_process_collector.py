@@ -0,0 +1,170 @@
+import contextlib
+import os
+from collections import namedtuple
+
+import pytest
+
+import client
+
+SECOND = 10 ** 9
+
+
+def _write_process(root, pid, name='worker', ticks=0, start=1000, rss_pages=10, cmdline=b'/usr/bin/worker\0--serve\0'):
+    path = root / str(pid)
+    path.mkdir(exist_ok=True)
+    (path / 'stat').write_text(f"{pid} ({name}) S 1 1 1 0 -1 4194560 100 0 0 0 {ticks} 0 0 0 20 0 1 0 "
+                               f"{start} 1000000 {rss_pages} 18446744073709551615\n")
+    (path / 'cmdline').write_bytes(cmdline)
+
+
+@pytest.fixture
+def proc(tmp_path, monkeypatch):
+    monkeypatch.setattr(client.platform, 'system', lambda: 'Linux')
+    clock = [0]
+    monkeypatch.setattr(client.time, 'monotonic_ns', lambda: clock[0])
+    return tmp_path, clock
+
+
+def _collector(root, **kwargs):
+    collector = client.ProcessCollector(proc_root=str(root), budget=kwargs.pop('budget', 10), **kwargs)
+    collector._clk_tck = 100
+    collector._page_size = 4096
+    return collector
+
+
+def test_parses_names_with_spaces_and_parentheses(proc):
+    root, _ = proc
+    _write_process(root, 42, name='tmux: server (1)', ticks=250, start=777, rss_pages=3)
+    collector = _collector(root)
+    assert collector._read_stat(42) == ('tmux: server (1)', 2.5, 777, 3 * 4096)
+
+
+def test_top_by_cpu_and_memory(proc):
+    root, clock = proc
+    _write_process(root, 1, 'idle', ticks=0, rss_pages=500)
+    _write_process(root, 2, 'busy', ticks=0, rss_pages=10)
+    _write_process(root, 3, 'kworker', ticks=0, rss_pages=0, cmdline=b'')
+    collector = _collector(root, top_n=2)
+    collector.scan()
+
+    clock[0] += 2 * SECOND
+    _write_process(root, 2, 'busy', ticks=300, rss_pages=10)
+    _write_process(root, 3, 'kworker', ticks=20, rss_pages=0, cmdline=b'')
+    result = collector.collect()
+    assert result['count'] == 3
+    assert [(p['pid'], p['cpu']) for p in result['top_cpu']] == [(2, 150.0), (3, 10.0)]
+    assert [p['pid'] for p in result['top_mem']] == [1, 2]
+    busy = result['top_cpu'][0]
+    assert busy['cmdline'] == '/usr/bin/worker --serve' and busy['rss'] == 10 * 4096
+    assert busy['user'] is not None
+    assert result['top_cpu'][1]['cmdline'] == '[kworker]'
+
+
+def test_static_data_cached_until_pid_reuse(proc):
+    root, clock = proc
+    _write_process(root, 7, 'old', start=100)
+    collector = _collector(root, top_n=1)
+    assert collector.collect()['top_cpu'][0]['cmdline'] == '/usr/bin/worker --serve'
+
+    # 命令行只在第一次进入排行时读取
+    (root / '7' / 'cmdline').write_bytes(b'changed\0')
+    clock[0] += SECOND
+    assert collector.collect()['top_cpu'][0]['cmdline'] == '/usr/bin/worker --serve'
+
+    # 同一PID被新进程复用（启动时间不同）：缓存失效，CPU重新建立基准
+    _write_process(root, 7, 'new', ticks=10 ** 6, start=200, cmdline=b'/bin/new\0')
+    clock[0] += SECOND
+    entry = collector.collect()['top_cpu'][0]
+    assert entry['name'] == 'new' and entry['cmdline'] == '/bin/new' and entry['cpu'] == 0.0
+
+
+def test_exited_processes_are_dropped(proc):
+    root, clock = proc
+    for pid in (1, 2):
+        _write_process(root, pid)
+    collector = _collector(root)
+    collector.scan()
+    for name in os.listdir(root / '2'):
+        os.unlink(root / '2' / name)
+    os.rmdir(root / '2')
+    clock[0] += SECOND
+    collector.scan()
+    assert set(collector._procs) == {1}
+    assert all(key[0] == 1 for key in collector._rates._state)
+
+
+def test_budget_limits_each_scan_and_resumes(proc, monkeypatch):
+    root, _ = proc
+    for pid in range(1, 11):
+        _write_process(root, pid)
+    cpu_clock = [0.0]
+
+    def thread_time():
+        cpu_clock[0] += 0.001
+        return cpu_clock[0]
+    monkeypatch.setattr(client.time, 'thread_time', thread_time)
+
+    # 每读一个进程消耗1ms，预算2.5ms：每次扫描3个，从上次中断处继续
+    collector = _collector(root, budget=0.0025)
+    seen = []
+    for _ in range(4):
+        before = set(collector._procs)
+        assert not collector.scan()
+        seen.append(sorted(set(collector._procs) - before))
+    assert seen == [[1, 2, 3], [4, 5, 6], [7, 8, 9], [10]]
+    # 第四次扫描读完10号后回到开头，刷新了1、2号
+    assert collector._next_pid == 3
+    assert collector.stats['partial_scans'] == 4 and collector.stats['last_scanned'] == 3
+
+    collector.budget = 10
+    assert collector.scan() and collector._next_pid == 0
+
+
+class FakeProcess:
+    CpuTimes = namedtuple('CpuTimes', ['user', 'system'])
+    MemInfo = namedtuple('MemInfo', ['rss'])
+
+    def __init__(self, pid):
+        if pid == 3:
+            raise client.psutil.NoSuchProcess(pid)
+        self.pid = pid
+
+    def oneshot(self):
+        return contextlib.nullcontext()
+
+    def name(self):
+        return f'proc{self.pid}'
+
+    def cmdline(self):
+        return [f'/bin/proc{self.pid}']
+
+    def username(self):
+        return 'nobody'
+
+    def cpu_times(self):
+        return self.CpuTimes(self.pid, 0.0)
+
+    def create_time(self):
+        return 1000.0 + self.pid
+
+    def memory_info(self):
+        return self.MemInfo(self.pid * 4096)
+
+
+def test_psutil_path_resumes_after_budget(monkeypatch):
+    monkeypatch.setattr(client.psutil, 'pids', lambda: [4, 1, 3, 2])
+    monkeypatch.setattr(client.psutil, 'Process', FakeProcess)
+    collector = client.ProcessCollector(top_n=2, budget=0)
+    collector._use_proc = False
+
+    # 预算为0：每次扫描只采集一个进程，下次从中断处继续；已退出的3号被跳过
+    for _ in range(3):
+        assert not collector.scan()
+    assert sorted(collector._procs) == [1, 2, 4]
+    assert collector._next_pid == 1
+
+    collector.budget = 10
+    assert collector.scan()
+    top = collector.top()['top_mem']
+    assert [p['pid'] for p in top] == [4, 2]
+    assert top[0]['cmdline'] == '/bin/proc4' and top[0]['user'] == 'nobody'
@@ -0,0 +1,60 @@
+import math
+
+import pytest
+
+import client
+
+SECOND = 10 ** 9
+
+
+def test_first_reading_sets_baseline_then_rate():
+    engine = client.RateEngine(tau=0)
+    assert engine.update('eth0', 1000, 0) is None
+    sample = engine.update('eth0', 4000, 2 * SECOND)
+    assert sample == client.RateSample(3000, 2.0, 1500.0)
+
+
+def test_wraps_and_resets():
+    engine = client.RateEngine(tau=0)
+    engine.update('c32', 2 ** 32 - 100, 0)
+    assert engine.update('c32', 100, SECOND).delta == 200
+    engine.update('c64', 2 ** 64 - 10, 0)
+    assert engine.update('c64', 10, SECOND).delta == 20
+    assert engine.stats['wraps'] == 2
+
+    # 小计数器变小视为重置：不输出尖峰，下一次从新基准计算
+    engine.update('nic', 5000, 0)
+    assert engine.update('nic', 10, SECOND) is None
+    assert engine.update('nic', 110, 2 * SECOND).rate == 100.0
+    assert engine.stats['resets'] == 1
+
+
+def test_clock_not_advancing_keeps_baseline():
+    engine = client.RateEngine(tau=0)
+    engine.update('x', 0, SECOND)
+    assert engine.update('x', 100, SECOND) is None
+    assert engine.update('x', 300, 2 * SECOND).rate == 300.0
+
+
+def test_ewma_uses_time_constant():
+    engine = client.RateEngine(tau=10)
+    engine.update('x', 0, 0)
+    assert engine.update('x', 100, SECOND).rate == 100.0
+    sample = engine.update('x', 100, 2 * SECOND)
+    assert sample.delta == 0
+    assert sample.rate == pytest.approx(100 * math.exp(-0.1))
+
+
+def test_retain_drops_vanished_counters():
+    engine = client.RateEngine()
+    engine.update(('eth0', 'rx_bytes'), 1, 0)
+    engine.update(('veth1', 'rx_bytes'), 1, 0)
+    engine.retain([('eth0', 'rx_bytes')])
+    assert engine.update(('veth1', 'rx_bytes'), 2, SECOND) is None
+    assert engine.update(('eth0', 'rx_bytes'), 2, SECOND).delta == 1
+
+
+def test_cpu_percent_from_ticks():
+    engine = client.RateEngine(tau=0)
+    assert client._cpu_percent_from_ticks(engine, 'cpu', 1000, 800, 0) is None
+    assert client._cpu_percent_from_ticks(engine, 'cpu', 1400, 900, SECOND) == 75.0
@@ -0,0 +1,64 @@
+import random
+
+import client
+
+
+class _MaxRandom(random.Random):
+    """uniform 总是返回上限，便于断言退避上限"""
+
+    def uniform(self, a, b):
+        return b
+
+
+def test_initial_attempt_is_immediate_then_backoff_grows_to_cap():
+    controller = client.ReconnectController(base_interval=2, max_interval=30, max_attempts=0, rng=_MaxRandom())
+    assert controller.delay_before_attempt() == 0
+    delays = [controller.record_failure('refused', now=0) for _ in range(6)]
+    assert delays == [2, 4, 8, 16, 30, 30]
+    assert not controller.exhausted()
+
+
+def test_full_jitter_stays_within_ceiling():
+    controller = client.ReconnectController(base_interval=1, max_interval=10, rng=random.Random(42))
+    for _ in range(20):
+        delay = controller.record_failure(now=0)
+        assert 0 <= delay <= min(10, 2 ** (controller.failures - 1))
+
+
+def test_fast_path_after_success():
+    controller = client.ReconnectController(base_interval=5, max_interval=60, fast_delay=1, rng=_MaxRandom())
+    controller.record_success(now=0)
+    controller.on_disconnected(now=100)
+    assert controller.delay_before_attempt() == 1
+    assert controller.record_failure('timeout', now=101) == 5
+
+
+def test_max_attempts_and_ready():
+    controller = client.ReconnectController(base_interval=2, max_attempts=2, rng=_MaxRandom())
+    assert controller.ready(now=0)
+    controller.record_failure(now=0)
+    assert not controller.ready(now=1.9)
+    assert controller.ready(now=2)
+    controller.record_failure(now=2)
+    assert controller.exhausted()
+
+
+def test_metrics_track_attempts_and_downtime():
+    controller = client.ReconnectController(base_interval=1, rng=_MaxRandom())
+    controller.record_success(now=0)
+    controller.on_disconnected(now=10)
+    controller.record_failure(ConnectionRefusedError('refused'), now=11)
+    metrics = controller.metrics(now=15)
+    assert metrics['attempts'] == 2 and metrics['consecutive_failures'] == 1
+    assert metrics['disconnected_seconds'] == 5.0 and metrics['last_error'] == 'refused'
+
+    controller.record_success(now=20)
+    metrics = controller.metrics(now=30)
+    assert metrics['reconnects'] == 1 and metrics['consecutive_failures'] == 0
+    assert metrics['disconnected_seconds'] == 0 and metrics['total_disconnected_seconds'] == 10.0
+
+
+def test_heartbeat_carries_connection_stats():
+    controller = client.ReconnectController()
+    payload = client.build_heartbeat_payload(controller)
+    assert payload['connection_stats']['attempts'] == 0
@@ -0,0 +1,90 @@
+import client
+
+
+def _sample(cpu=10, memory='1 MiB / 2 MiB'):
+    return {
+        'ip': 'ipv4:1.2.3.4', 'ipv4': '1.2.3.4', 'ipv6': None, 'type': 'VPS',
+        'cpu': cpu, 'ram': 20, 'rom': 30, 'detail': {'memory': memory, 'cpu_info': 'Test CPU'}
+    }
+
+
+def test_dict_delta_nested_and_removed():
+    old = {'a': 1, 'b': None, 'detail': {'x': 1, 'y': 2}, 'gone': True}
+    new = {'a': 1, 'b': None, 'detail': {'x': 1, 'y': 3}, 'added': 'v'}
+    changed, removed = client._dict_delta(old, new)
+    assert changed == {'detail': {'y': 3}, 'added': 'v'}
+    assert removed == ['gone']
+
+
+def test_full_mode_passes_data_through():
+    encoder = client.ReportEncoder()
+    data = _sample()
+    assert encoder.encode(data) == ('report_data', data)
+
+
+def test_delta_mode_sends_full_then_changes():
+    encoder = client.ReportEncoder(full_every=0)
+    encoder.reset(delta_enabled=True)
+    event, payload = encoder.encode(_sample())
+    assert event == 'report_data' and payload['full'] is True and payload['seq'] == 1
+    assert payload['ip'] == 'ipv4:1.2.3.4'
+
+    event, payload = encoder.encode(_sample(cpu=11))
+    assert event == 'report_data_delta'
+    assert payload == {'seq': 2, 'base_seq': 1, 'changed': {'cpu': 11}}
+
+    event, payload = encoder.encode(_sample(cpu=11, memory='2 MiB / 2 MiB'))
+    assert payload['changed'] == {'detail': {'memory': '2 MiB / 2 MiB'}}
+
+
+def test_resync_after_reset_and_periodically():
+    encoder = client.ReportEncoder(full_every=3)
+    encoder.reset(delta_enabled=True)
+    events = [encoder.encode(_sample(cpu=i))[0] for i in range(7)]
+    assert events == ['report_data', 'report_data_delta', 'report_data_delta',
+                      'report_data', 'report_data_delta', 'report_data_delta', 'report_data']
+
+    encoder.reset()
+    event, payload = encoder.encode(_sample())
+    assert event == 'report_data' and payload['full'] is True and payload['seq'] == 8
+
+
+def test_delta_requires_server_acceptance(monkeypatch):
+    monkeypatch.setattr(client, 'REPORT_MODE', 'delta')
+    assert client.build_registration_payload()['report_mode'] == 'delta'
+    assert client._report_mode_accepted({'socket_id': 'x'}) is False
+    assert client._report_mode_accepted({'report_mode': 'delta'}) is True
+    monkeypatch.setattr(client, 'REPORT_MODE', 'full')
+    assert 'report_mode' not in client.build_registration_payload()
+
+
+class _FakeSio:
+    connected = True
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.sent = []
+
+    def emit(self, event, data):
+        if self.fail:
+            raise OSError('broken pipe')
+        self.sent.append((event, data))
+
+
+def test_send_data_failure_forces_full_resync(monkeypatch):
+    fake = _FakeSio()
+    encoder = client.ReportEncoder(full_every=0)
+    encoder.reset(delta_enabled=True)
+    monkeypatch.setattr(client, 'sio', fake)
+    monkeypatch.setattr(client, '_report_encoder', encoder)
+    monkeypatch.setattr(client, '_registration_confirmed', True)
+    monkeypatch.setattr(client, 'collect_sample', lambda: (_sample(), {}))
+    monkeypatch.setattr(client.time, 'sleep', lambda seconds: None)
+
+    assert client.send_data() is True
+    assert client.send_data() is True
+    fake.fail = True
+    assert client.send_data() is False
+    fake.fail = False
+    assert client.send_data() is True
+    assert [event for event, _ in fake.sent] == ['report_data', 'report_data_delta', 'report_data']
@@ -0,0 +1,91 @@
+import pytest
+
+import client
+
+
+def _metrics(cpu=5, ram=20, rom=50, net_in=0, net_out=0):
+    return {'cpu': cpu, 'ram': ram, 'rom': rom, 'net_in_bps': net_in, 'net_out_bps': net_out}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(client.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_fixed_interval_when_not_adaptive(clock):
+    scheduler = client.AdaptiveReportScheduler(base_interval=5, adaptive=False)
+    assert scheduler.due()
+    for _ in range(3):
+        scheduler.record(_metrics())
+    clock[0] += 4.9
+    assert not scheduler.due()
+    clock[0] += 0.1
+    assert scheduler.due()
+
+
+def test_stable_metrics_stretch_interval_up_to_cap(clock):
+    scheduler = client.AdaptiveReportScheduler(base_interval=4, max_interval=10, adaptive=True)
+    intervals = []
+    for _ in range(5):
+        scheduler.record(_metrics())
+        intervals.append(scheduler.current_interval())
+    assert intervals == [4, 6, 9, 10, 10]
+
+
+@pytest.mark.parametrize('changed', [
+    _metrics(cpu=40),
+    _metrics(ram=30),
+    _metrics(rom=95),
+    _metrics(net_in=5 * 1024 * 1024),
+])
+def test_threshold_crossing_resets_interval(clock, changed):
+    scheduler = client.AdaptiveReportScheduler(base_interval=4, max_interval=60, adaptive=True)
+    baseline = _metrics(rom=92 if changed['rom'] == 95 else 50)
+    for _ in range(4):
+        scheduler.record(baseline)
+    assert scheduler.current_interval() > 4
+    scheduler.record(changed)
+    assert scheduler.current_interval() == 4
+
+
+def test_sampled_spike_triggers_early_report(clock, monkeypatch):
+    latest = {'cpu': 5}
+    monkeypatch.setattr(client, 'get_sampled_latest', lambda: latest)
+    scheduler = client.AdaptiveReportScheduler(base_interval=4, max_interval=60, adaptive=True)
+    for _ in range(4):
+        scheduler.record(_metrics())
+    clock[0] += 5
+    assert not scheduler.due()
+    latest['cpu'] = 90
+    assert scheduler.due()
+
+
+def test_server_interval_is_a_floor_with_ttl(clock):
+    scheduler = client.AdaptiveReportScheduler(base_interval=5, adaptive=False)
+    assert scheduler.set_server_interval({'interval_ms': 30000, 'ttl': 100}) == 30
+    scheduler.record(_metrics())
+    clock[0] += 10
+    assert not scheduler.due()
+    clock[0] += 20
+    assert scheduler.due()
+
+    scheduler.record(_metrics())
+    clock[0] += 71  # ttl到期
+    assert scheduler.current_interval() == 5
+
+    scheduler.set_server_interval({'interval': 20})
+    assert scheduler.current_interval() == 20
+    scheduler.set_server_interval({'interval': 0})
+    assert scheduler.current_interval() == 5
+    assert scheduler.set_server_interval({'interval': 'fast'}) is None
+
+
+def test_reset_makes_next_report_due(clock):
+    scheduler = client.AdaptiveReportScheduler(base_interval=5, adaptive=True)
+    scheduler.record(_metrics())
+    scheduler.record(_metrics())
+    assert not scheduler.due()
+    scheduler.reset()
+    assert scheduler.due() and scheduler.current_interval() == 5
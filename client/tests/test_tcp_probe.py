@@ -0,0 +1,85 @@
+import socket
+
+import pytest
+
+import client
+
+
+@pytest.fixture
+def listener():
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    sock.listen(8)
+    yield sock
+    sock.close()
+
+
+def _closed_port():
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def test_probe_success(listener):
+    result = client.tcp_probe('127.0.0.1', listener.getsockname()[1], timeout=2)
+    assert result['success'] is True
+    assert result['error'] is None and result['error_code'] is None
+    assert result['address'] == '127.0.0.1' and result['family'] == 'ipv4'
+    assert result['latency'] >= 0
+
+
+def test_probe_refused_has_structured_code():
+    result = client.tcp_probe('127.0.0.1', _closed_port(), timeout=2)
+    assert result['success'] is False
+    assert result['error_code'] == 'refused'
+    assert result['error'].startswith('Connection error')
+
+
+def test_probe_dns_error():
+    result = client.tcp_probe('nonexistent.invalid', 80, timeout=2)
+    assert result['success'] is False and result['error_code'] == 'dns_error'
+
+
+def test_probe_falls_through_to_next_address(listener, monkeypatch):
+    port = listener.getsockname()[1]
+    refused = _closed_port()
+    infos = [
+        (socket.AF_INET, socket.SOCK_STREAM, 6, '', ('127.0.0.1', refused)),
+        (socket.AF_INET, socket.SOCK_STREAM, 6, '', ('127.0.0.1', port)),
+    ]
+    monkeypatch.setattr(client.socket, 'getaddrinfo', lambda *args, **kwargs: infos)
+    result = client.tcp_probe('dual.example', port, timeout=2)
+    assert result['success'] is True and result['address'] == '127.0.0.1'
+
+
+def test_probe_ipv6_loopback():
+    if not socket.has_ipv6:
+        pytest.skip('IPv6 not supported')
+    try:
+        sock = socket.socket(socket.AF_INET6)
+        sock.bind(('::1', 0))
+    except OSError:
+        pytest.skip('IPv6 loopback not available')
+    sock.listen(1)
+    try:
+        result = client.tcp_probe('::1', sock.getsockname()[1], timeout=2)
+    finally:
+        sock.close()
+    assert result['success'] is True and result['family'] == 'ipv6'
+
+
+def test_perform_tcping_uses_builtin_engine_by_default(listener, monkeypatch):
+    def fail():
+        raise AssertionError('external tcping lookup should not run')
+
+    monkeypatch.setattr(client, 'find_tcping_executable', fail)
+    monkeypatch.setattr(client.subprocess, 'run', fail)
+    result = client.perform_tcping('127.0.0.1', listener.getsockname()[1], timeout=2)
+    assert result['success'] is True
+
+
+def test_perform_tcping_invalid_port_code():
+    result = client.perform_tcping('127.0.0.1', 70000)
+    assert result['error_code'] == 'invalid_params'
@@ -0,0 +1,54 @@
+import socket
+
+import pytest
+
+import client
+
+
+@pytest.fixture
+def listener():
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    sock.listen(16)
+    yield sock.getsockname()[1]
+    sock.close()
+
+
+def _closed_port():
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def test_batch_mixed_results_keep_order(listener):
+    closed = _closed_port()
+    results = client.tcping_batch([
+        ('127.0.0.1', listener),
+        ('127.0.0.1', closed),
+        ('localhost', listener),
+        ('no-such-host.invalid', 80),
+    ], timeout=2)
+    assert [r['port'] for r in results] == [listener, closed, listener, 80]
+    assert results[0]['error'] is None and results[0]['latency'] >= 0
+    assert results[1]['latency'] is None and results[1]['error'].startswith('Connection error')
+    assert results[2]['error'] is None
+    assert results[3]['error'].startswith('DNS error')
+
+
+def test_handle_batch_is_compact_and_validates(listener):
+    payload = client.handle_tcping_batch({
+        'request_id': 'b1',
+        'targets': [{'host': '127.0.0.1', 'port': listener}, {'host': '', 'port': 1}, {'port': 'x'}, 'bad'],
+        'timeout_ms': 1000,
+    })
+    assert payload['request_id'] == 'b1'
+    assert payload['results'] == [{'host': '127.0.0.1', 'port': listener, 'latency': payload['results'][0]['latency']}]
+    assert 'error' not in payload['results'][0]
+
+
+def test_batch_respects_max_targets(monkeypatch, listener):
+    monkeypatch.setattr(client, 'TCPING_BATCH_MAX_TARGETS', 2)
+    payload = client.handle_tcping_batch({'targets': [{'host': '127.0.0.1', 'port': listener}] * 5})
+    assert len(payload['results']) == 2
@@ -0,0 +1,73 @@
+import socket
+
+import pytest
+
+import client
+
+
+@pytest.fixture
+def listener():
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    sock.listen(32)
+    yield sock.getsockname()[1]
+    sock.close()
+
+
+def test_statistics():
+    stats = client.tcping_statistics([10.0, 12.0, 11.0, 30.0], sent=5)
+    assert stats == {'sent': 5, 'received': 4, 'loss': 20.0, 'min': 10.0, 'avg': 15.75,
+                     'max': 30.0, 'p50': 11.0, 'p95': 30.0, 'jitter': pytest.approx(7.33, abs=0.01)}
+
+
+def test_statistics_all_lost():
+    stats = client.tcping_statistics([], sent=3)
+    assert stats['loss'] == 100.0 and stats['avg'] is None
+
+
+def test_multi_sample_success(listener):
+    result = client.tcping_multi('127.0.0.1', listener, count=4, interval_ms=1)
+    assert result['success'] is True
+    assert result['stats']['sent'] == 4 and result['stats']['received'] == 4
+    assert result['latency'] == result['stats']['avg']
+
+
+def test_resolves_dns_once(monkeypatch, listener):
+    calls = []
+    real = client.socket.getaddrinfo
+
+    def counting_getaddrinfo(*args, **kwargs):
+        calls.append(args[0])
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(client.socket, 'getaddrinfo', counting_getaddrinfo)
+    client.tcping_multi('localhost', listener, count=3, interval_ms=1)
+    assert calls == ['localhost']
+
+
+def test_configurable_latency_cap(listener):
+    result = client.tcping_multi('127.0.0.1', listener, count=2, interval_ms=1, max_latency_ms=0.000001)
+    assert result['success'] is False and result['error'] == 'High latency'
+    assert result['stats']['avg'] is not None
+
+
+def test_refused_counts_as_loss():
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    result = client.tcping_multi('127.0.0.1', port, count=2, interval_ms=1)
+    assert result['success'] is False
+    assert result['stats']['loss'] == 100.0
+
+
+def test_perform_tcping_uses_multi_sample_mode(listener):
+    result = client.perform_tcping('127.0.0.1', listener, count=3, interval_ms=1)
+    assert result['stats']['sent'] == 3
+
+
+def test_percentile_nearest_rank_exact_boundaries():
+    values = list(range(1, 101))
+    assert client._percentile(values, 95) == 95
+    assert client._percentile(values, 50) == 50
+    assert client._percentile([1, 2, 3], 95) == 3
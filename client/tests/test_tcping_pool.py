@@ -0,0 +1,125 @@
+import threading
+import time
+
+import pytest
+
+import client
+
+
+@pytest.fixture
+def probes(monkeypatch):
+    """替换 perform_tcping：记录调用，并在 release 事件前阻塞"""
+    state = {'calls': [], 'active': 0, 'max_active': 0, 'release': threading.Event()}
+    lock = threading.Lock()
+
+    def fake_perform_tcping(host, port, timeout=None, **options):
+        with lock:
+            state['calls'].append((host, port, timeout, options))
+            state['active'] += 1
+            state['max_active'] = max(state['max_active'], state['active'])
+        state['release'].wait(5)
+        with lock:
+            state['active'] -= 1
+        return {'host': host, 'port': port, 'latency': 1.5, 'success': True}
+
+    monkeypatch.setattr(client, 'perform_tcping', fake_perform_tcping)
+    yield state
+    state['release'].set()
+
+
+class Collector:
+    def __init__(self):
+        self.results = []
+        self._cond = threading.Condition()
+
+    def __call__(self, result):
+        with self._cond:
+            self.results.append(result)
+            self._cond.notify_all()
+
+    def wait_for(self, count, timeout=5):
+        with self._cond:
+            self._cond.wait_for(lambda: len(self.results) >= count, timeout)
+        return self.results
+
+
+def test_concurrency_limit(probes):
+    pool = client.TcpingWorkerPool(max_workers=2, max_queue=10)
+    emit = Collector()
+    for i in range(5):
+        assert pool.submit({'host': f'h{i}', 'port': 80, 'request_id': str(i)}, emit) == 'queued'
+    time.sleep(0.2)
+    assert probes['max_active'] == 2
+    probes['release'].set()
+    assert len(emit.wait_for(5)) == 5
+    pool.shutdown(wait=True)
+
+
+def test_identical_inflight_requests_are_coalesced(probes):
+    pool = client.TcpingWorkerPool(max_workers=2, max_queue=10)
+    emit = Collector()
+    assert pool.submit({'host': 'Example.com', 'port': 443, 'request_id': 'a'}, emit) == 'queued'
+    assert pool.submit({'host': 'example.com', 'port': 443, 'request_id': 'b'}, emit) == 'coalesced'
+    probes['release'].set()
+    results = emit.wait_for(2)
+    assert len(probes['calls']) == 1
+    assert sorted(r['request_id'] for r in results) == ['a', 'b']
+    assert all(r['success'] and r['latency'] == 1.5 for r in results)
+    pool.shutdown(wait=True)
+
+
+def test_rejects_when_queue_full(probes):
+    pool = client.TcpingWorkerPool(max_workers=1, max_queue=1)
+    emit = Collector()
+    assert pool.submit({'host': 'a', 'port': 1, 'request_id': '1'}, emit) == 'queued'
+    assert pool.submit({'host': 'b', 'port': 1, 'request_id': '2'}, emit) == 'queued'
+    assert pool.submit({'host': 'c', 'port': 1, 'request_id': '3'}, emit) == 'rejected'
+    rejected = emit.wait_for(1)[0]
+    assert rejected['request_id'] == '3'
+    assert rejected['success'] is False and rejected['error'] == 'Queue full'
+    probes['release'].set()
+    pool.shutdown(wait=True)
+
+
+def test_deadline_exceeded_while_queued(probes):
+    pool = client.TcpingWorkerPool(max_workers=1, max_queue=5)
+    emit = Collector()
+    pool.submit({'host': 'slow', 'port': 1, 'request_id': 'first'}, emit)
+    pool.submit({'host': 'late', 'port': 1, 'request_id': 'late', 'deadline_ms': 50}, emit)
+    time.sleep(0.2)
+    probes['release'].set()
+    results = {r['request_id']: r for r in emit.wait_for(2)}
+    assert results['late']['error'] == 'Deadline exceeded'
+    assert [call[0] for call in probes['calls']] == ['slow']
+    assert pool.stats['expired'] == 1
+    pool.shutdown(wait=True)
+
+
+def test_remaining_deadline_bounds_probe_timeout(probes):
+    pool = client.TcpingWorkerPool(max_workers=1, max_queue=5)
+    emit = Collector()
+    probes['release'].set()
+    pool.submit({'host': 'a', 'port': 1, 'request_id': '1', 'deadline_ms': 2000}, emit)
+    emit.wait_for(1)
+    assert 0 < probes['calls'][0][2] <= 2
+    pool.shutdown(wait=True)
+
+
+def test_invalid_request(probes):
+    pool = client.TcpingWorkerPool()
+    assert pool.submit({'host': '', 'port': 80}, Collector()) == 'invalid'
+    pool.shutdown(wait=True)
+
+
+def test_probe_options_are_forwarded_and_not_coalesced_with_defaults(probes):
+    pool = client.TcpingWorkerPool(max_workers=2, max_queue=10)
+    emit = Collector()
+    assert pool.submit({'host': 'a', 'port': 1, 'request_id': '1'}, emit) == 'queued'
+    assert pool.submit({'host': 'a', 'port': 1, 'request_id': '2', 'count': 5,
+                        'interval_ms': 50, 'max_latency_ms': 2000}, emit) == 'queued'
+    probes['release'].set()
+    emit.wait_for(2)
+    options = sorted((call[3] for call in probes['calls']), key=lambda o: o['count'])
+    assert options == [{'count': 1, 'interval_ms': None, 'max_latency_ms': None},
+                       {'count': 5, 'interval_ms': 50.0, 'max_latency_ms': 2000.0}]
+    pool.shutdown(wait=True)